@@ -1,86 +1,344 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_
 from sqlalchemy.future import select
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.vehicle import Vehicle
-from app.models.subscription import Subscription
-from app.models.access_log import AccessLog
+from app.models.access_log import AccessLog, AccessDirection
+from app.models.parking_session import ParkingSession
 from app.models.user import User, UserType
-from app.models.schemas import AccessLogOut, AccessLogUserOut
+from app.models.schemas import (
+    AccessLogOut, AccessLogUserOut, AdmissionClientOut, AdmissionOut, CameraTokenIn, CameraTokenOut, FraudAlertOut,
+    LiveOccupancyOut, ParkingSessionOut,
+)
 from fastapi_pagination import Page, paginate, Params
 from typing import List
 from fastapi_pagination.ext.sqlalchemy import paginate as sqlalchemy_paginate
 from app.api.v1.endpoints.users import admin_required
 from app.api.v1.endpoints.subscriptions import get_current_user
 from pydantic import BaseModel
+from app.core.config import get_settings
+from app.core.query_profiler import query_budget
+from app.core.admission import admit, controller as admission, release as release_admission, try_admit
+from app.core.security import create_camera_token, verify_token
+from app.db.session import AsyncSessionLocal
+from app.services.gate_channel import GateChannel, hub as gate_hub
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+import asyncio
+import json
+import logging
+from app.services.gates import lot_for_gate
+from app.services.parking_sessions import close_session, occupancy, open_session
+from app.services.access_rollups import record_access_event
+from app.services.fraud import AccessEvent, detector
+from app.services.plate_index import normalize_plate, plate_index
+from app.services.entitlements import is_entitled, lookup_entitlement
+from app.services.access_coalescing import coalescer
+from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger("gatewise.access")
+settings = get_settings()
 
 class AccessCheckIn(BaseModel):
     license_plate: str
+    gate_id: int | None = None
+    # Without a direction the check is evaluated but no parking session is tracked
+    direction: AccessDirection | None = None
 
 class AccessCheckOut(BaseModel):
     access_granted: bool
     reason: str = ""
+    dwell_seconds: float | None = None
+    # Registered plate the read was matched to and its edit distance (0 for an exact match)
+    matched_plate: str | None = None
+    match_distance: int | None = None
 
-@router.post("/access_check", response_model=AccessCheckOut)
+@router.post("/access_check", response_model=AccessCheckOut, dependencies=[Depends(admit)])
+@query_budget(7)
 async def check_vehicle_access(data: AccessCheckIn, db: AsyncSession = Depends(get_db)):
-    # Busca veículo pela matrícula
-    from sqlalchemy import func
-    vehicle_result = await db.execute(
-        select(Vehicle).where(
-            func.replace(func.upper(Vehicle.license_plate), ' ', '') == data.license_plate.upper().replace(' ', '')
-        )
-    )
-    vehicle = vehicle_result.scalar_one_or_none()
+    return await decide_access(data, db)
+
+async def decide_access(data: AccessCheckIn, db: AsyncSession) -> AccessCheckOut:
+    """Access decision shared by the HTTP endpoint and the gate WebSocket channel."""
+    # Leituras repetidas da mesma matrícula reutilizam o resultado e o registo da primeira
+    key = (normalize_plate(data.license_plate), data.gate_id, data.direction)
+    return await coalescer.check(db, key, lambda: evaluate_access(data, db))
+
+async def evaluate_access(data: AccessCheckIn, db: AsyncSession) -> tuple[AccessCheckOut, int]:
+    """Evaluate and log one access check; returns the answer and the access log id."""
+    lot_id = await lot_for_gate(db, data.gate_id) if data.gate_id is not None else None
+    now = datetime.utcnow()
+    # Direitos do veículo pela matrícula normalizada: uma leitura por chave primária
+    entitlement = await lookup_entitlement(db, normalize_plate(data.license_plate))
+    match_distance = 0 if entitlement else None
+    if not entitlement:
+        # Leitura OCR com erros: tenta a matrícula registada mais próxima
+        await plate_index.ensure_loaded(db)
+        match = plate_index.match(data.license_plate)
+        if match:
+            entitlement = await lookup_entitlement(db, match[1])
+            match_distance = match[2] if entitlement else None
+        else:
+            # A uma edição de distância pode ser outra matrícula real: regista, não autoriza
+            near = plate_index.near_miss(data.license_plate)
+            if near:
+                logger.warning(
+                    "Plate read %s not granted: one edit from registered plate %s (vehicle %d)",
+                    data.license_plate, near[1], near[0],
+                )
     access_granted = False
     reason = "Vehicle not found"
     user_id = None
     vehicle_id = None
-    if vehicle:
-        vehicle_id = vehicle.id
-        user_id = vehicle.owner_id
-        # Busca subscrições ativas do dono do veículo
-        sub_result = await db.execute(select(Subscription).where(Subscription.user_id == vehicle.owner_id, Subscription.status == "active"))
-        subs = sub_result.scalars().all()
-        if subs:
+    opened = False
+    closed = None
+    if entitlement:
+        vehicle_id = entitlement.vehicle_id
+        user_id = entitlement.owner_id
+        if data.direction == AccessDirection.exit:
+            # Saída: um veículo que entrou pode sempre sair
+            closed = await close_session(db, vehicle_id, data.gate_id)
+        if closed:
+            access_granted = True
+            reason = "Exit recorded"
+        elif is_entitled(entitlement, now):
             access_granted = True
             reason = "Access granted: active subscription and allocated parking space found"
+            if data.direction == AccessDirection.entry:
+                opened = await open_session(
+                    db, vehicle_id, entitlement.plate, entitlement.vehicle_type, lot_id, data.gate_id
+                )
+        elif entitlement.valid_until is not None:
+            reason = "Subscription expired"
         else:
             reason = "No active subscription for vehicle owner"
     # Log entry
     log = AccessLog(
+        timestamp=now,
         license_plate=data.license_plate,
+        matched_plate=entitlement.plate if entitlement else None,
         vehicle_id=vehicle_id,
         user_id=user_id,
         granted=access_granted,
-        reason=reason
+        reason=reason,
+        lot_id=lot_id,
+        gate_id=data.gate_id,
+        direction=data.direction.value if data.direction else None
     )
     db.add(log)
+    await record_access_event(
+        db, now, lot_id, access_granted, reason,
+        vehicle_type=entitlement.vehicle_type if entitlement else None,
+        user_type=entitlement.owner_type if entitlement else None,
+    )
     await db.commit()
-    return AccessCheckOut(access_granted=access_granted, reason=reason)
+    detector.observe(AccessEvent(
+        timestamp=now,
+        license_plate=entitlement.plate if entitlement else normalize_plate(data.license_plate),
+        granted=access_granted,
+        direction=log.direction,
+        gate_id=data.gate_id,
+        user_id=user_id,
+    ))
+    if opened:
+        occupancy.entered(lot_id, entitlement.vehicle_type)
+    dwell_seconds = None
+    if closed:
+        occupancy.exited(closed.lot_id, closed.vehicle_type.value)
+        dwell_seconds = (closed.exited_at - closed.entered_at).total_seconds()
+    return AccessCheckOut(
+        access_granted=access_granted,
+        reason=reason,
+        dwell_seconds=dwell_seconds,
+        matched_plate=entitlement.plate if entitlement else None,
+        match_distance=match_distance,
+    ), log.id
+
+@router.websocket("/gates/{gate_id}/ws")
+async def gate_channel(websocket: WebSocket, gate_id: int, token: str | None = Query(None)):
+    """Long-lived channel for a gate controller; see app/services/gate_channel.py for the frames.
+    Authenticate with an admin access token in `?token=` or the Authorization header."""
+    if token is None:
+        auth = websocket.headers.get("authorization", "")
+        token = auth.split(" ", 1)[1] if auth.lower().startswith("bearer ") else None
+    try:
+        async with AsyncSessionLocal() as db:
+            if token is None:
+                raise HTTPException(status_code=401, detail="No token provided")
+            await admin_required(await verify_token(token, db), db)
+            lot_id = await lot_for_gate(db, gate_id)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+    await websocket.accept()
+    channel = GateChannel(gate_id, token)
+    gate_hub.register(channel)
+    client = f"gate:{gate_id}"
+    pending: set[asyncio.Task] = set()
+
+    async def answer(frame: dict):
+        request_id = frame.get("id")
+        try:
+            data = AccessCheckIn(
+                license_plate=frame.get("license_plate"), gate_id=gate_id, direction=frame.get("direction")
+            )
+        except ValidationError as exc:
+            channel.push({"type": "error", "id": request_id, "detail": exc.errors(include_url=False, include_context=False)})
+            return
+        rejection = try_admit(client)
+        if rejection:
+            channel.push({"type": "error", "id": request_id, "detail": rejection})
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                decision = await decide_access(data, db)
+        except HTTPException as exc:
+            channel.push({"type": "error", "id": request_id, "detail": exc.detail})
+            return
+        except Exception:
+            # Erro inesperado (BD, timeout): o controlador recebe na mesma uma resposta para o id
+            logger.exception("Access check for gate %s (request %r) failed", gate_id, request_id)
+            channel.push({"type": "error", "id": request_id, "detail": "Access check failed"})
+            return
+        finally:
+            release_admission()
+        channel.push({"type": "decision", "id": request_id, **decision.model_dump()})
+
+    async def write():
+        while True:
+            await websocket.send_json(await channel.outbox.get())
+
+    async def read():
+        while True:
+            try:
+                frame = json.loads(await websocket.receive_text())
+            except ValueError:
+                frame = None
+            if not isinstance(frame, dict):
+                channel.push({"type": "error", "id": None, "detail": "Frames must be JSON objects"})
+                continue
+            task = asyncio.create_task(answer(frame))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+    async def recheck_token():
+        # O token só foi validado na ligação: expira, pode ser revogado ou o utilizador deixar de ser admin
+        while True:
+            await asyncio.sleep(settings.GATE_TOKEN_CHECK_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await admin_required(await verify_token(token, db), db)
+            except HTTPException as exc:
+                channel.close("token", str(exc.detail))
+                return
+            except Exception:
+                # BD indisponível: mantém o canal e tenta na próxima verificação
+                logger.warning("Token re-check for gate %s failed", gate_id, exc_info=True)
+
+    tasks = [asyncio.create_task(job()) for job in (read, write, recheck_token, channel.closed.wait)]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if channel.closed.is_set():
+            try:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=channel.close_reason)
+            except Exception:
+                pass  # O controlador já desligou
+        for task in done:
+            error = None if task.cancelled() else task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.warning("Gate %s channel failed", gate_id, exc_info=error)
+    finally:
+        gate_hub.unregister(channel)
+        for task in (*tasks, *pending):
+            task.cancel()
+    logger.info("Gate %s (lot %s) channel closed", gate_id, lot_id)
+
+@router.get("/access_check/admission", response_model=AdmissionOut)
+async def get_access_admission(_: User = Depends(admin_required)):
+    """Admission control state: checks in flight and the clients rejected most often."""
+    return AdmissionOut(
+        in_flight=admission.in_flight,
+        max_concurrent=admission.max_concurrent,
+        rate_per_second=admission.rate,
+        burst=admission.burst,
+        clients=[
+            AdmissionClientOut(client=client, tokens=tokens, admitted=admitted, rejected=rejected)
+            for client, tokens, admitted, rejected in admission.snapshot()
+        ],
+    )
+
+@router.post("/access_check/camera_tokens", response_model=CameraTokenOut, status_code=201)
+async def create_access_camera_token(data: CameraTokenIn, _: User = Depends(admin_required)):
+    """Signed token for a camera to send as `X-Camera-Token`; it gives the camera its own admission bucket."""
+    return CameraTokenOut(camera_id=data.camera_id, token=create_camera_token(data.camera_id))
+
+@router.get("/fraud_alerts", response_model=List[FraudAlertOut])
+async def list_fraud_alerts(
+    kind: str | None = Query(None),
+    _: User = Depends(admin_required)
+):
+    """Most recent alerts raised by the streaming fraud detector, newest first."""
+    return [alert for alert in reversed(detector.recent_alerts) if kind is None or alert.kind == kind]
+
+@router.get("/parking_sessions/active", response_model=Page[ParkingSessionOut])
+async def list_active_parking_sessions(
+    lot_id: int | None = Query(None),
+    params: Params = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    _: User = Depends(admin_required)
+):
+    """Vehicles currently inside, served by the partial index on open sessions."""
+    query = select(ParkingSession).where(ParkingSession.exited_at.is_(None))
+    if lot_id is not None:
+        query = query.where(ParkingSession.lot_id == lot_id)
+    query = query.order_by(ParkingSession.entered_at)
+    return await sqlalchemy_paginate(db, query, params)
+
+@router.get("/occupancy/live", response_model=List[LiveOccupancyOut])
+async def get_live_occupancy(
+    lot_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(admin_required)
+):
+    """Vehicles inside per lot and vehicle type, read from the in-memory counters."""
+    await occupancy.ensure_loaded(db)
+    return [
+        LiveOccupancyOut(lot_id=lot, vehicle_type=vehicle_type, inside=inside)
+        for lot, vehicle_type, inside in occupancy.snapshot(lot_id)
+    ]
 
 @router.get("/access_logs/all", response_model=List[AccessLogOut])
-async def list_all_access_logs(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Return ALL access logs without pagination."""
+async def list_all_access_logs(
+    lot_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Return ALL access logs without pagination, optionally for a single lot."""
     if current_user.type == UserType.admin:
-        result = await db.execute(select(AccessLog).order_by(AccessLog.timestamp.desc()))
+        query = select(AccessLog)
     else:
         vehicles_result = await db.execute(select(Vehicle).where(Vehicle.owner_id == current_user.id))
         vehicles = vehicles_result.scalars().all()
         plates = [v.license_plate for v in vehicles]
-        result = await db.execute(select(AccessLog).where(AccessLog.license_plate.in_(plates)).order_by(AccessLog.timestamp.desc()))
+        query = select(AccessLog).where(AccessLog.license_plate.in_(plates))
+    if lot_id is not None:
+        query = query.where(AccessLog.lot_id == lot_id)
+    result = await db.execute(query.order_by(AccessLog.timestamp.desc()))
     return result.scalars().all()
 
 @router.get("/access_logs", response_model=Page[AccessLogOut])
 async def list_access_logs(
     search: str | None = Query(None),
+    lot_id: int | None = Query(None),
     params: Params = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Return paginated access logs. Admins see all; regular users only their own vehicles.
-    Optional `search` parameter filters by license_plate (case-insensitive, partial match)."""
+    Optional `search` parameter filters by license_plate (case-insensitive, partial match)
+    and `lot_id` restricts the logs to one parking lot."""
     if current_user.type == UserType.admin:
         query = select(AccessLog)
     else:
@@ -92,17 +350,26 @@ async def list_access_logs(
 
     if search:
         query = query.where(AccessLog.license_plate.ilike(f"%{search}%"))
+    if lot_id is not None:
+        query = query.where(AccessLog.lot_id == lot_id)
 
     query = query.order_by(AccessLog.timestamp.desc())
     return await sqlalchemy_paginate(db, query, params)
 
 @router.get("/access_logs/my", response_model=Page[AccessLogUserOut])
-async def list_my_access_logs(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def list_my_access_logs(db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     # Busca todas as placas do usuário
     vehicles_result = await db.execute(select(Vehicle).where(Vehicle.owner_id == current_user.id))
     vehicles = vehicles_result.scalars().all()
     plates = [v.license_plate for v in vehicles]
-    # Busca logs apenas das placas do usuário
-    result = await db.execute(select(AccessLog).where(AccessLog.license_plate.in_(plates)).order_by(AccessLog.timestamp.desc()))
+    # Busca logs apenas das placas do usuário, incluindo leituras OCR associadas a elas
+    result = await db.execute(
+        select(AccessLog)
+        .where(or_(
+            AccessLog.license_plate.in_(plates),
+            AccessLog.matched_plate.in_([normalize_plate(plate) for plate in plates]),
+        ))
+        .order_by(AccessLog.timestamp.desc())
+    )
     logs = result.scalars().all()
     return paginate(logs)
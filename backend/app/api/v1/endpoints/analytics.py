@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_read_db
+from app.models.user import User
+from app.models.schemas import AccessSeriesPoint
+from app.api.v1.endpoints.users import admin_required
+from app.services.access_rollups import access_series
+
+router = APIRouter()
+
+MAX_HOURLY_RANGE = timedelta(days=31)
+
+@router.get("/access", response_model=List[AccessSeriesPoint])
+async def get_access_series(
+    granularity: Literal["hour", "day"] = Query("day"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    lot_id: Optional[int] = Query(None),
+    group_by: Optional[Literal["lot_id", "reason", "vehicle_type", "user_type"]] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    _: User = Depends(admin_required)
+):
+    """Granted/denied access counts per hour or day, read from the rollup tables only.
+    Defaults to the last 30 days; `group_by` splits each bucket by one dimension."""
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(days=30)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if granularity == "hour" and until - since > MAX_HOURLY_RANGE:
+        raise HTTPException(status_code=400, detail="Hourly series are limited to 31 days; use granularity=day")
+    rows = await access_series(db, granularity, since, until, lot_id, group_by)
+    return [
+        AccessSeriesPoint(bucket_start=bucket_start, key=key, granted=granted, denied=denied)
+        for bucket_start, key, granted, denied in rows
+    ]
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import create_access_token, verify_token
+from app.core.security import create_access_token, has_usable_password, verify_token
 from app.core.config import get_settings
+from app.core import etag
 from app.models.schemas import Token
 from app.models.user import User
 from app.db.session import get_db
@@ -18,7 +19,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == form_data.username))
     user = result.scalar_one_or_none()
-    if user and pwd_context.verify(form_data.password, user.hashed_password):
+    if user and has_usable_password(user.hashed_password) and pwd_context.verify(form_data.password, user.hashed_password):
         access_token = create_access_token(
             data={"sub": user.username, "type": user.type.value},
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -26,7 +27,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
         return {"access_token": access_token, "token_type": "bearer", "type": user.type.value}
     raise HTTPException(status_code=401, detail="Invalid username or password")
 
-@router.get("/me")
+@router.get("/me", dependencies=[Depends(etag.conditional_get("users"))])
 async def read_users_me(username: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
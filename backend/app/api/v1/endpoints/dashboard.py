@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Request
+from app.db.session import read_sessionmaker
+from app.models.user import User
+from app.models.schemas import DashboardOverviewOut
+from app.api.v1.endpoints.users import admin_required
+from app.core.serialization import trusted_json
+from app.services.dashboard import overview_cache
+
+router = APIRouter()
+
+@router.get("/overview", response_model=DashboardOverviewOut)
+async def get_dashboard_overview(request: Request, _: User = Depends(admin_required)):
+    """Everything the admin dashboard shows on load in one document: payments this month,
+    space allocation and occupancy, active/expiring subscriptions and recent access.
+    Served from a short server-side cache."""
+    overview = await overview_cache.get(await read_sessionmaker(request))
+    return trusted_json(DashboardOverviewOut, overview)
@@ -1,11 +1,16 @@
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import case, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.session import get_db
 from app.models.user import UserType, User
 from app.core.security import verify_token
+from app.core import etag
+from app.models.gate import Gate
 from app.models.parking_lot import ParkingLot
-from app.models.schemas import ParkingLotCreate, ParkingLotOut
+from app.models.parking_space import ParkingSpace
+from app.models.schemas import GateCreate, GateOut, LotOccupancyOut, ParkingLotCreate, ParkingLotOut
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate as sqlalchemy_paginate
 
@@ -35,10 +40,52 @@ async def create_parking_lot(parking_lot: ParkingLotCreate, db: AsyncSession = D
     )
     db.add(new_lot)
     await db.commit()
+    etag.bump("parking_lots")
     await db.refresh(new_lot)
     return new_lot
 
-@router.get("/", response_model=Page[ParkingLotOut])
+@router.get("/", response_model=Page[ParkingLotOut], dependencies=[Depends(etag.conditional_get("parking_lots"))])
 async def list_parking_lots(db: AsyncSession = Depends(get_db), _: User = Depends(get_current_user)):
     query = select(ParkingLot)
     return await sqlalchemy_paginate(db, query)
+
+async def get_parking_lot(lot_id: int, db: AsyncSession) -> ParkingLot:
+    parking_lot = await db.get(ParkingLot, lot_id)
+    if not parking_lot:
+        raise HTTPException(status_code=404, detail="Parking lot not found")
+    return parking_lot
+
+@router.post("/{lot_id}/gates", response_model=GateOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_required)])
+async def create_gate(lot_id: int, gate: GateCreate, db: AsyncSession = Depends(get_db)):
+    await get_parking_lot(lot_id, db)
+    new_gate = Gate(lot_id=lot_id, name=gate.name)
+    db.add(new_gate)
+    await db.commit()
+    etag.bump("gates", lot_id)
+    await db.refresh(new_gate)
+    return new_gate
+
+@router.get("/{lot_id}/gates", response_model=List[GateOut], dependencies=[Depends(etag.conditional_get("gates", "lot_id"))])
+async def list_gates(lot_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_user)):
+    result = await db.execute(select(Gate).where(Gate.lot_id == lot_id).order_by(Gate.id))
+    return result.scalars().all()
+
+@router.get("/{lot_id}/occupancy", response_model=List[LotOccupancyOut])
+async def get_lot_occupancy(lot_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_user)):
+    """Space counts per type for one lot, computed in a single grouped query."""
+    await get_parking_lot(lot_id, db)
+    result = await db.execute(
+        select(
+            ParkingSpace.type,
+            func.count(),
+            func.count(case((ParkingSpace.is_allocated, 1))),
+            func.count(case((ParkingSpace.is_occupied, 1))),
+        )
+        .where(ParkingSpace.lot_id == lot_id)
+        .group_by(ParkingSpace.type)
+        .order_by(ParkingSpace.type)
+    )
+    return [
+        LotOccupancyOut(space_type=space_type, total=total, allocated=allocated, occupied=occupied)
+        for space_type, total, allocated, occupied in result.all()
+    ]
@@ -6,13 +6,15 @@ from sqlalchemy.future import select
 from app.models.parking_space import ParkingSpace, ParkingSpaceType
 from app.models.subscription_parking_space import SubscriptionParkingSpace
 from app.models.subscription import Subscription
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.user import User, UserType
 from pydantic import BaseModel
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlalchemy import paginate as sqlalchemy_paginate
 from app.api.v1.endpoints.subscriptions import get_current_user
 from app.models.schemas import ParkingSpaceOut, ParkingSpaceUpdate
+from app.core import etag
+from app.services.parking_allocator import free_space_index
 
 router = APIRouter()
 
@@ -20,6 +22,7 @@ class ParkingSpaceCreate(BaseModel):
     name: str
     description: str = ""
     type: ParkingSpaceType = ParkingSpaceType.regular
+    lot_id: Optional[int] = None
 
 from app.core.security import verify_token
 
@@ -40,22 +43,28 @@ async def create_parking_space(
         name=parking_space.name,
         description=parking_space.description,
         type=parking_space.type,
+        lot_id=parking_space.lot_id,
         is_allocated=False,
         is_occupied=False
     )
     db.add(new_space)
     await db.commit()
+    etag.bump("parking_spaces", new_space.lot_id)
     await db.refresh(new_space)
+    free_space_index.sync(new_space)
     return new_space
 
-@router.get("/all", response_model=List[ParkingSpaceOut])
+@router.get("/all", response_model=List[ParkingSpaceOut], dependencies=[Depends(etag.conditional_get("parking_spaces", "lot_id"))])
 async def list_all_parking_spaces(
     is_allocated: Optional[bool] = Query(None),
     name: Optional[str] = Query(None),
+    lot_id: Optional[int] = Query(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user)
 ):
     query = select(ParkingSpace)
+    if lot_id is not None:
+        query = query.where(ParkingSpace.lot_id == lot_id)
     if is_allocated is not None:
         query = query.where(ParkingSpace.is_allocated == is_allocated)
     if name:
@@ -69,8 +78,9 @@ async def list_parking_spaces(
     is_allocated: Optional[bool] = Query(None),
     name: Optional[str] = Query(None),
     space_type: Optional[ParkingSpaceType] = Query(None),
+    lot_id: Optional[int] = Query(None),
     params: Params = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Admins can see everything; regular users see apenas as suas vagas
@@ -94,12 +104,15 @@ async def list_parking_spaces(
         if name:
             query = query.where(ParkingSpace.name.ilike(f"%{name}%"))
         query = query.order_by(ParkingSpace.id)
+    if lot_id is not None:
+        query = query.where(ParkingSpace.lot_id == lot_id)
     return await sqlalchemy_paginate(db, query, params)
 
 @router.get("/me", response_model=Page[ParkingSpaceOut])
 async def list_my_parking_spaces(
+    lot_id: Optional[int] = Query(None),
     params: Params = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = (
@@ -108,6 +121,8 @@ async def list_my_parking_spaces(
         .join(Subscription)
         .where(Subscription.user_id == current_user.id)
     ).order_by(ParkingSpace.id)
+    if lot_id is not None:
+        query = query.where(ParkingSpace.lot_id == lot_id)
     return await sqlalchemy_paginate(db, query, params)
 
 @router.put("/{parking_space_id}", response_model=ParkingSpaceOut)
@@ -121,12 +136,15 @@ async def update_parking_space(
     parking_space = result.scalar_one_or_none()
     if not parking_space:
         raise HTTPException(status_code=404, detail="Parking space not found")
+    previous_lot_id = parking_space.lot_id
     update_data = update.dict(exclude_unset=True)
     for field, value in update_data.items():
         if value is not None:
             setattr(parking_space, field, value)
     await db.commit()
+    etag.bump("parking_spaces", *{previous_lot_id, parking_space.lot_id})
     await db.refresh(parking_space)
+    free_space_index.sync(parking_space)
     return parking_space
 
 @router.delete("/{parking_space_id}", status_code=204)
@@ -139,6 +157,9 @@ async def delete_parking_space(
     parking_space = result.scalar_one_or_none()
     if not parking_space:
         raise HTTPException(status_code=404, detail="Parking space not found")
+    lot_id = parking_space.lot_id
     await db.delete(parking_space)
     await db.commit()
+    etag.bump("parking_spaces", lot_id)
+    free_space_index.discard(parking_space_id)
     return None
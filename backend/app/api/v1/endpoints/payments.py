@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.schemas import PaymentCreate, PaymentOut
+from app.models.schemas import PaymentCreate, PaymentOut, PaymentSettlementItem, PaymentSettlementReport
 from app.models.payment import Payment
 from app.models.subscription import Subscription
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.core.serialization import trusted_json, trusted_page
+from app.services.payment_settlement import settle_payments
+from typing import List
 from datetime import datetime, timedelta
 from fastapi_pagination import Params, Page
 from fastapi_pagination.ext.sqlalchemy import paginate
@@ -18,8 +21,10 @@ async def create_payment(
     payment: PaymentCreate,
     db: AsyncSession = Depends(get_db)
 ):
-    # Verifica se a subscription existe e está ativa
-    result = await db.execute(select(Subscription).where(Subscription.id == payment.subscription_id))
+    # Verifica se a subscription existe e está ativa; o lock serializa com /payments/settle
+    result = await db.execute(
+        select(Subscription).where(Subscription.id == payment.subscription_id).with_for_update()
+    )
     subscription = result.scalar_one_or_none()
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
@@ -58,7 +63,7 @@ from sqlalchemy.orm import joinedload
 from fastapi import Query
 
 @router.get("/summary", dependencies=[Depends(admin_required)])
-async def payments_summary(db: AsyncSession = Depends(get_db)):
+async def payments_summary(db: AsyncSession = Depends(get_read_db)):
     """Return monthly expected amount, pending count, pending amount"""
     now = datetime.utcnow()
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -95,7 +100,7 @@ async def payments_summary(db: AsyncSession = Depends(get_db)):
 
 @router.get("/total-paid", response_model=float, dependencies=[Depends(admin_required)])
 async def total_paid(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     start_date: datetime = Query(None, description="Data inicial (ISO 8601)", alias="start_date"),
     end_date: datetime = Query(None, description="Data final (ISO 8601)", alias="end_date")
 ):
@@ -118,6 +123,20 @@ async def total_paid(
     total = sum([row[0] for row in result.all()])
     return total
 
+@router.post("/settle", response_model=PaymentSettlementReport, dependencies=[Depends(admin_required)])
+async def settle_payments_bulk(
+    items: List[PaymentSettlementItem],
+    db: AsyncSession = Depends(get_db)
+):
+    """Settle many payments in one transaction (bank reconciliation). Each item is
+    `{"payment_id": ...}` or `{"subscription_id": ..., "amount": ...}`; amounts must
+    match the subscription price. Invalid items are reported without blocking the rest."""
+    results = await settle_payments(db, items)
+    await db.commit()
+    settled = sum(1 for result in results if result.status in ("settled", "created"))
+    report = PaymentSettlementReport(total=len(results), settled=settled, failed=len(results) - settled, results=results)
+    return trusted_json(PaymentSettlementReport, report)
+
 @router.get("/{payment_id}", response_model=PaymentOut)
 async def get_payment(payment_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Payment).where(Payment.id == payment_id))
@@ -146,7 +165,7 @@ async def list_payments(
     subscription_id: int = None,
     params: Params = Depends(),
     username: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
@@ -196,5 +215,6 @@ async def list_payments(
             "plan_name": plan_name,
             "user_full_name": user_full_name
         })
-    items = [PaymentWithDetailsOut.model_validate(item) for item in enriched_items]
-    return Page.create(items=items, total=total, params=params)
+    # Built from DB rows above, so the items are trusted: construct and serialize without validation
+    items = [PaymentWithDetailsOut.model_construct(**item) for item in enriched_items]
+    return trusted_page(PaymentWithDetailsOut, Page.create(items=items, total=total, params=params))
@@ -5,6 +5,7 @@ from app.models.plan import Plan
 from app.models.schemas import PlanCreate, PlanOut
 from app.api.v1.endpoints.users import admin_required
 from app.db.session import get_db
+from app.core import etag
 from typing import List
 
 router = APIRouter()
@@ -14,15 +15,16 @@ async def create_plan(plan: PlanCreate, db: AsyncSession = Depends(get_db)):
     new_plan = Plan(**plan.dict())
     db.add(new_plan)
     await db.commit()
+    etag.bump("plans")
     await db.refresh(new_plan)
     return new_plan
 
-@router.get("/", response_model=List[PlanOut], dependencies=[Depends(admin_required)])
+@router.get("/", response_model=List[PlanOut], dependencies=[Depends(etag.conditional_get("plans")), Depends(admin_required)])
 async def list_plans(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Plan))
     return result.scalars().all()
 
-@router.get("/{plan_id}", response_model=PlanOut, dependencies=[Depends(admin_required)])
+@router.get("/{plan_id}", response_model=PlanOut, dependencies=[Depends(etag.conditional_get("plans")), Depends(admin_required)])
 async def get_plan(plan_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Plan).where(Plan.id == plan_id))
     plan = result.scalar_one_or_none()
@@ -41,6 +43,7 @@ async def update_plan(plan_id: int, plan_update: PlanCreate, db: AsyncSession =
         setattr(plan, field, value)
     db.add(plan)
     await db.commit()
+    etag.bump("plans")
     await db.refresh(plan)
     return plan
 
@@ -52,3 +55,4 @@ async def delete_plan(plan_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Plan not found")
     await db.delete(plan)
     await db.commit()
+    etag.bump("plans")
@@ -5,7 +5,9 @@ from app.models.subscription import Subscription
 from app.models.schemas import SubscriptionCreate, SubscriptionOut, SubscriptionWithDetailsOut
 from app.models.payment import Payment
 from app.api.v1.endpoints.users import admin_required
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.core.serialization import trusted_page, validate_list
+from app.core import etag
 from typing import List
 
 router = APIRouter()
@@ -15,7 +17,10 @@ from app.models.plan import Plan
 from app.models.parking_space import ParkingSpace
 from app.models.subscription_parking_space import SubscriptionParkingSpace
 from app.models.vehicle import Vehicle
-from app.models.schemas import ParkingSpaceAllocation, SubscriptionParkingSpacesOut, ParkingSpaceOut, VehicleOut, BaseModel
+from app.models.schemas import ParkingSpaceAllocation, ParkingSpaceAutoAllocation, SubscriptionParkingSpacesOut, ParkingSpaceOut, VehicleOut, BaseModel
+from app.services.parking_allocator import auto_claim_spaces, claim_spaces, free_space_index, lock_subscription
+from app.services.entitlements import refresh_owner_entitlements
+from app.services.subscription_expiry import expiry_scheduler
 from sqlalchemy.future import select
 
 from fastapi import Body
@@ -53,8 +58,11 @@ async def create_subscription(subscription: SubscriptionCreate, db: AsyncSession
     )
     # Persist subscription
     db.add(new_subscription)
+    await refresh_owner_entitlements(db, subscription.user_id)
     await db.commit()
     await db.refresh(new_subscription)
+    if new_subscription.status == "active":
+        expiry_scheduler.schedule(new_subscription.id, new_subscription.end_date)
 
     # Create an initial pending payment record corresponding to this subscription
     pending_payment = Payment(
@@ -90,7 +98,7 @@ async def get_current_user(username: str = Depends(verify_token), db: AsyncSessi
     return user
 
 @router.get("/my", response_model=Page[SubscriptionOut])
-async def list_my_subscriptions(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def list_my_subscriptions(db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     query = select(Subscription).where(Subscription.user_id == current_user.id)
     return await sqlalchemy_paginate(db, query)
 
@@ -136,10 +144,11 @@ async def associate_vehicle_to_parking_space(
     space.is_occupied = True
     db.add(space)
     await db.commit()
+    etag.bump("parking_spaces")
     return VehicleParkingAssociationOut(vehicle_id=data.vehicle_id, parking_space_id=parking_space_id)
 
 @router.get("/", response_model=Page[SubscriptionWithDetailsOut])
-async def list_subscriptions(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def list_subscriptions(db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     """Admins get all subscriptions; regular users only their own."""
     if current_user.type == UserType.admin:
         query = select(Subscription).options(selectinload(Subscription.user), selectinload(Subscription.plan))
@@ -147,45 +156,77 @@ async def list_subscriptions(db: AsyncSession = Depends(get_db), current_user: U
         query = select(Subscription).where(Subscription.user_id == current_user.id).options(selectinload(Subscription.user), selectinload(Subscription.plan))
 
     page = await sqlalchemy_paginate(db, query)
-    # Convert to schema with nested relations
-    page.items = [SubscriptionWithDetailsOut.model_validate(item, from_attributes=True) for item in page.items]
-    return page
+    # Convert to schema with nested relations in one batch, then serialize without re-validating
+    page.items = validate_list(SubscriptionWithDetailsOut, page.items)
+    return trusted_page(SubscriptionWithDetailsOut, page)
+
+async def _subscription_spaces_out(db: AsyncSession, subscription_id: int):
+    result = await db.execute(
+        select(ParkingSpace).join(SubscriptionParkingSpace).where(SubscriptionParkingSpace.subscription_id == subscription_id)
+    )
+    spaces = result.scalars().all()
+    return {"parking_spaces": validate_list(ParkingSpaceOut, spaces)}
+
+def _limit_detail(subscription: Subscription, linked: int) -> str:
+    return (
+        f"This subscription allows allocation of up to {subscription.spaces_allocated} spaces "
+        f"and {linked} are already allocated."
+    )
 
 @router.post("/{subscription_id}/allocate_spaces", response_model=SubscriptionParkingSpacesOut, dependencies=[Depends(admin_required)])
 async def allocate_parking_spaces(subscription_id: int, allocation: ParkingSpaceAllocation = Body(...), db: AsyncSession = Depends(get_db)):
-    # Busca subscrição
-    result = await db.execute(select(Subscription).where(Subscription.id == subscription_id))
-    subscription = result.scalar_one_or_none()
+    # Busca e bloqueia a subscrição: alocações concorrentes esperam pela verificação do limite
+    subscription, linked = await lock_subscription(db, subscription_id)
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
-    # Limite máximo
-    if len(allocation.parking_space_ids) > subscription.spaces_allocated:
-        raise HTTPException(status_code=400, detail=f"This subscription allows allocation of up to {subscription.spaces_allocated} spaces.")
-    # Busca lugares
-    result = await db.execute(select(ParkingSpace).where(ParkingSpace.id.in_(allocation.parking_space_ids)))
-    parking_spaces = result.scalars().all()
-    if len(parking_spaces) != len(allocation.parking_space_ids):
-        raise HTTPException(status_code=404, detail="One or more parking spaces not found.")
-    # Verifica se já estão alocados
-    for space in parking_spaces:
-        if space.is_allocated:
-            raise HTTPException(status_code=400, detail=f"Parking space {space.id} is already allocated.")
-    # Associa
-    # Store the order of allocation based on input list
-    id_to_space = {space.id: space for space in parking_spaces}
-    for idx, parking_space_id in enumerate(allocation.parking_space_ids):
-        space = id_to_space[parking_space_id]
-        assoc = SubscriptionParkingSpace(subscription_id=subscription_id, parking_space_id=space.id, order=idx)
-        db.add(assoc)
-        space.is_allocated = True
-        db.add(space)
+    # Limite máximo, contando os lugares já associados
+    if linked + len(allocation.parking_space_ids) > subscription.spaces_allocated:
+        raise HTTPException(status_code=400, detail=_limit_detail(subscription, linked))
+    if len(set(allocation.parking_space_ids)) != len(allocation.parking_space_ids):
+        raise HTTPException(status_code=400, detail="Duplicate parking space ids.")
+    # Marca os lugares como alocados numa só instrução: só os que ainda estão livres são reclamados,
+    # por isso dois admins nunca alocam o mesmo lugar
+    claimed = await claim_spaces(db, subscription_id, allocation.parking_space_ids, first_order=linked)
+    unclaimed = set(allocation.parking_space_ids) - claimed
+    if unclaimed:
+        await db.rollback()
+        result = await db.execute(select(ParkingSpace.id).where(ParkingSpace.id.in_(unclaimed)))
+        existing = set(result.scalars().all())
+        if existing != unclaimed:
+            raise HTTPException(status_code=404, detail="One or more parking spaces not found.")
+        raise HTTPException(status_code=400, detail=f"Parking space {min(existing)} is already allocated.")
+    await refresh_owner_entitlements(db, subscription.user_id)
     await db.commit()
+    free_space_index.discard(*claimed)
+    etag.bump("parking_spaces")
     # Retorna todos associados
-    result = await db.execute(
-        select(ParkingSpace).join(SubscriptionParkingSpace).where(SubscriptionParkingSpace.subscription_id == subscription_id)
-    )
-    spaces = result.scalars().all()
-    return {"parking_spaces": [ParkingSpaceOut.from_orm(s) for s in spaces]}
+    return await _subscription_spaces_out(db, subscription_id)
+
+@router.post("/{subscription_id}/auto_allocate_spaces", response_model=SubscriptionParkingSpacesOut, dependencies=[Depends(admin_required)])
+async def auto_allocate_parking_spaces(subscription_id: int, allocation: ParkingSpaceAutoAllocation = Body(...), db: AsyncSession = Depends(get_db)):
+    """Allocate `count` free spaces of `space_type` to the subscription, chosen by the server."""
+    if allocation.count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1.")
+    subscription, linked = await lock_subscription(db, subscription_id)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    if linked + allocation.count > subscription.spaces_allocated:
+        raise HTTPException(status_code=400, detail=_limit_detail(subscription, linked))
+    claimed = await auto_claim_spaces(db, subscription_id, allocation.space_type, allocation.count, allocation.lot_id)
+    if len(claimed) < allocation.count:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only {len(claimed)} free {allocation.space_type.value} parking spaces available.",
+        )
+    await refresh_owner_entitlements(db, subscription.user_id)
+    await db.commit()
+    free_space_index.discard(*claimed)
+    if allocation.lot_id is not None:
+        etag.bump("parking_spaces", allocation.lot_id)
+    else:
+        etag.bump("parking_spaces")
+    return await _subscription_spaces_out(db, subscription_id)
 
 from fastapi_pagination import Page, paginate
 from fastapi_pagination.ext.sqlalchemy import paginate as sqlalchemy_paginate
@@ -233,6 +274,8 @@ async def cancel_subscription(subscription_id: int, db: AsyncSession = Depends(g
     subscription.status = "cancelled"
     subscription.cancellation_date = datetime.utcnow()
     db.add(subscription)
+    await refresh_owner_entitlements(db, subscription.user_id)
     await db.commit()
     await db.refresh(subscription)
+    expiry_scheduler.unschedule(subscription.id)
     return subscription
@@ -1,15 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.models.schemas import Token, UserShortOut
+from app.models.schemas import Token, UserShortOut, UserImportReport, JobStatusOut
 from pydantic import BaseModel
 from pydantic import BaseModel
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 from app.models.user import User, UserType
-from app.db.session import get_db
+from app.models.vehicle_entitlement import VehicleEntitlement
+from app.db.session import get_db, get_read_db
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
-from app.core.security import verify_token
+from app.core.security import UNUSABLE_PASSWORD, create_password_reset_token, verified_tokens, verify_token
+from app.core import etag
+from app.core.serialization import trusted_json
+from app.services.background_jobs import get_job, start_job
+from app.services.entitlements import remove_entitlements
+from app.services.gate_channel import hub as gate_hub
+from app.services.user_import import RESET_PASSWORD_URL, import_users, invitation_sender
 from jose import jwt
 from app.models.token_blacklist import TokenBlacklist
 from app.core.config import get_settings
@@ -51,16 +58,17 @@ async def edit_user(
     user.full_name = update.full_name
     db.add(user)
     await db.commit()
+    etag.bump("users")
     await db.refresh(user)
-    return UserShortOut.from_orm(user)
+    return UserShortOut.model_validate(user)
 
-@router.get("/{user_id}", response_model=UserShortOut)
+@router.get("/{user_id}", response_model=UserShortOut, dependencies=[Depends(etag.conditional_get("users", public=True))])
 async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserShortOut.from_orm(user)
+    return UserShortOut.model_validate(user)
 
 async def admin_required(username: str = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == username))
@@ -89,8 +97,11 @@ async def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     from sqlalchemy.exc import IntegrityError
     try:
+        # Antes do delete: o cascade apagaria os direitos sem avisar as cancelas
+        await remove_entitlements(db, VehicleEntitlement.owner_id == user.id)
         await db.delete(user)
         await db.commit()
+        etag.bump("users")
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=400, detail="User has linked records and cannot be deleted.")
@@ -135,29 +146,52 @@ async def create_user(
     email_exists = result.scalar_one_or_none()
     if email_exists:
         raise HTTPException(status_code=400, detail="Email already exists")
-    # User is created with a random password, but must reset it
-    password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
+    # User is created without a usable password and must set one through the reset link
     u = User(
         username=user.username,
         full_name=user.full_name,
         email=user.email,
-        hashed_password=pwd_context.hash(password),
+        hashed_password=UNUSABLE_PASSWORD,
         type=user.type
     )
     db.add(u)
     await db.commit()
     await db.refresh(u)
-    # Generate reset token
-    expire = datetime.utcnow() + timedelta(hours=1)
-    token = jwt.encode({"sub": str(u.id), "exp": expire}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    reset_link = f"https://your-frontend-app.com/reset-password?token={token}"
+    reset_link = RESET_PASSWORD_URL.format(token=create_password_reset_token(u.id))
     send_email(u.email, "Set your password", f"Hello {u.full_name}, set your password here: {reset_link}")
     return {"id": u.id, "username": u.username, "full_name": u.full_name, "email": u.email, "type": u.type}
 
+@router.post("/import", response_model=UserImportReport, status_code=202)
+async def import_users_bulk(
+    users: List[UserCreate],
+    _: User = Depends(admin_required),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many invite-only users at once. Invitations are emailed in the background;
+    poll GET /users/jobs/{invitation_job_id} for their progress."""
+    rows, created = await import_users(db, users)
+    await db.commit()
+    job_id = None
+    if created:
+        etag.bump("users")
+        job_id = start_job("user_invitations", len(created), invitation_sender(created)).id
+    created_count = sum(1 for row in rows if row.status == "created")
+    report = UserImportReport(
+        total=len(rows), created=created_count, failed=len(rows) - created_count, rows=rows, invitation_job_id=job_id,
+    )
+    return trusted_json(UserImportReport, report, status_code=202)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusOut)
+async def get_job_status(job_id: str, _: User = Depends(admin_required)):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusOut.model_validate(job)
+
 @router.get("/", response_model=Page[UserOut])
 async def list_users(
     _: User = Depends(admin_required),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(User)
     return await paginate(db, query)
@@ -178,6 +212,8 @@ async def logout_user(request: Request, db: AsyncSession = Depends(get_db)):
         tb = TokenBlacklist(jti=jti, token=token)
         db.add(tb)
         await db.commit()
+        verified_tokens.evict(token)
+        gate_hub.close_token(token)
         return {"msg": "Logout successful"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid token: {str(e)}")
@@ -192,9 +228,7 @@ async def generate_reset_token(
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    expire = datetime.utcnow() + timedelta(hours=1)
-    token = jwt.encode({"sub": str(user.id), "exp": expire}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    reset_link = f"https://your-frontend-app.com/reset-password?token={token}"
+    reset_link = RESET_PASSWORD_URL.format(token=create_password_reset_token(user.id))
     send_email(user.email, "Password reset link", f"Hello {user.full_name}, reset your password here: {reset_link}")
     return {"msg": "Password reset link sent"}
 
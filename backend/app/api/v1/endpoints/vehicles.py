@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.models.schemas import VehicleOut, VehicleCreate, VehicleUpdate
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.models.schemas import VehicleOut, VehicleCreate, VehicleUpdate, VehicleImportReport
 from sqlalchemy.exc import IntegrityError
 from app.models.vehicle import Vehicle
-from app.models.user import User
+from app.models.vehicle_entitlement import VehicleEntitlement
+from app.models.user import User, UserType
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy.orm import selectinload
+from app.services.plate_index import normalize_plate, plate_index
+from app.services.entitlements import lookup_entitlement, refresh_owner_entitlements, remove_entitlements
+from app.services.vehicle_import import (
+    VehicleImportError, csv_records, import_vehicles, json_array_records, json_lines_records,
+)
+from app.core.serialization import trusted_json
 
 router = APIRouter()
 
@@ -19,7 +26,7 @@ from fastapi import Query
 @router.get("/", response_model=Page[VehicleOut])
 async def list_vehicles(
     username: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
@@ -44,8 +51,9 @@ async def create_vehicle(
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    exists = await db.execute(select(Vehicle).where(Vehicle.license_plate == vehicle.license_plate))
-    if exists.scalar_one_or_none():
+    # Matrículas iguais após normalização ("AA-11-BB" e "AA11BB") são a mesma matrícula;
+    # criações concorrentes são barradas pelo índice único ux_vehicles_normalized_plate
+    if await lookup_entitlement(db, normalize_plate(vehicle.license_plate)):
         raise HTTPException(status_code=400, detail="License plate already exists")
     v = Vehicle(
         license_plate=vehicle.license_plate.upper(),
@@ -56,10 +64,13 @@ async def create_vehicle(
     )
     db.add(v)
     try:
+        await db.flush()
+        await refresh_owner_entitlements(db, user.id)
         await db.commit()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=400, detail="License plate already exists")
+    plate_index.upsert(v.id, v.license_plate)
     await db.refresh(v)
     result = await db.execute(select(Vehicle).where(Vehicle.id == v.id).options(selectinload(Vehicle.owner)))
     v = result.scalar_one_or_none()
@@ -83,20 +94,25 @@ async def update_vehicle(
     update_data = vehicle.dict(exclude_unset=True)
     if "license_plate" in update_data and update_data["license_plate"] is not None:
         new_plate = update_data["license_plate"].upper()
-        exists = await db.execute(
-            select(Vehicle).where(Vehicle.license_plate == new_plate, Vehicle.id != vehicle_id)
-        )
-        if exists.scalar_one_or_none():
+        existing = await lookup_entitlement(db, normalize_plate(new_plate))
+        if existing and existing.vehicle_id != vehicle_id:
             raise HTTPException(status_code=400, detail="License plate already exists")
         update_data["license_plate"] = new_plate
     for field, value in update_data.items():
         if value is not None:
             setattr(v, field, value)
-    await db.commit()
+    try:
+        await db.flush()
+        await refresh_owner_entitlements(db, user.id)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="License plate already exists")
+    plate_index.upsert(v.id, v.license_plate)
     await db.refresh(v)
     result = await db.execute(select(Vehicle).where(Vehicle.id == v.id).options(selectinload(Vehicle.owner)))
     v_full = result.scalar_one_or_none()
-    return VehicleOut.from_orm(v_full)
+    return VehicleOut.model_validate(v_full)
 
 @router.delete("/{vehicle_id}", status_code=204)
 async def delete_vehicle(
@@ -113,9 +129,65 @@ async def delete_vehicle(
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found or not owned by user")
     try:
+        # Antes do delete: o cascade apagaria os direitos sem avisar as cancelas
+        await remove_entitlements(db, VehicleEntitlement.vehicle_id == vehicle_id)
         await db.delete(vehicle)
         await db.commit()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=400, detail="Cannot delete vehicle with existing dependencies")
+    plate_index.remove(vehicle_id)
     return None
+
+IMPORT_READERS = {
+    "text/csv": csv_records,
+    "application/x-ndjson": json_lines_records,
+    "application/jsonl": json_lines_records,
+    "application/json": json_array_records,
+}
+
+@router.post(
+    "/import",
+    response_model=VehicleImportReport,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "text/csv": {"schema": {"type": "string"}, "example": "license_plate,make,model,color,type\nAA-00-AA,Renault,Clio,red,car\n"},
+        "application/x-ndjson": {"schema": {"type": "string"}},
+        "application/json": {"schema": {"type": "array", "items": VehicleCreate.model_json_schema()}},
+    }}},
+)
+async def import_vehicles_bulk(
+    request: Request,
+    owner_id: int | None = Query(None, description="Owner of the imported vehicles (admins only); defaults to the caller"),
+    username: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """Register many vehicles from a CSV (header: license_plate,make,model,color[,type]),
+    JSON lines or JSON array body. Returns one result per input row."""
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if owner_id is None or owner_id == user.id:
+        owner_id = user.id
+    else:
+        if user.type != UserType.admin:
+            raise HTTPException(status_code=403, detail="Admin privileges required to import for another user")
+        if not await db.get(User, owner_id):
+            raise HTTPException(status_code=404, detail="Owner not found")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    reader = IMPORT_READERS.get(content_type)
+    if reader is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type; use one of {', '.join(IMPORT_READERS)}")
+    try:
+        rows = await import_vehicles(db, owner_id, reader(request.stream()))
+    except VehicleImportError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    created = [row for row in rows if row.status == "created"]
+    if created:
+        await refresh_owner_entitlements(db, owner_id)
+    await db.commit()
+    for row in created:
+        plate_index.upsert(row.vehicle_id, row.license_plate)
+    report = VehicleImportReport(total=len(rows), created=len(created), failed=len(rows) - len(created), rows=rows)
+    return trusted_json(VehicleImportReport, report)
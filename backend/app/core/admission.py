@@ -0,0 +1,144 @@
+"""Admission control for the unauthenticated access-check path.
+
+Each client (the camera named by a valid ``X-Camera-Token``, otherwise its
+address) gets a token bucket refilled at ``ACCESS_RATE_PER_SECOND`` up to
+``ACCESS_BURST`` tokens, and at most ``ACCESS_MAX_CONCURRENT`` checks run at
+once across all clients. ``admit`` is added as the route's first dependency, so
+a rejected request is answered with 429 before its body is validated or a
+database session is opened: a flooding lane only exhausts its own bucket, and
+a burst over the concurrency cap is shed instead of queuing on the DB pool.
+
+At most ``ACCESS_MAX_TRACKED_CLIENTS`` buckets are kept, least recently seen
+evicted first. Camera tokens are signed (``security.create_camera_token``, issued
+by ``POST /access_check/camera_tokens``): a free-form camera id would let one
+client rotate ids to dodge its limit and evict the buckets of real cameras.
+"""
+from collections import OrderedDict
+from time import monotonic
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Gauge, registry
+from app.core.security import camera_identity
+
+settings = get_settings()
+
+admission_decisions = registry.register(Counter(
+    "gatewise_access_admission_total", "Access checks admitted or rejected by admission control.", ("outcome",),
+))
+access_in_flight = registry.register(Gauge(
+    "gatewise_access_checks_in_flight", "Access checks currently being evaluated.",
+))
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated", "admitted", "rejected")
+
+    def __init__(self, burst: int, now: float):
+        self.tokens = float(burst)
+        self.updated = now
+        self.admitted = 0
+        self.rejected = 0
+
+    def take(self, rate: float, burst: int, now: float) -> bool:
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.rejected += 1
+            return False
+        self.tokens -= 1
+        self.admitted += 1
+        return True
+
+
+class AdmissionController:
+    def __init__(self, rate: float, burst: int, max_concurrent: int, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def try_acquire(self, client: str) -> str | None:
+        """Reserve a slot for ``client``; returns the rejection reason, or None when admitted."""
+        now = monotonic()
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = self.buckets[client] = TokenBucket(self.burst, now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client)
+        if not bucket.take(self.rate, self.burst, now):
+            return "rate_limited"
+        if self.in_flight >= self.max_concurrent:
+            # The token is spent anyway: a lane retrying into an overloaded server slows down too
+            bucket.admitted -= 1
+            bucket.rejected += 1
+            return "overloaded"
+        self.in_flight += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+
+    def retry_after(self, client: str) -> int:
+        bucket = self.buckets.get(client)
+        missing = 1 - bucket.tokens if bucket else 0
+        return max(1, int(missing / self.rate + 0.999)) if self.rate > 0 else 1
+
+    def snapshot(self, limit: int = 50) -> list[tuple[str, float, int, int]]:
+        """``(client, tokens, admitted, rejected)`` for the clients rejected most often."""
+        rows = [(client, b.tokens, b.admitted, b.rejected) for client, b in self.buckets.items()]
+        rows.sort(key=lambda row: (-row[3], -row[2]))
+        return rows[:limit]
+
+
+controller = AdmissionController(
+    settings.ACCESS_RATE_PER_SECOND,
+    settings.ACCESS_BURST,
+    settings.ACCESS_MAX_CONCURRENT,
+    settings.ACCESS_MAX_TRACKED_CLIENTS,
+)
+
+
+def client_key(request: Request) -> str:
+    token = request.headers.get("x-camera-token")
+    camera = camera_identity(token) if token else None
+    if camera:
+        return f"camera:{camera}"
+    return f"addr:{request.client.host if request.client else 'unknown'}"
+
+
+def try_admit(client: str) -> str | None:
+    """Admit one access check for ``client``; returns the rejection reason, or None when admitted.
+
+    Every admitted check must be paired with ``release``.
+    """
+    rejection = controller.try_acquire(client)
+    admission_decisions.inc((rejection or "admitted",))
+    if rejection is None:
+        access_in_flight.inc()
+    return rejection
+
+
+def release():
+    access_in_flight.dec()
+    controller.release()
+
+
+async def admit(request: Request):
+    """Dependency admitting the request or answering 429 Too Many Requests."""
+    client = client_key(request)
+    if try_admit(client):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many access checks, retry later",
+            headers={"Retry-After": str(controller.retry_after(client))},
+        )
+    try:
+        yield
+    finally:
+        release()
@@ -5,12 +5,42 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "a_very_secret_key_123"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified access tokens kept in memory until they expire (see app/core/security.py)
+    TOKEN_CACHE_SIZE: int = 10_000
     DATABASE_URL: str = "postgresql+asyncpg://appuser:apppassword@db:5432/appdb"
+    # Optional read replica for listing/reporting endpoints (see app/db/session.py)
+    READ_DATABASE_URL: str | None = None
+    READ_STICKY_SECONDS: float = 5.0
+    READ_MAX_LAG_SECONDS: float = 2.0
+    READ_LAG_CHECK_SECONDS: float = 1.0
     POSTGRES_USER: str = "appuser"
     POSTGRES_PASSWORD: str = "apppassword"
     POSTGRES_DB: str = "appdb"
     GMAIL_USER: str = "your_gmail_address@gmail.com"
     GMAIL_PASSWORD: str = "your_gmail_app_password"
+    # Development-only N+1 detection (see app/core/query_profiler.py)
+    QUERY_PROFILING: bool = False
+    QUERY_REPEAT_THRESHOLD: int = 5
+    QUERY_BUDGET_STRICT: bool = False
+    # Streaming fraud detection over access events (see app/services/fraud.py)
+    FRAUD_DENIED_BURST: int = 5
+    FRAUD_DENIED_WINDOW_SECONDS: int = 60
+    FRAUD_GATE_HOP_SECONDS: int = 30
+    # An entry granted again at the same gate within this window is a camera re-read, not a
+    # double entry; keep it above ACCESS_REPEAT_WINDOW_SECONDS, which only folds the closest repeats
+    FRAUD_REREAD_SECONDS: int = 60
+    FRAUD_MAX_TRACKED_PLATES: int = 100_000
+    # Admission control on /access_check (see app/core/admission.py)
+    ACCESS_RATE_PER_SECOND: float = 5.0
+    ACCESS_BURST: int = 20
+    ACCESS_MAX_CONCURRENT: int = 32
+    ACCESS_MAX_TRACKED_CLIENTS: int = 10_000
+    # Identical checks within this window reuse the first result and log row (0 disables)
+    ACCESS_REPEAT_WINDOW_SECONDS: float = 2.0
+    # Gate controller channels re-check their admin token this often (see app/services/gate_channel.py)
+    GATE_TOKEN_CHECK_SECONDS: float = 60.0
+    # Server-side cache of GET /dashboard/overview (see app/services/dashboard.py)
+    DASHBOARD_CACHE_SECONDS: float = 10.0
 
     class Config:
         env_file = ".env"
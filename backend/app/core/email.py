@@ -3,22 +3,47 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 
-def send_email_gmail(to_email: str, subject: str, body: str):
+def _gmail_credentials():
     # Get credentials from environment variables
     gmail_user = os.environ.get("GMAIL_USER")
     gmail_password = os.environ.get("GMAIL_PASSWORD")
     if not gmail_user or not gmail_password:
         raise RuntimeError("GMAIL_USER and GMAIL_PASSWORD must be set in environment variables.")
+    return gmail_user, gmail_password
 
+def _message(sender: str, to_email: str, subject: str, body: str) -> str:
     msg = MIMEMultipart()
-    msg["From"] = gmail_user
+    msg["From"] = sender
     msg["To"] = to_email
     msg["Subject"] = subject
     msg.attach(MIMEText(body, "plain"))
+    return msg.as_string()
 
+def send_email_gmail(to_email: str, subject: str, body: str):
+    gmail_user, gmail_password = _gmail_credentials()
     try:
         with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(gmail_user, gmail_password)
-            server.sendmail(gmail_user, to_email, msg.as_string())
+            server.sendmail(gmail_user, to_email, _message(gmail_user, to_email, subject, body))
     except Exception as e:
         raise RuntimeError(f"Failed to send email: {e}")
+
+def send_emails_gmail(messages: list[tuple[str, str, str]]) -> dict[str, str]:
+    """Send ``(to_email, subject, body)`` messages over a single SMTP connection.
+
+    Returns the recipients that failed, mapped to the error; a connection or login
+    failure fails the whole batch.
+    """
+    gmail_user, gmail_password = _gmail_credentials()
+    failures = {}
+    try:
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+            server.login(gmail_user, gmail_password)
+            for to_email, subject, body in messages:
+                try:
+                    server.sendmail(gmail_user, to_email, _message(gmail_user, to_email, subject, body))
+                except smtplib.SMTPRecipientsRefused as e:
+                    failures[to_email] = str(e)
+    except Exception as e:
+        raise RuntimeError(f"Failed to send email batch: {e}")
+    return failures
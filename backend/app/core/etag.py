@@ -0,0 +1,78 @@
+"""Version stamps and conditional GETs for slowly changing resources.
+
+Each resource (plans, parking lots, parking spaces, users) has an in-memory
+version number that write endpoints bump after committing. Read endpoints add
+``conditional_get(resource)`` as their *first* dependency: it verifies the
+bearer token (``verify_token``, shared with the route's own auth dependency),
+then, when the request's ``If-None-Match`` matches the current ETag, answers
+304 before any other query runs; otherwise it stamps the ETag on the response.
+An expired or revoked token therefore gets 401, never 304. Public routes pass
+``public=True`` to skip the token check.
+
+Resources can be partitioned (per parking lot): ``bump(resource, lot_id)``
+only invalidates that lot's listings plus the unscoped ones, while a plain
+``bump(resource)`` invalidates every partition.
+
+The ETag also covers the Authorization header, path and query string, so a 304
+is only ever given to the same credentials and URL that received the 200.
+Versions live in process memory; the per-boot nonce invalidates old ETags on
+restart.
+"""
+import hashlib
+import secrets
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.core.security import verify_token
+
+_BOOT = secrets.token_hex(4)
+_versions: dict[str, int] = {}
+
+
+def _incr(key: str):
+    _versions[key] = _versions.get(key, 0) + 1
+
+
+def bump(resource: str, *scopes):
+    """Invalidate cached representations of ``resource``; call after the write commits.
+
+    With ``scopes`` only those partitions (and unscoped listings) are invalidated.
+    """
+    if not scopes:
+        _incr(resource)
+        return
+    for scope in scopes:
+        _incr(f"{resource}:{scope}")
+    _incr(f"{resource}:*")
+
+
+def current_etag(resource: str, request: Request, scope_param: str | None = None) -> str:
+    scope = None
+    if scope_param:
+        scope = request.path_params.get(scope_param, request.query_params.get(scope_param))
+    partition = _versions.get(f"{resource}:{scope if scope is not None else '*'}", 0)
+    variant = hashlib.blake2b(
+        f"{request.headers.get('authorization', '')} {request.url.path}?{request.url.query}".encode(), digest_size=8
+    ).hexdigest()
+    return f'W/"{resource}.{_BOOT}.{_versions.get(resource, 0)}.{partition}.{variant}"'
+
+
+def conditional_get(resource: str, scope_param: str | None = None, public: bool = False):
+    """Dependency answering 304 Not Modified when the client already has the current version.
+
+    ``scope_param`` names the path or query parameter (e.g. ``lot_id``) selecting a partition.
+    Unless ``public``, the bearer token is verified first.
+    """
+    async def check(request: Request, response: Response):
+        etag = current_etag(resource, request, scope_param)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    if public:
+        return check
+
+    async def authenticated(request: Request, response: Response, _: str = Depends(verify_token)):
+        await check(request, response)
+    return authenticated
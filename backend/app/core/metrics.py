@@ -0,0 +1,197 @@
+"""In-process request and database metrics exposed in Prometheus text format.
+
+The registry is deliberately tiny: plain dicts of counters and fixed-bucket
+histograms, only ever touched from the event loop thread, so recording a
+request costs a handful of dict operations and no locks.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# [statement count, total statement seconds] for the request being served
+_request_db_stats: ContextVar[list | None] = ContextVar("request_db_stats", default=None)
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_bound(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {total}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.series = {}
+
+    def inc(self, labels=(), amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, labels=()):
+        self.series[labels] = value
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "gatewise_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"), LATENCY_BUCKETS,
+))
+http_requests = registry.register(Counter(
+    "gatewise_http_requests_total", "HTTP requests by route and status code.",
+    ("method", "route", "status"),
+))
+http_in_flight = registry.register(Gauge(
+    "gatewise_http_requests_in_flight", "HTTP requests currently being served.",
+))
+db_statements_per_request = registry.register(Histogram(
+    "gatewise_db_statements_per_request", "SQL statements executed per HTTP request.",
+    ("method", "route"), STATEMENT_BUCKETS,
+))
+db_statement_seconds = registry.register(Counter(
+    "gatewise_db_statement_seconds_total", "Total time spent executing SQL statements by route.",
+    ("method", "route"),
+))
+
+
+def _route_template(scope):
+    """Rebuild the matched path template (``/api/v1/plans/{plan_id}``) from the routed scope."""
+    if "endpoint" not in scope:
+        # Unmatched paths would otherwise give scanners unbounded label cardinality.
+        return "<unmatched>"
+    path = scope["path"]
+    params = scope.get("path_params")
+    if not params:
+        return path
+    names = {str(value): name for name, value in params.items()}
+    return "/".join(f"{{{names[part]}}}" if part in names else part for part in path.split("/"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and SQL statement stats per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+        http_in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            http_in_flight.dec()
+            _request_db_stats.reset(token)
+            labels = (scope["method"], _route_template(scope))
+            http_request_duration.observe(labels, elapsed)
+            http_requests.inc(labels + (status,))
+            db_statements_per_request.observe(labels, db_stats[0])
+            if db_stats[1]:
+                db_statement_seconds.inc(labels, db_stats[1])
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db_stats.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("metrics_query_start")
+    if starts:
+        stats[1] += perf_counter() - starts.pop()
+    stats[0] += 1
+
+
+def instrument_engine(engine):
+    """Count and time every SQL statement executed by ``engine`` during a request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
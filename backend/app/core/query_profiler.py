@@ -0,0 +1,184 @@
+"""Development-mode N+1 query detector.
+
+When ``QUERY_PROFILING`` is enabled, every SQL statement executed during a
+request (or a job wrapped in ``record_queries``) is reduced to a fingerprint,
+i.e. its shape with literals and bind parameters stripped. Fingerprints that
+repeat more than ``QUERY_REPEAT_THRESHOLD`` times are logged as likely N+1
+patterns, and handlers decorated with ``query_budget`` are checked against
+their declared maximum number of statements. With ``QUERY_BUDGET_STRICT`` the
+middleware holds back the response until the handler is done and answers 500
+instead when the budget was exceeded, so tests see the violation.
+
+Tests can use ``record_queries`` directly to fail when a code path exceeds
+its budget::
+
+    with record_queries("list_payments", budget=4):
+        await client.get("/api/v1/payments/")
+"""
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("gatewise.query_profiler")
+settings = get_settings()
+
+_current_recorder: ContextVar["QueryRecorder | None"] = ContextVar("query_recorder", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a recorded block runs more SQL statements than its budget allows."""
+
+
+def fingerprint(statement: str) -> str:
+    """Reduce a SQL statement to its shape, so per-row variants of a query compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?+)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryRecorder:
+    def __init__(self, name: str, budget: int | None = None, parent: "QueryRecorder | None" = None):
+        self.name = name
+        self.budget = budget
+        self.parent = parent
+        self.fingerprints = Counter()
+        self.total = 0
+
+    def record(self, statement: str):
+        shape = fingerprint(statement)
+        recorder = self
+        while recorder is not None:
+            recorder.fingerprints[shape] += 1
+            recorder.total += 1
+            recorder = recorder.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.fingerprints.most_common() if count > threshold]
+
+    def report(self, threshold: int | None = None):
+        """Log statements repeated above ``threshold`` and return them."""
+        threshold = settings.QUERY_REPEAT_THRESHOLD if threshold is None else threshold
+        repeated = self.repeated(threshold)
+        for shape, count in repeated:
+            logger.warning("Possible N+1 in %s: %d executions of %s", self.name, count, shape)
+        return repeated
+
+    def budget_error(self) -> str | None:
+        if self.budget is None or self.total <= self.budget:
+            return None
+        details = "; ".join(f"{count}x {shape}" for shape, count in self.fingerprints.most_common(5))
+        return f"{self.name} executed {self.total} SQL statements, budget is {self.budget}: {details}"
+
+    def check_budget(self):
+        error = self.budget_error()
+        if error:
+            raise QueryBudgetExceeded(error)
+
+
+@contextmanager
+def record_queries(name: str, budget: int | None = None):
+    """Record the statements executed inside the block, raising if ``budget`` is exceeded."""
+    recorder = QueryRecorder(name, budget, parent=_current_recorder.get())
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+    recorder.report()
+    recorder.check_budget()
+
+
+def query_budget(max_statements: int):
+    """Declare the maximum number of SQL statements a route handler may run."""
+    def decorator(func):
+        func.__query_budget__ = max_statements
+        return func
+    return decorator
+
+
+class QueryProfilerMiddleware:
+    """Pure ASGI middleware recording a query fingerprint profile for every request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        recorder = QueryRecorder(f"{scope['method']} {scope['path']}", parent=_current_recorder.get())
+        token = _current_recorder.set(recorder)
+        try:
+            if settings.QUERY_BUDGET_STRICT:
+                send = self._strict(scope, recorder, send)
+            await self.app(scope, receive, send)
+        finally:
+            _current_recorder.reset(token)
+        recorder.report()
+        if self._over_budget(scope, recorder):
+            logger.warning("%s exceeded its query budget: %d > %d", recorder.name, recorder.total, recorder.budget)
+
+    @staticmethod
+    def _over_budget(scope, recorder: QueryRecorder) -> bool:
+        budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+        if budget is None or recorder.total <= budget:
+            return False
+        recorder.budget = budget
+        return True
+
+    def _strict(self, scope, recorder: QueryRecorder, send):
+        """``send`` holding the response back until it is complete, replaced by a 500 when over budget."""
+        start = None
+        body = []
+
+        async def strict_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            if self._over_budget(scope, recorder):
+                detail = json.dumps({"detail": recorder.budget_error()}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 500,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(detail)).encode())],
+                })
+                await send({"type": "http.response.body", "body": detail})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": b"".join(body)})
+
+        return strict_send
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.record(statement)
+
+
+def instrument_engine(engine):
+    """Feed every statement executed by ``engine`` to the active recorder."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
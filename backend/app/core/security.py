@@ -12,7 +12,18 @@ settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
+import hashlib
+import time
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
+
+# Stored instead of a hash for invite-only accounts: no password verifies against it,
+# so the account can only be used after the invitation's reset link sets a password
+UNUSABLE_PASSWORD = "!"
+
+def has_usable_password(hashed_password: str) -> bool:
+    return bool(hashed_password) and hashed_password != UNUSABLE_PASSWORD
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -22,7 +33,75 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_password_reset_token(user_id: int, expires_delta: timedelta = timedelta(hours=1)) -> str:
+    expire = datetime.utcnow() + expires_delta
+    return jwt.encode({"sub": str(user_id), "exp": expire}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+# Camera credentials: a camera presents one in X-Camera-Token to get its own admission bucket
+# (app/core/admission.py). No jti, so verify_token never accepts one as a user token, and no exp:
+# cameras are provisioned once; changing SECRET_KEY revokes them all.
+CAMERA_TOKEN_TYPE = "camera"
+
+def create_camera_token(camera_id: str) -> str:
+    return jwt.encode({"sub": camera_id, "typ": CAMERA_TOKEN_TYPE}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+@lru_cache(maxsize=4096)
+def camera_identity(token: str) -> Optional[str]:
+    """Camera id signed into ``token``, or None when it is not a valid camera token."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    camera_id = payload.get("sub")
+    if payload.get("typ") != CAMERA_TOKEN_TYPE or not isinstance(camera_id, str) or not camera_id:
+        return None
+    return camera_id
+
+class VerifiedTokenCache:
+    """Bounded LRU of tokens that passed verification, keyed by a digest of the token.
+
+    A hit skips ``jwt.decode`` and the blacklist query; entries are dropped at the
+    token's ``exp`` and evicted explicitly on logout.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> str | None:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        username, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return username
+
+    def put(self, token: str, username: str, expires_at: float):
+        self._entries[self.key(token)] = (username, expires_at)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def evict(self, token: str):
+        self._entries.pop(self.key(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
 async def verify_token(token: str = Depends(oauth2_scheme), db=Depends(get_db)) -> str:
+    username = verified_tokens.get(token)
+    if username is not None:
+        return username
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,4 +122,6 @@ async def verify_token(token: str = Depends(oauth2_scheme), db=Depends(get_db))
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token is blacklisted")
     except JWTError:
         raise credentials_exception
+    if payload.get("exp") is not None:
+        verified_tokens.put(token, username, float(payload["exp"]))
     return username
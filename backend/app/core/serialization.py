@@ -0,0 +1,43 @@
+"""Fast JSON serialization helpers.
+
+``ORJSONResponse`` is the app's default response class. For list endpoints,
+``validate_list`` validates a whole batch of ORM objects with one cached
+pydantic ``TypeAdapter``, and ``trusted_json`` renders an already validated
+(or server-built, hence trusted) payload straight to bytes. Returning a
+``Response`` from a handler makes FastAPI skip validating the payload a second
+time against ``response_model``, which is then only used for the OpenAPI docs.
+"""
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from fastapi_pagination import Page
+from pydantic import TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """Build each TypeAdapter once; constructing one compiles a validator and serializer."""
+    return TypeAdapter(tp)
+
+
+def validate_list(schema: type, items) -> list:
+    """Validate a batch of ORM objects (or dicts) against ``schema`` in a single call."""
+    return type_adapter(list[schema]).validate_python(items, from_attributes=True)
+
+
+def trusted_json(tp: Any, data: Any, status_code: int = 200) -> Response:
+    """Serialize ``data`` of type ``tp`` without validating it again."""
+    return Response(content=type_adapter(tp).dump_json(data), status_code=status_code, media_type="application/json")
+
+
+def trusted_page(schema: type, page) -> Response:
+    """Render a pagination page whose items are already ``schema`` instances."""
+    page_type = Page[schema]
+    return trusted_json(page_type, page_type.model_construct(**dict(page)))
@@ -1,7 +1,32 @@
+"""Database engines and session dependencies.
+
+``get_db`` opens a session on the primary. Listing and reporting endpoints
+use ``get_read_db`` instead, which routes to the read replica at
+``READ_DATABASE_URL`` when one is configured, except:
+
+* for ``READ_STICKY_SECONDS`` after the same client (Authorization header)
+  made a write request, so users read their own writes;
+* while the replica is unreachable or lags more than ``READ_MAX_LAG_SECONDS``
+  (checked at most once per ``READ_LAG_CHECK_SECONDS``).
+
+In both cases the read goes to the primary. Recent writers are tracked in
+memory, at most ``MAX_TRACKED_WRITERS``.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from time import monotonic
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import HTTPConnection
+
 from app.core.config import get_settings
+from app.core.metrics import Counter, registry
 
+logger = logging.getLogger("gatewise.db")
 settings = get_settings()
 DATABASE_URL = settings.DATABASE_URL
 
@@ -13,6 +38,117 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
-async def get_db():
+read_engine = create_async_engine(settings.READ_DATABASE_URL, future=True) if settings.READ_DATABASE_URL else None
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if read_engine else None
+
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+MAX_TRACKED_WRITERS = 10_000
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary would otherwise make the last replay timestamp look old).
+# "Everything it received" only means up to date while the WAL receiver is
+# streaming: once it disconnects the LSNs stay equal however far the primary
+# moves on, so without a streaming receiver the lag is unknown (NULL) and reads
+# go to the primary. Reading pg_stat_wal_receiver.status needs the
+# pg_read_all_stats role (or superuser); without it the status reads as NULL too.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN (SELECT status FROM pg_stat_wal_receiver) IS DISTINCT FROM 'streaming' THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+read_routing = registry.register(Counter(
+    "gatewise_db_read_routing_total", "Read-only sessions by target database and reason.", ("target", "reason"),
+))
+
+_recent_writers: OrderedDict[str, float] = OrderedDict()
+
+
+def _client_key(connection: HTTPConnection) -> str | None:
+    authorization = connection.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.blake2b(authorization.encode(), digest_size=16).hexdigest()
+
+
+def _mark_write(connection: HTTPConnection):
+    key = _client_key(connection)
+    if key is None:
+        return
+    _recent_writers[key] = monotonic()
+    _recent_writers.move_to_end(key)
+    while len(_recent_writers) > MAX_TRACKED_WRITERS:
+        _recent_writers.popitem(last=False)
+
+
+def _wrote_recently(connection: HTTPConnection) -> bool:
+    key = _client_key(connection)
+    written = _recent_writers.get(key) if key else None
+    return written is not None and monotonic() - written < settings.READ_STICKY_SECONDS
+
+
+class ReplicaLagMonitor:
+    def __init__(self):
+        self.healthy = False
+        self.lag: float | None = None
+        self.checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def usable(self) -> bool:
+        """Whether the replica is reachable and within the allowed lag, re-checked periodically."""
+        if self.checked_at is not None and monotonic() - self.checked_at < settings.READ_LAG_CHECK_SECONDS:
+            return self.healthy
+        if self._lock.locked():
+            # Another request is checking; use the previous answer meanwhile
+            return self.healthy
+        async with self._lock:
+            try:
+                async with read_engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+                self.lag = float(lag) if lag is not None else None
+                self.healthy = self.lag is not None and self.lag <= settings.READ_MAX_LAG_SECONDS
+                if self.lag is None:
+                    logger.warning("Read replica is not streaming from the primary; reading from the primary")
+            except Exception:
+                logger.warning("Read replica check failed; reading from the primary", exc_info=True)
+                self.lag = None
+                self.healthy = False
+            self.checked_at = monotonic()
+        return self.healthy
+
+
+replica_lag = ReplicaLagMonitor()
+
+
+async def get_db(connection: HTTPConnection):
     async with AsyncSessionLocal() as session:
         yield session
+    if connection.scope["type"] == "http" and connection.scope["method"] not in READ_ONLY_METHODS:
+        _mark_write(connection)
+
+
+async def read_sessionmaker(connection: HTTPConnection):
+    """Session factory for read-only work: the replica when safe, the primary otherwise."""
+    if ReadSessionLocal is None:
+        factory, target, reason = AsyncSessionLocal, "primary", "no_replica"
+    elif _wrote_recently(connection):
+        factory, target, reason = AsyncSessionLocal, "primary", "sticky"
+    elif not await replica_lag.usable():
+        factory, target, reason = AsyncSessionLocal, "primary", "lagging"
+    else:
+        factory, target, reason = ReadSessionLocal, "replica", "ok"
+    read_routing.inc((target, reason))
+    return factory
+
+
+async def get_read_db(connection: HTTPConnection):
+    """Session for read-only endpoints, see ``read_sessionmaker``."""
+    async with (await read_sessionmaker(connection))() as session:
+        yield session
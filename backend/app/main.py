@@ -9,8 +9,38 @@ from app.api.v1.endpoints.subscriptions import router as subscriptions_router
 from app.api.v1.endpoints.payments import router as payments_router
 from app.api.v1.endpoints.parking_lots import router as parking_lots_router
 from app.api.v1.endpoints import access
+from app.api.v1.endpoints.analytics import router as analytics_router
+from app.api.v1.endpoints.dashboard import router as dashboard_router
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry as metrics_registry
+from app.core import query_profiler
+from app.core.config import get_settings
+from app.core.serialization import ORJSONResponse
+from app.db.session import engine, read_engine
+from app.services.subscription_expiry import expiry_scheduler
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Expiração/renovação de subscrições no momento em que terminam
+    expiry_scheduler.start()
+    yield
+    await expiry_scheduler.stop()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Request/DB metrics, scraped by Prometheus at /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if read_engine is not None:
+    instrument_engine(read_engine)
+
+# Opt-in N+1 detection for development and tests
+if get_settings().QUERY_PROFILING:
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
+    query_profiler.instrument_engine(engine)
+    if read_engine is not None:
+        query_profiler.instrument_engine(read_engine)
 
 # Configure CORS
 from fastapi.middleware.cors import CORSMiddleware
@@ -45,5 +75,13 @@ app.include_router(subscriptions_router, prefix="/api/v1/subscriptions")
 # Payments endpoints: /api/v1/payments
 app.include_router(payments_router, prefix="/api/v1/payments")
 app.include_router(access.router, prefix="/api/v1")
+# Analytics endpoints (rollup tables only): /api/v1/analytics
+app.include_router(analytics_router, prefix="/api/v1/analytics")
+# Admin dashboard overview: /api/v1/dashboard
+app.include_router(dashboard_router, prefix="/api/v1/dashboard")
 
 add_pagination(app)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,18 +1,38 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
+import enum
+
+class AccessDirection(str, enum.Enum):
+    entry = "entry"
+    exit = "exit"
 
 class AccessLog(Base):
     __tablename__ = "access_logs"
 
     id = Column(Integer, primary_key=True, index=True)
     license_plate = Column(String, index=True, nullable=False)
+    # Registered plate (normalized) the read was identified as; differs from the read for OCR misreads
+    matched_plate = Column(String, index=True, nullable=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     granted = Column(Boolean, nullable=False)
     reason = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lot_id = Column(Integer, ForeignKey("parking_lots.id"), nullable=True)
+    gate_id = Column(Integer, ForeignKey("gates.id"), nullable=True)
+    direction = Column(String, nullable=True)  # entry, exit
+    # Identical checks collapsed into this row and the time of the last one
+    repeat_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = Column(DateTime, nullable=True)
 
     vehicle = relationship("Vehicle")
     user = relationship("User")
+
+    __table_args__ = (
+        Index("ix_access_logs_lot_id_timestamp", "lot_id", "timestamp"),
+        Index("ix_access_logs_timestamp", "timestamp"),
+    )
+
+from app.models.gate import Gate
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
+from sqlalchemy.orm import declared_attr
+from app.models.base import Base
+
+class AccessRollupMixin:
+    """Access event counts per time bucket and dimension, maintained as events are written."""
+    id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime, nullable=False)
+    lot_id = Column(Integer, nullable=True)
+    granted = Column(Boolean, nullable=False)
+    reason = Column(String, nullable=False)
+    vehicle_type = Column(String, nullable=True)  # None when the plate is unknown
+    user_type = Column(String, nullable=True)
+    events = Column(Integer, nullable=False, default=0)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            # Upsert target; NULL dimensions (no lot, unknown vehicle) must still collide
+            Index(
+                f"ux_{cls.__tablename__}_bucket_dims",
+                "bucket_start", "lot_id", "granted", "reason", "vehicle_type", "user_type",
+                unique=True,
+                postgresql_nulls_not_distinct=True,
+            ),
+        )
+
+class AccessRollupHourly(AccessRollupMixin, Base):
+    __tablename__ = "access_rollups_hourly"
+
+class AccessRollupDaily(AccessRollupMixin, Base):
+    __tablename__ = "access_rollups_daily"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+class Gate(Base):
+    __tablename__ = "gates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    lot_id = Column(Integer, ForeignKey("parking_lots.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+
+    lot = relationship("ParkingLot")
+
+from app.models.parking_lot import ParkingLot
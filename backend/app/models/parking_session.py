@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.models.base import Base
+from app.models.vehicle import VehicleType
+
+class ParkingSession(Base):
+    """A vehicle's stay in a lot: opened by an entry check, closed by the matching exit."""
+    __tablename__ = "parking_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    license_plate = Column(String, nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    vehicle_type = Column(Enum(VehicleType), nullable=False)
+    lot_id = Column(Integer, ForeignKey("parking_lots.id"), nullable=True)
+    entry_gate_id = Column(Integer, ForeignKey("gates.id"), nullable=True)
+    exit_gate_id = Column(Integer, ForeignKey("gates.id"), nullable=True)
+    entered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    exited_at = Column(DateTime, nullable=True)
+
+    vehicle = relationship("Vehicle")
+
+    __table_args__ = (
+        # At most one open session per vehicle; also serves "who is inside now"
+        Index("ux_parking_sessions_open_vehicle", "vehicle_id", unique=True, postgresql_where=text("exited_at IS NULL")),
+        Index("ix_parking_sessions_open_lot", "lot_id", "entered_at", postgresql_where=text("exited_at IS NULL")),
+    )
+
+from app.models.vehicle import Vehicle
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -21,5 +21,14 @@ class ParkingSpace(Base):
     is_allocated = Column(Boolean, nullable=False, default=False)
     is_occupied = Column(Boolean, nullable=False, default=False)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
+    lot_id = Column(Integer, ForeignKey("parking_lots.id"), nullable=True)
 
     vehicle = relationship("Vehicle")
+
+    __table_args__ = (
+        # Free spaces by lot and type, used by the allocator (app/services/parking_allocator.py)
+        Index("ix_parking_spaces_free_by_lot_type", "lot_id", "type", "id", postgresql_where=text("NOT is_allocated")),
+        Index("ix_parking_spaces_lot_id_id", "lot_id", "id"),
+    )
+
+from app.models.parking_lot import ParkingLot
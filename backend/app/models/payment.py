@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
@@ -12,3 +12,8 @@ class Payment(Base):
     status = Column(String, default="paid")  # paid, pending, failed
 
     subscription = relationship("Subscription", back_populates="payments")
+
+    __table_args__ = (
+        Index("ix_payments_subscription_id_status_paid_at", "subscription_id", "status", "paid_at"),
+        Index("ix_payments_paid_at_paid", "paid_at", postgresql_where=text("status = 'paid'")),
+    )
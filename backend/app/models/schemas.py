@@ -1,5 +1,6 @@
 from pydantic import BaseModel, validator
 from datetime import datetime
+from app.models.parking_space import ParkingSpaceType
 
 class LoginRequest(BaseModel):
     username: str
@@ -65,6 +66,11 @@ class SubscriptionWithDetailsOut(SubscriptionOut):
 class ParkingSpaceAllocation(BaseModel):
     parking_space_ids: list[int]
 
+class ParkingSpaceAutoAllocation(BaseModel):
+    space_type: ParkingSpaceType = ParkingSpaceType.regular
+    count: int
+    lot_id: int | None = None
+
 class SubscriptionParkingSpacesOut(BaseModel):
     parking_spaces: list['ParkingSpaceOut']
 
@@ -81,6 +87,25 @@ class PaymentOut(BaseModel):
     class Config:
         from_attributes = True
 
+class PaymentSettlementItem(BaseModel):
+    # Either a payment id, or a subscription id with the amount received
+    payment_id: int | None = None
+    subscription_id: int | None = None
+    amount: float | None = None
+
+class PaymentSettlementResult(BaseModel):
+    index: int
+    payment_id: int | None = None
+    subscription_id: int | None = None
+    status: str  # settled, created, already_paid, not_found, invalid, duplicate
+    detail: str = ""
+
+class PaymentSettlementReport(BaseModel):
+    total: int
+    settled: int
+    failed: int
+    results: list[PaymentSettlementResult]
+
 class PaymentWithDetailsOut(BaseModel):
     id: int
     subscription_id: int
@@ -95,11 +120,17 @@ class PaymentWithDetailsOut(BaseModel):
 class AccessLogOut(BaseModel):
     id: int
     license_plate: str
+    matched_plate: str | None = None
     vehicle_id: int | None
     user_id: int | None
     granted: bool
     reason: str
     timestamp: datetime
+    lot_id: int | None = None
+    gate_id: int | None = None
+    direction: str | None = None
+    repeat_count: int = 1
+    last_seen_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -107,9 +138,11 @@ class AccessLogOut(BaseModel):
 class AccessLogUserOut(BaseModel):
     id: int
     license_plate: str
+    matched_plate: str | None = None
     granted: bool
     reason: str
     timestamp: datetime
+    repeat_count: int = 1
 
     class Config:
         from_attributes = True
@@ -132,6 +165,7 @@ class ParkingSpaceUpdate(BaseModel):
     type: str | None = None
     is_allocated: bool | None = None
     is_occupied: bool | None = None
+    lot_id: int | None = None
 
 class ParkingSpaceOut(BaseModel):
     id: int
@@ -140,6 +174,7 @@ class ParkingSpaceOut(BaseModel):
     type: str
     is_allocated: bool
     is_occupied: bool
+    lot_id: int | None = None
 
     class Config:
         from_attributes = True
@@ -163,6 +198,17 @@ class ParkingLotOut(BaseModel):
     class Config:
         from_attributes = True
 
+class GateCreate(BaseModel):
+    name: str
+
+class GateOut(BaseModel):
+    id: int
+    lot_id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
 class UserShortOut(BaseModel):
     id: int
     email: str
@@ -185,3 +231,142 @@ class VehicleOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+class LotOccupancyOut(BaseModel):
+    space_type: str
+    total: int
+    allocated: int
+    occupied: int
+
+class ParkingSessionOut(BaseModel):
+    id: int
+    license_plate: str
+    vehicle_id: int
+    vehicle_type: str
+    lot_id: int | None = None
+    entry_gate_id: int | None = None
+    exit_gate_id: int | None = None
+    entered_at: datetime
+    exited_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+class LiveOccupancyOut(BaseModel):
+    lot_id: int | None
+    vehicle_type: str
+    inside: int
+
+class AccessSeriesPoint(BaseModel):
+    bucket_start: datetime
+    key: str | int | None = None
+    granted: int
+    denied: int
+
+class FraudAlertOut(BaseModel):
+    kind: str
+    license_plate: str
+    timestamp: datetime
+    detail: str
+    user_id: int | None = None
+    gate_id: int | None = None
+
+    class Config:
+        from_attributes = True
+
+class AdmissionClientOut(BaseModel):
+    client: str
+    tokens: float
+    admitted: int
+    rejected: int
+
+class AdmissionOut(BaseModel):
+    in_flight: int
+    max_concurrent: int
+    rate_per_second: float
+    burst: int
+    clients: list[AdmissionClientOut]
+
+class CameraTokenIn(BaseModel):
+    camera_id: str
+
+    @validator("camera_id")
+    def camera_id_not_blank(cls, v):
+        v = v.strip()
+        if not v or len(v) > 64:
+            raise ValueError("camera_id must have 1 to 64 characters")
+        return v
+
+class CameraTokenOut(BaseModel):
+    camera_id: str
+    token: str
+
+class VehicleImportRowResult(BaseModel):
+    row: int
+    license_plate: str | None = None
+    status: str  # created, invalid, duplicate, exists
+    detail: str = ""
+    vehicle_id: int | None = None
+
+class VehicleImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    rows: list[VehicleImportRowResult]
+
+class UserImportRowResult(BaseModel):
+    row: int
+    username: str
+    email: str
+    status: str  # created, invalid, duplicate, exists
+    detail: str = ""
+    user_id: int | None = None
+
+class UserImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    rows: list[UserImportRowResult]
+    invitation_job_id: str | None = None
+
+class JobStatusOut(BaseModel):
+    id: str
+    kind: str
+    state: str
+    total: int
+    processed: int
+    failed: int
+    errors: list[str]
+    created_at: datetime
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+class DashboardPaymentsOut(BaseModel):
+    paid_this_month: float
+    pending_count: int
+    pending_amount: float
+    expected_this_month: float
+
+class DashboardSpacesOut(BaseModel):
+    total: int
+    allocated: int
+    occupied: int
+    vehicles_inside: int
+
+class DashboardSubscriptionsOut(BaseModel):
+    active: int
+    expiring_7d: int
+
+class DashboardAccessOut(BaseModel):
+    granted_24h: int
+    denied_24h: int
+    recent: list[AccessLogOut]
+
+class DashboardOverviewOut(BaseModel):
+    generated_at: datetime
+    payments: DashboardPaymentsOut
+    spaces: DashboardSpacesOut
+    subscriptions: DashboardSubscriptionsOut
+    access: DashboardAccessOut
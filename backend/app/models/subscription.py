@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 import sqlalchemy as sa
 from datetime import datetime
@@ -19,6 +19,12 @@ class Subscription(Base):
     plan = relationship("Plan")
     user = relationship("User")
 
+    __table_args__ = (
+        # Subscrições ativas por data de fim (ExpiryScheduler e job de expiração)
+        Index("ix_subscriptions_active_end_date", "end_date", postgresql_where=text("status = 'active'")),
+        Index("ix_subscriptions_user_id_status", "user_id", "status"),
+    )
+
 # Corrige relacionamento circular
 from app.models.subscription_parking_space import SubscriptionParkingSpace
 Subscription.parking_spaces = relationship("SubscriptionParkingSpace", back_populates="subscription")
@@ -30,3 +36,6 @@ Subscription.payments = relationship("Payment", back_populates="subscription")
 # Corrige relacionamento circular
 from app.models.subscription_parking_space import SubscriptionParkingSpace
 Subscription.parking_spaces = relationship("SubscriptionParkingSpace", back_populates="subscription")
+
+from app.models.plan import Plan
+from app.models.user import User
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -10,3 +10,7 @@ class SubscriptionParkingSpace(Base):
     order = Column(Integer, nullable=False)  # New column to store allocation order
 
     subscription = relationship("Subscription", back_populates="parking_spaces")
+
+    __table_args__ = (
+        Index("ix_subscription_parking_spaces_subscription_id_order", "subscription_id", "order"),
+    )
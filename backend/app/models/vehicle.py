@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -20,7 +20,16 @@ class Vehicle(Base):
     type = Column(Enum(VehicleType), nullable=False, default=VehicleType.car)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     owner = relationship("User", back_populates="vehicles")
 
+    __table_args__ = (
+        # "AA-11-BB" e "AA11BB" são a mesma matrícula (ver plate_index.normalize_plate)
+        Index(
+            "ux_vehicles_normalized_plate",
+            text("regexp_replace(upper(license_plate), '[^A-Z0-9]', '', 'g')"),
+            unique=True,
+        ),
+    )
+
 from app.models.user import User
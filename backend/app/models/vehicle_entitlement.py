@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.models.base import Base
+
+class VehicleEntitlement(Base):
+    """Denormalized access rights per registered plate, maintained by app/services/entitlements.py."""
+    __tablename__ = "vehicle_entitlements"
+
+    # Plate upper-cased with everything but letters and digits stripped
+    plate = Column(String, primary_key=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    vehicle_type = Column(String, nullable=False)
+    owner_type = Column(String, nullable=False)
+    # End of the owner's latest active subscription; None when there is none
+    valid_until = Column(DateTime, nullable=True)
+    subscription_id = Column(Integer, nullable=True)
+    plan_id = Column(Integer, nullable=True)
+    space_types = Column(ARRAY(String), nullable=False, default=list)
@@ -0,0 +1,103 @@
+"""Coalescing of repeated access checks for the same plate.
+
+Cameras submit the same read several times a second. Checks are keyed by
+(normalized plate, gate, direction):
+
+* single-flight: while a check for a key is being evaluated, identical checks
+  wait for its result instead of running the lookup path themselves;
+* collapsing: for ``ACCESS_REPEAT_WINDOW_SECONDS`` after it completes, an
+  identical check returns the same result.
+
+Either way the repeat costs one UPDATE bumping ``repeat_count`` and
+``last_seen_at`` on the first check's log row, instead of a full evaluation
+and a new row. Repeats are not fed again to parking sessions, rollups or the
+fraud detector: they are the same physical event.
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, registry
+from app.models.access_log import AccessLog
+
+settings = get_settings()
+
+MAX_RECENT = 10_000
+
+coalesced_checks = registry.register(Counter(
+    "gatewise_access_checks_coalesced_total", "Access checks answered from an identical check.", ("mode",),
+))
+
+
+class AccessCoalescer:
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self.in_flight: dict[Hashable, asyncio.Future] = {}
+        # key -> (completed at, result, log id), oldest first
+        self.recent: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+
+    def _expire(self, now: float):
+        while self.recent:
+            key, (completed, _, _) = next(iter(self.recent.items()))
+            if now - completed < self.window and len(self.recent) <= MAX_RECENT:
+                break
+            del self.recent[key]
+
+    async def check(
+        self, db: AsyncSession, key: Hashable, evaluate: Callable[[], Awaitable[tuple[Any, int]]]
+    ):
+        """Return ``evaluate()``'s result, sharing it between identical checks.
+
+        ``evaluate`` runs the check and returns ``(result, access log id)``.
+        """
+        now = monotonic()
+        self._expire(now)
+        recent = self.recent.get(key)
+        if recent:
+            coalesced_checks.inc(("collapsed",))
+            await record_repeat(db, recent[2])
+            return recent[1]
+        flight = self.in_flight.get(key)
+        if flight:
+            coalesced_checks.inc(("single_flight",))
+            try:
+                # shield: a follower disconnecting must not cancel the leader's evaluation
+                result, log_id = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The leader failed: evaluate on our own (or follow a new leader)
+                return await self.check(db, key, evaluate)
+            await record_repeat(db, log_id)
+            return result
+
+        flight = self.in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result, log_id = await evaluate()
+        except BaseException:
+            flight.cancel()
+            raise
+        finally:
+            del self.in_flight[key]
+        flight.set_result((result, log_id))
+        if self.window > 0:
+            self.recent[key] = (monotonic(), result, log_id)
+        return result
+
+
+async def record_repeat(db: AsyncSession, log_id: int):
+    await db.execute(
+        update(AccessLog)
+        .where(AccessLog.id == log_id)
+        .values(repeat_count=AccessLog.repeat_count + 1, last_seen_at=datetime.utcnow())
+    )
+    await db.commit()
+
+
+coalescer = AccessCoalescer(settings.ACCESS_REPEAT_WINDOW_SECONDS)
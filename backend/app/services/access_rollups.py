@@ -0,0 +1,143 @@
+"""Hourly and daily rollups of access events.
+
+Every access check upserts its event into ``access_rollups_hourly`` and
+``access_rollups_daily`` with one statement in the same transaction as the
+access log row, so the rollups are exactly as durable as the logs. Analytics
+endpoints read only these tables: a 90-day daily chart is at most a few rows
+per day and dimension instead of a scan of ``access_logs``.
+
+``backfill`` rebuilds past buckets from the logs and is idempotent; only
+complete hours (before the current one) are rebuilt, since those no longer
+receive live events.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, cast, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.access_log import AccessLog
+from app.models.access_rollup import AccessRollupDaily, AccessRollupHourly
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+DIMENSIONS = ("lot_id", "granted", "reason", "vehicle_type", "user_type")
+GROUPABLE = ("lot_id", "reason", "vehicle_type", "user_type")
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _upsert(model, bucket_start: datetime, dims: dict):
+    stmt = insert(model).values(bucket_start=bucket_start, events=1, **dims)
+    return stmt.on_conflict_do_update(
+        index_elements=["bucket_start", *DIMENSIONS],
+        set_={"events": model.events + 1},
+    )
+
+
+def rollup_statement(timestamp: datetime, **dims):
+    """Both upserts as a single statement: the hourly one runs as a data-modifying CTE."""
+    hourly = _upsert(AccessRollupHourly, hour_start(timestamp), dims).returning(AccessRollupHourly.id).cte("hourly_rollup")
+    return _upsert(AccessRollupDaily, day_start(timestamp), dims).add_cte(hourly)
+
+
+async def record_access_event(
+    db: AsyncSession,
+    timestamp: datetime,
+    lot_id: int | None,
+    granted: bool,
+    reason: str,
+    vehicle_type: str | None = None,
+    user_type: str | None = None,
+):
+    """Count one access event in the rollups; runs inside the caller's transaction."""
+    await db.execute(rollup_statement(
+        timestamp, lot_id=lot_id, granted=granted, reason=reason, vehicle_type=vehicle_type, user_type=user_type,
+    ))
+
+
+async def backfill(db: AsyncSession, since: datetime, until: datetime | None = None) -> tuple[datetime, datetime]:
+    """Rebuild hourly buckets in [since, until) from ``access_logs`` and the daily buckets they cover.
+
+    ``until`` is capped at the start of the current hour. Returns the rebuilt range.
+    """
+    current_hour = hour_start(datetime.utcnow())
+    since = hour_start(since)
+    until = min(hour_start(until), current_hour) if until else current_hour
+    if since >= until:
+        return since, until
+
+    # Inlined so the GROUP BY expression matches the selected one
+    hour = func.date_trunc(literal_column("'hour'"), AccessLog.timestamp)
+    await db.execute(delete(AccessRollupHourly).where(
+        AccessRollupHourly.bucket_start >= since, AccessRollupHourly.bucket_start < until,
+    ))
+    await db.execute(insert(AccessRollupHourly).from_select(
+        ["bucket_start", *DIMENSIONS, "events"],
+        select(
+            hour,
+            AccessLog.lot_id,
+            AccessLog.granted,
+            AccessLog.reason,
+            cast(Vehicle.type, String),
+            cast(User.type, String),
+            func.count(),
+        )
+        .select_from(AccessLog)
+        .outerjoin(Vehicle, Vehicle.id == AccessLog.vehicle_id)
+        .outerjoin(User, User.id == AccessLog.user_id)
+        .where(AccessLog.timestamp >= since, AccessLog.timestamp < until)
+        .group_by(hour, AccessLog.lot_id, AccessLog.granted, AccessLog.reason, Vehicle.type, User.type),
+    ))
+
+    # Days touched by the range are re-summed from their hourly rows, including live ones
+    first_day, end_day = day_start(since), day_start(until - timedelta(microseconds=1)) + timedelta(days=1)
+    day = func.date_trunc(literal_column("'day'"), AccessRollupHourly.bucket_start)
+    await db.execute(delete(AccessRollupDaily).where(
+        AccessRollupDaily.bucket_start >= first_day, AccessRollupDaily.bucket_start < end_day,
+    ))
+    await db.execute(insert(AccessRollupDaily).from_select(
+        ["bucket_start", *DIMENSIONS, "events"],
+        select(day, *(getattr(AccessRollupHourly, dim) for dim in DIMENSIONS), func.sum(AccessRollupHourly.events))
+        .where(AccessRollupHourly.bucket_start >= first_day, AccessRollupHourly.bucket_start < end_day)
+        .group_by(day, *(getattr(AccessRollupHourly, dim) for dim in DIMENSIONS)),
+    ))
+    return since, until
+
+
+async def access_series(
+    db: AsyncSession,
+    granularity: str,
+    since: datetime,
+    until: datetime,
+    lot_id: int | None = None,
+    group_by: str | None = None,
+):
+    """Granted/denied counts per bucket (and per ``group_by`` value), read from the rollups only."""
+    model = AccessRollupHourly if granularity == "hour" else AccessRollupDaily
+    group_columns = [model.bucket_start]
+    if group_by:
+        key = getattr(model, group_by)
+        group_columns.append(key)
+    else:
+        key = literal(None)
+    query = (
+        select(
+            model.bucket_start,
+            key.label("key"),
+            func.coalesce(func.sum(model.events).filter(model.granted), 0).label("granted"),
+            func.coalesce(func.sum(model.events).filter(~model.granted), 0).label("denied"),
+        )
+        .where(model.bucket_start >= since, model.bucket_start < until)
+        .group_by(*group_columns)
+        .order_by(*group_columns)
+    )
+    if lot_id is not None:
+        query = query.where(model.lot_id == lot_id)
+    return (await db.execute(query)).all()
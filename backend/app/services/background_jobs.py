@@ -0,0 +1,68 @@
+"""In-process background jobs with progress reporting.
+
+``start_job`` runs a coroutine as an asyncio task and hands it a
+``JobStatus`` to update; clients poll the status by id. Statuses live in
+process memory, the most recent ``MAX_JOBS`` are kept, and they do not
+survive a restart.
+"""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("gatewise.jobs")
+
+MAX_JOBS = 100
+
+
+class JobStatus:
+    def __init__(self, kind: str, total: int):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = "queued"  # queued, running, done, failed
+        self.total = total
+        self.processed = 0
+        self.failed = 0
+        self.errors: list[str] = []
+        self.created_at = datetime.utcnow()
+        self.finished_at: datetime | None = None
+
+    def error(self, message: str):
+        # Keep the report bounded for very large jobs
+        if len(self.errors) < 100:
+            self.errors.append(message)
+
+
+_jobs: OrderedDict[str, JobStatus] = OrderedDict()
+_tasks: set[asyncio.Task] = set()
+
+
+def start_job(kind: str, total: int, work: Callable[[JobStatus], Awaitable[None]]) -> JobStatus:
+    job = JobStatus(kind, total)
+    _jobs[job.id] = job
+    while len(_jobs) > MAX_JOBS:
+        _jobs.popitem(last=False)
+
+    async def run():
+        job.state = "running"
+        try:
+            await work(job)
+            job.state = "done"
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, kind)
+            job.state = "failed"
+            job.error(str(exc))
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    task = asyncio.create_task(run())
+    # The event loop only keeps weak references to tasks
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def get_job(job_id: str) -> JobStatus | None:
+    return _jobs.get(job_id)
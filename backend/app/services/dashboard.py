@@ -0,0 +1,130 @@
+"""Admin dashboard overview in one round of concurrent aggregate queries.
+
+Each section of the overview is a single aggregate statement (``FILTER``
+clauses instead of one query per figure) run on its own pooled session, and
+the sections run concurrently, so building the overview takes about as long
+as its slowest statement. The result is cached for
+``DASHBOARD_CACHE_SECONDS``; concurrent requests on a cold cache share one
+computation.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from time import monotonic
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.core.config import get_settings
+from app.models.access_log import AccessLog
+from app.models.access_rollup import AccessRollupHourly
+from app.models.parking_session import ParkingSession
+from app.models.parking_space import ParkingSpace
+from app.models.payment import Payment
+from app.models.schemas import (
+    AccessLogOut, DashboardAccessOut, DashboardOverviewOut, DashboardPaymentsOut,
+    DashboardSpacesOut, DashboardSubscriptionsOut,
+)
+from app.models.subscription import Subscription
+
+settings = get_settings()
+
+RECENT_ACCESS_LOGS = 10
+EXPIRING_WINDOW = timedelta(days=7)
+
+
+def _month_start(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+async def _payments(db, now):
+    paid = (Payment.status == "paid") & (Payment.paid_at >= _month_start(now))
+    pending = Payment.status == "pending"
+    row = (await db.execute(select(
+        func.coalesce(func.sum(Payment.amount).filter(paid), 0.0),
+        func.count().filter(pending),
+        func.coalesce(func.sum(Payment.amount).filter(pending), 0.0),
+    ))).one()
+    return DashboardPaymentsOut(
+        paid_this_month=row[0], pending_count=row[1], pending_amount=row[2], expected_this_month=row[0] + row[2],
+    )
+
+
+async def _spaces(db, now):
+    inside = select(func.count()).where(ParkingSession.exited_at.is_(None)).scalar_subquery()
+    row = (await db.execute(select(
+        func.count(),
+        func.count().filter(ParkingSpace.is_allocated),
+        func.count().filter(ParkingSpace.is_occupied),
+        inside,
+    ).select_from(ParkingSpace))).one()
+    return DashboardSpacesOut(total=row[0], allocated=row[1], occupied=row[2], vehicles_inside=row[3])
+
+
+async def _subscriptions(db, now):
+    active = Subscription.status == "active"
+    row = (await db.execute(select(
+        func.count().filter(active),
+        func.count().filter(active, Subscription.end_date < now + EXPIRING_WINDOW),
+    ))).one()
+    return DashboardSubscriptionsOut(active=row[0], expiring_7d=row[1])
+
+
+async def _access_counts(db, now):
+    # From the hourly rollups: the last 24 full hours plus the current one
+    since = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=24)
+    row = (await db.execute(select(
+        func.coalesce(func.sum(AccessRollupHourly.events).filter(AccessRollupHourly.granted), 0),
+        func.coalesce(func.sum(AccessRollupHourly.events).filter(~AccessRollupHourly.granted), 0),
+    ).where(AccessRollupHourly.bucket_start >= since))).one()
+    return row[0], row[1]
+
+
+async def _recent_access(db, now):
+    result = await db.execute(select(AccessLog).order_by(AccessLog.timestamp.desc()).limit(RECENT_ACCESS_LOGS))
+    return [AccessLogOut.model_validate(log) for log in result.scalars().all()]
+
+
+async def _run(session_factory, section, now):
+    async with session_factory() as db:
+        return await section(db, now)
+
+
+async def build_overview(session_factory) -> DashboardOverviewOut:
+    now = datetime.utcnow()
+    payments, spaces, subscriptions, (granted, denied), recent = await asyncio.gather(*(
+        _run(session_factory, section, now)
+        for section in (_payments, _spaces, _subscriptions, _access_counts, _recent_access)
+    ))
+    return DashboardOverviewOut(
+        generated_at=now,
+        payments=payments,
+        spaces=spaces,
+        subscriptions=subscriptions,
+        access=DashboardAccessOut(granted_24h=granted, denied_24h=denied, recent=recent),
+    )
+
+
+class OverviewCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._value: DashboardOverviewOut | None = None
+        self._expires_at = 0.0
+        self._building: asyncio.Task | None = None
+
+    async def get(self, session_factory) -> DashboardOverviewOut:
+        if self._value is not None and monotonic() < self._expires_at:
+            return self._value
+        if self._building is None:
+            self._building = asyncio.create_task(build_overview(session_factory))
+            self._building.add_done_callback(self._store)
+        # shield: one caller disconnecting must not cancel the build the others wait for
+        return await asyncio.shield(self._building)
+
+    def _store(self, task: asyncio.Task):
+        self._building = None
+        if not task.cancelled() and task.exception() is None:
+            self._value = task.result()
+            self._expires_at = monotonic() + self.ttl
+
+
+overview_cache = OverviewCache(settings.DASHBOARD_CACHE_SECONDS)
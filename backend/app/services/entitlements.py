@@ -0,0 +1,140 @@
+"""Per-vehicle entitlements for single-lookup access decisions.
+
+``vehicle_entitlements`` holds, per normalized plate, everything the access
+check needs: owner, vehicle and owner type, the end of the owner's latest
+active subscription (``valid_until``), its plan and the space types
+allocated to the owner's active subscriptions. The access check is then one
+primary-key lookup followed by an exact ``valid_until > now`` comparison, so
+an expired subscription is refused even before the hourly job marks it
+inactive.
+
+Every write that changes an owner's vehicles, subscriptions, allocations or
+payments calls ``refresh_owner_entitlements`` in its own transaction, right
+before committing, so the table never disagrees with committed data.
+"""
+from datetime import datetime
+
+from sqlalchemy import String, cast, delete, func, select, true
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parking_space import ParkingSpace
+from app.models.subscription import Subscription
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+from app.models.user import User
+from app.models.vehicle import Vehicle
+from app.models.vehicle_entitlement import VehicleEntitlement
+
+# Session.info key collecting the plates whose entitlements changed in the current transaction
+CHANGED_PLATES = "entitlements_changed_plates"
+
+COLUMNS = (
+    "plate", "vehicle_id", "owner_id", "vehicle_type", "owner_type",
+    "valid_until", "subscription_id", "plan_id", "space_types",
+)
+
+
+def normalized_plate(column):
+    """SQL twin of ``app.services.plate_index.normalize_plate``."""
+    return func.regexp_replace(func.upper(column), "[^A-Z0-9]", "", "g")
+
+
+def _entitlement_rows(owner_id: int | None):
+    latest = (
+        select(Subscription.id, Subscription.plan_id, Subscription.end_date)
+        .where(Subscription.user_id == Vehicle.owner_id, Subscription.status == "active")
+        .order_by(Subscription.end_date.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    space_types = (
+        select(func.coalesce(func.array_agg(cast(ParkingSpace.type, String).distinct()), postgresql.array([], type_=String)))
+        .select_from(SubscriptionParkingSpace)
+        .join(ParkingSpace, ParkingSpace.id == SubscriptionParkingSpace.parking_space_id)
+        .join(Subscription, Subscription.id == SubscriptionParkingSpace.subscription_id)
+        .where(Subscription.user_id == Vehicle.owner_id, Subscription.status == "active")
+        .scalar_subquery()
+    )
+    rows = (
+        select(
+            normalized_plate(Vehicle.license_plate).label("plate"),
+            Vehicle.id.label("vehicle_id"),
+            Vehicle.owner_id,
+            cast(Vehicle.type, String).label("vehicle_type"),
+            cast(User.type, String).label("owner_type"),
+            latest.c.end_date.label("valid_until"),
+            latest.c.id.label("subscription_id"),
+            latest.c.plan_id,
+            space_types.label("space_types"),
+        )
+        .select_from(Vehicle)
+        .join(User, User.id == Vehicle.owner_id)
+        .outerjoin(latest, true())
+    )
+    if owner_id is not None:
+        rows = rows.where(Vehicle.owner_id == owner_id)
+    rows = rows.subquery("entitled")
+    # Plates differing only in punctuation normalize alike; the oldest vehicle wins. Selecting from
+    # a subquery also keeps the join's trailing ON away from the INSERT's ON CONFLICT.
+    return select(*(rows.c[name] for name in COLUMNS)).distinct(rows.c.plate).order_by(rows.c.plate, rows.c.vehicle_id)
+
+
+def upsert_statement(owner_id: int | None = None):
+    stmt = insert(VehicleEntitlement).from_select(list(COLUMNS), _entitlement_rows(owner_id))
+    # A plate normalizing like another owner's keeps that owner's entitlement: a refresh
+    # never takes over a plate it does not own (the vehicle endpoints reject such plates)
+    return stmt.on_conflict_do_update(
+        index_elements=[VehicleEntitlement.plate],
+        set_={name: stmt.excluded[name] for name in COLUMNS if name != "plate"},
+        where=VehicleEntitlement.owner_id == stmt.excluded.owner_id,
+    )
+
+
+def _record_changed(db: AsyncSession, plates):
+    # Announced to connected gate controllers once the transaction commits (app/services/gate_channel.py)
+    db.info.setdefault(CHANGED_PLATES, set()).update(plates)
+
+
+async def remove_entitlements(db: AsyncSession, *criteria):
+    """Delete the entitlements matching ``criteria`` inside the caller's transaction.
+
+    Deleting a vehicle or user must go through here first: the FK cascade would
+    drop the rows without recording the plates, so no invalidation would be sent.
+    """
+    removed = await db.execute(delete(VehicleEntitlement).where(*criteria).returning(VehicleEntitlement.plate))
+    _record_changed(db, removed.scalars().all())
+
+
+async def refresh_owner_entitlements(db: AsyncSession, owner_id: int):
+    """Recompute the entitlements of every vehicle of ``owner_id`` inside the caller's transaction."""
+    current_plates = select(normalized_plate(Vehicle.license_plate)).where(Vehicle.owner_id == owner_id)
+    # Plates that were renamed or deleted
+    await remove_entitlements(
+        db, VehicleEntitlement.owner_id == owner_id, VehicleEntitlement.plate.not_in(current_plates),
+    )
+    refreshed = await db.execute(upsert_statement(owner_id).returning(VehicleEntitlement.plate))
+    _record_changed(db, refreshed.scalars().all())
+
+
+async def rebuild_entitlements(db: AsyncSession):
+    """Recompute the whole table, e.g. after loading data out of band."""
+    await db.execute(delete(VehicleEntitlement))
+    await db.execute(upsert_statement())
+
+
+def rebuild_sql() -> list[str]:
+    """``rebuild_entitlements`` as plain SQL, for tools that talk to asyncpg directly."""
+    dialect = postgresql.dialect()
+    return [
+        str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        for statement in (delete(VehicleEntitlement), upsert_statement())
+    ]
+
+
+async def lookup_entitlement(db: AsyncSession, plate: str) -> VehicleEntitlement | None:
+    return await db.get(VehicleEntitlement, plate)
+
+
+def is_entitled(entitlement: VehicleEntitlement, now: datetime) -> bool:
+    return entitlement.valid_until is not None and entitlement.valid_until > now
@@ -0,0 +1,154 @@
+"""Streaming fraud detection over access events.
+
+``check_vehicle_access`` feeds every event it has just written to
+``detector.observe``. The detector only looks at state it keeps in memory, so
+it never adds a query to the access path:
+
+* ``double_entry``: a plate is granted entry again without an exit in between.
+  A repeat at the same gate within ``FRAUD_REREAD_SECONDS`` of the previous one
+  is the camera reading the same car again (after the coalescing window in
+  app/services/access_coalescing.py has closed) and is not an alert;
+* ``denied_burst``: a plate is denied ``FRAUD_DENIED_BURST`` times within
+  ``FRAUD_DENIED_WINDOW_SECONDS``;
+* ``gate_hop``: plates of the same owner (hence the same subscription) pass
+  different gates in the same direction within ``FRAUD_GATE_HOP_SECONDS``,
+  e.g. a cloned plate. Entering at one gate and leaving at another is a normal
+  visit and is not compared.
+
+Per-plate and per-owner windows are bounded deques, and at most
+``FRAUD_MAX_TRACKED_PLATES`` plates/owners are tracked, least recently seen
+evicted first. The same detector runs over historical logs in ``replay_fraud.py``.
+"""
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, registry
+
+logger = logging.getLogger("gatewise.fraud")
+settings = get_settings()
+
+fraud_alerts = registry.register(Counter(
+    "gatewise_fraud_alerts_total", "Fraud alerts raised by the streaming detector.", ("kind",),
+))
+
+
+@dataclass(slots=True)
+class AccessEvent:
+    timestamp: datetime
+    license_plate: str
+    granted: bool
+    direction: str | None = None
+    gate_id: int | None = None
+    user_id: int | None = None
+
+
+@dataclass(slots=True)
+class FraudAlert:
+    kind: str
+    license_plate: str
+    timestamp: datetime
+    detail: str
+    user_id: int | None = None
+    gate_id: int | None = None
+
+
+class _PlateState:
+    __slots__ = ("inside", "entry_gate", "entry_seen", "denied")
+
+    def __init__(self, burst: int):
+        self.inside = False
+        # Gate and time of the latest granted entry read, to recognise re-reads
+        self.entry_gate: int | None = None
+        self.entry_seen: datetime | None = None
+        self.denied: deque[datetime] = deque(maxlen=burst)
+
+
+class FraudDetector:
+    def __init__(
+        self,
+        denied_burst: int = settings.FRAUD_DENIED_BURST,
+        denied_window: timedelta = timedelta(seconds=settings.FRAUD_DENIED_WINDOW_SECONDS),
+        gate_hop_window: timedelta = timedelta(seconds=settings.FRAUD_GATE_HOP_SECONDS),
+        reread_window: timedelta = timedelta(seconds=settings.FRAUD_REREAD_SECONDS),
+        max_tracked: int = settings.FRAUD_MAX_TRACKED_PLATES,
+        keep_alerts: int = 1000,
+    ):
+        self.denied_burst = denied_burst
+        self.denied_window = denied_window
+        self.gate_hop_window = gate_hop_window
+        self.reread_window = reread_window
+        self.max_tracked = max_tracked
+        self._plates: OrderedDict[str, _PlateState] = OrderedDict()
+        # owner id -> recent (timestamp, gate_id, direction, plate), newest last
+        self._owners: OrderedDict[int, deque] = OrderedDict()
+        self.recent_alerts: deque[FraudAlert] = deque(maxlen=keep_alerts)
+
+    @staticmethod
+    def _touch(table: OrderedDict, key, factory, limit: int):
+        value = table.get(key)
+        if value is None:
+            value = table[key] = factory()
+            if len(table) > limit:
+                table.popitem(last=False)
+        else:
+            table.move_to_end(key)
+        return value
+
+    def observe(self, event: AccessEvent) -> list[FraudAlert]:
+        """Update the windows with ``event`` and return the alerts it triggers."""
+        alerts = []
+        plate = self._touch(self._plates, event.license_plate, lambda: _PlateState(self.denied_burst), self.max_tracked)
+
+        if event.granted and event.direction == "entry":
+            reread = (
+                plate.entry_seen is not None and plate.entry_gate == event.gate_id
+                and event.timestamp - plate.entry_seen <= self.reread_window
+            )
+            if plate.inside and not reread:
+                alerts.append(self._alert(event, "double_entry", "Entry granted again without an exit"))
+            plate.inside = True
+            plate.entry_gate = event.gate_id
+            plate.entry_seen = event.timestamp
+        elif event.granted and event.direction == "exit":
+            plate.inside = False
+
+        if not event.granted:
+            plate.denied.append(event.timestamp)
+            if len(plate.denied) == self.denied_burst and event.timestamp - plate.denied[0] <= self.denied_window:
+                alerts.append(self._alert(
+                    event, "denied_burst", f"{self.denied_burst} denied attempts within {self.denied_window}"
+                ))
+                plate.denied.clear()
+
+        if event.user_id is not None and event.gate_id is not None:
+            seen = self._touch(self._owners, event.user_id, lambda: deque(maxlen=32), self.max_tracked)
+            while seen and event.timestamp - seen[0][0] > self.gate_hop_window:
+                seen.popleft()
+            hops = [
+                (gate_id, seen_plate) for _, gate_id, direction, seen_plate in seen
+                if gate_id != event.gate_id and direction == event.direction
+            ]
+            if hops:
+                other_gates = {gate_id for gate_id, _ in hops}
+                plates = sorted({seen_plate for _, seen_plate in hops} | {event.license_plate})
+                alerts.append(self._alert(
+                    event, "gate_hop",
+                    f"Plates {', '.join(plates)} seen at gates {sorted(other_gates | {event.gate_id})} "
+                    f"within {self.gate_hop_window}",
+                ))
+            seen.append((event.timestamp, event.gate_id, event.direction, event.license_plate))
+
+        return alerts
+
+    def _alert(self, event: AccessEvent, kind: str, detail: str) -> FraudAlert:
+        alert = FraudAlert(kind, event.license_plate, event.timestamp, detail, event.user_id, event.gate_id)
+        self.recent_alerts.append(alert)
+        fraud_alerts.inc((kind,))
+        logger.warning("Fraud alert %s for %s: %s", kind, event.license_plate, detail)
+        return alert
+
+
+detector = FraudDetector()
@@ -0,0 +1,119 @@
+"""Persistent channels to gate controllers.
+
+A gate controller keeps one WebSocket open (``/api/v1/gates/{gate_id}/ws``)
+and exchanges JSON frames on it:
+
+* controller -> server: ``{"id": "r1", "license_plate": "AB12CD", "direction": "entry"}``;
+* server -> controller: ``{"type": "decision", "id": "r1", "access_granted": ..., "reason": ...}``
+  (the ``AccessCheckOut`` fields), or ``{"type": "error", "id": "r1", "detail": ...}``;
+* server push: ``{"type": "invalidate", "plates": [...]}`` when the entitlements of
+  those plates change, so controllers holding a local allowlist drop them.
+
+Reads are answered concurrently, so decisions may come back out of order and
+are matched by ``id``. ``refresh_owner_entitlements`` records the changed
+plates on the session; the ``after_commit`` hook below hands them to ``hub``,
+which queues the push on every open channel, so controllers only hear about
+committed changes.
+
+A channel is closed (WebSocket code 1008) when:
+
+* its outbox holds ``OUTBOX_SIZE`` unsent frames: the controller stopped
+  reading, and queuing more would only grow memory;
+* the admin token it authenticated with is logged out (``hub.close_token``), or
+  fails the re-check every ``GATE_TOKEN_CHECK_SECONDS`` (expired, or the user
+  lost admin rights).
+"""
+import asyncio
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.metrics import Counter, Gauge, registry
+from app.core.security import verified_tokens
+from app.services.entitlements import CHANGED_PLATES
+
+logger = logging.getLogger("gatewise.gate_channel")
+
+OUTBOX_SIZE = 1000
+
+gate_channels_open = registry.register(Gauge(
+    "gatewise_gate_channels_open", "Gate controller WebSocket channels currently open.",
+))
+gate_channels_closed = registry.register(Counter(
+    "gatewise_gate_channels_closed_total", "Gate controller channels closed by the server.", ("reason",),
+))
+
+
+class GateChannel:
+    """Outgoing side of one controller connection: frames are sent by a single writer task.
+
+    ``closed`` is set when the server drops the channel; the connection handler
+    then closes the WebSocket with ``close_reason``.
+    """
+
+    def __init__(self, gate_id: int, token: str):
+        self.gate_id = gate_id
+        self.token_key = verified_tokens.key(token)
+        self.outbox: asyncio.Queue[dict] = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self.closed = asyncio.Event()
+        self.close_reason = ""
+
+    def push(self, frame: dict):
+        if self.closed.is_set():
+            return
+        try:
+            self.outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.close("outbox_full", "Controller is not reading its frames")
+
+    def close(self, reason: str, detail: str):
+        if self.closed.is_set():
+            return
+        self.close_reason = detail
+        self.closed.set()
+        gate_channels_closed.inc((reason,))
+        logger.warning("Closing gate %s channel: %s", self.gate_id, detail)
+
+
+class GateChannelHub:
+    def __init__(self):
+        self.channels: set[GateChannel] = set()
+
+    def register(self, channel: GateChannel):
+        self.channels.add(channel)
+        gate_channels_open.inc()
+
+    def unregister(self, channel: GateChannel):
+        if channel in self.channels:
+            self.channels.discard(channel)
+            gate_channels_open.dec()
+
+    def close_token(self, token: str):
+        """Close the channels authenticated with ``token`` (called on logout)."""
+        key = verified_tokens.key(token)
+        for channel in list(self.channels):
+            if channel.token_key == key:
+                channel.close("logout", "Token logged out")
+
+    def invalidate(self, plates):
+        if not plates or not self.channels:
+            return
+        frame = {"type": "invalidate", "plates": sorted(plates)}
+        for channel in self.channels:
+            channel.push(frame)
+
+
+hub = GateChannelHub()
+
+
+@event.listens_for(Session, "after_commit")
+def _announce_changed_plates(session):
+    plates = session.info.pop(CHANGED_PLATES, None)
+    if plates:
+        hub.invalidate(plates)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_plates(session):
+    session.info.pop(CHANGED_PLATES, None)
@@ -0,0 +1,22 @@
+"""Gate to parking lot resolution for the access check.
+
+Gates never move between lots, so the mapping is cached in process memory
+after the first lookup and the hot access path skips the query.
+"""
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gate import Gate
+
+_gate_lots: dict[int, int] = {}
+
+
+async def lot_for_gate(db: AsyncSession, gate_id: int) -> int:
+    lot_id = _gate_lots.get(gate_id)
+    if lot_id is None:
+        lot_id = (await db.execute(select(Gate.lot_id).where(Gate.id == gate_id))).scalar_one_or_none()
+        if lot_id is None:
+            raise HTTPException(status_code=404, detail="Gate not found")
+        _gate_lots[gate_id] = lot_id
+    return lot_id
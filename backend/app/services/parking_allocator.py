@@ -0,0 +1,169 @@
+"""Concurrency-safe parking space allocation.
+
+The database is the source of truth: spaces are claimed with a single
+``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING``, so two
+admins can never allocate the same space, and concurrent auto-allocations skip
+each other's locked rows instead of queueing behind them.
+
+``free_space_index`` keeps the ids of unallocated spaces per lot and
+``ParkingSpaceType`` in memory. It only steers which rows a claim tries first;
+if it is stale the claim simply falls back to scanning the partial
+``ix_parking_spaces_free_by_lot_type`` index.
+
+Allocations for one subscription are serialized by ``lock_subscription``
+(``SELECT ... FOR UPDATE`` on the subscription row), so the limit check against
+the spaces already linked and the allocation ``order`` values stay consistent
+under concurrent calls.
+"""
+from itertools import islice
+
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parking_space import ParkingSpace, ParkingSpaceType
+from app.models.subscription import Subscription
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+
+
+FreeKey = tuple[int | None, ParkingSpaceType]
+
+
+class FreeSpaceIndex:
+    def __init__(self):
+        self._free: dict[FreeKey, set[int]] = {}
+        self._loaded = False
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._loaded:
+            return
+        result = await db.execute(
+            select(ParkingSpace.id, ParkingSpace.lot_id, ParkingSpace.type)
+            .where(ParkingSpace.is_allocated == False)  # noqa: E712
+        )
+        free: dict[FreeKey, set[int]] = {}
+        for space_id, lot_id, space_type in result.all():
+            free.setdefault((lot_id, space_type), set()).add(space_id)
+        self._free = free
+        self._loaded = True
+
+    def _sets(self, lot_id: int | None, space_type: ParkingSpaceType):
+        if lot_id is not None:
+            return [self._free.get((lot_id, space_type), set())]
+        # No lot given: any lot will do
+        return [ids for (_, free_type), ids in self._free.items() if free_type == space_type]
+
+    def candidates(self, lot_id: int | None, space_type: ParkingSpaceType, count: int) -> list[int]:
+        return list(islice((space_id for ids in self._sets(lot_id, space_type) for space_id in ids), count))
+
+    def free_count(self, lot_id: int | None, space_type: ParkingSpaceType) -> int:
+        return sum(len(ids) for ids in self._sets(lot_id, space_type))
+
+    def sync(self, space: ParkingSpace):
+        """Reflect a created or updated space; call after the write commits."""
+        self.discard(space.id)
+        if not space.is_allocated:
+            self._free.setdefault((space.lot_id, ParkingSpaceType(space.type)), set()).add(space.id)
+
+    def discard(self, *space_ids: int):
+        for free in self._free.values():
+            free.difference_update(space_ids)
+
+    def invalidate(self):
+        self._loaded = False
+
+
+free_space_index = FreeSpaceIndex()
+
+
+async def lock_subscription(db: AsyncSession, subscription_id: int) -> tuple[Subscription | None, int]:
+    """Lock the subscription row for an allocation; returns it and the number of spaces already linked."""
+    subscription = (await db.execute(
+        select(Subscription).where(Subscription.id == subscription_id).with_for_update()
+    )).scalar_one_or_none()
+    if subscription is None:
+        return None, 0
+    linked = (await db.execute(
+        select(func.count()).select_from(SubscriptionParkingSpace)
+        .where(SubscriptionParkingSpace.subscription_id == subscription_id)
+    )).scalar_one()
+    return subscription, linked
+
+
+async def claim_spaces(db: AsyncSession, subscription_id: int, parking_space_ids: list[int],
+                       first_order: int = 0) -> set[int]:
+    """Mark the given spaces allocated and link them, returning the ids actually claimed.
+
+    Spaces that are missing or already allocated are left out; the caller should
+    roll back when the result does not cover every requested id. Their ``order``
+    continues from ``first_order``, the number of spaces already linked.
+    """
+    result = await db.execute(
+        update(ParkingSpace)
+        .where(ParkingSpace.id.in_(parking_space_ids), ParkingSpace.is_allocated == False)  # noqa: E712
+        .values(is_allocated=True)
+        .returning(ParkingSpace.id)
+    )
+    claimed = set(result.scalars().all())
+    if claimed == set(parking_space_ids):
+        # Store the order of allocation based on the input list
+        db.add_all([
+            SubscriptionParkingSpace(subscription_id=subscription_id, parking_space_id=space_id, order=idx)
+            for idx, space_id in enumerate(parking_space_ids, first_order)
+        ])
+    return claimed
+
+
+def _auto_claim_statement(subscription_id: int, lot_id: int | None, space_type: ParkingSpaceType, count: int,
+                          candidates=None):
+    claimable = select(ParkingSpace.id).where(
+        ParkingSpace.type == space_type,
+        ParkingSpace.is_allocated == False,  # noqa: E712
+    )
+    if lot_id is not None:
+        claimable = claimable.where(ParkingSpace.lot_id == lot_id)
+    if candidates is not None:
+        claimable = claimable.where(ParkingSpace.id.in_(candidates))
+    claimable = claimable.order_by(ParkingSpace.id).limit(count).with_for_update(skip_locked=True)
+    claimed = (
+        update(ParkingSpace)
+        .where(ParkingSpace.id.in_(claimable.scalar_subquery()))
+        .values(is_allocated=True)
+        .returning(ParkingSpace.id)
+        .cte("claimed")
+    )
+    already_linked = (
+        select(func.count())
+        .select_from(SubscriptionParkingSpace)
+        .where(SubscriptionParkingSpace.subscription_id == subscription_id)
+        .scalar_subquery()
+    )
+    # Claim and link in one statement, continuing the subscription's allocation order
+    return insert(SubscriptionParkingSpace).from_select(
+        ["subscription_id", "parking_space_id", "order"],
+        select(
+            literal(subscription_id),
+            claimed.c.id,
+            already_linked + func.row_number().over(order_by=claimed.c.id) - 1,
+        ),
+    ).returning(SubscriptionParkingSpace.parking_space_id)
+
+
+async def auto_claim_spaces(db: AsyncSession, subscription_id: int, space_type: ParkingSpaceType, count: int,
+                            lot_id: int | None = None) -> list[int]:
+    """Atomically claim up to ``count`` free spaces of ``space_type`` (in ``lot_id``, if given) for a subscription.
+
+    Returns the claimed ids; the caller should roll back when fewer than
+    ``count`` were available.
+    """
+    await free_space_index.ensure_loaded(db)
+    # Oversample so a few stale or concurrently locked candidates don't force the fallback
+    candidates = free_space_index.candidates(lot_id, space_type, count * 2)
+    claimed = []
+    if candidates:
+        result = await db.execute(_auto_claim_statement(subscription_id, lot_id, space_type, count, candidates))
+        claimed = list(result.scalars().all())
+    if len(claimed) < count:
+        free_space_index.invalidate()
+        result = await db.execute(_auto_claim_statement(subscription_id, lot_id, space_type, count - len(claimed)))
+        claimed += result.scalars().all()
+    return claimed
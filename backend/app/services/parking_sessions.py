@@ -0,0 +1,122 @@
+"""Parking sessions and live occupancy.
+
+An entry check opens a ``ParkingSession`` and the matching exit closes it, so
+the set of open sessions is exactly "who is inside now" and dwell time is a
+subtraction on one row. Both are single statements guarded by the partial
+unique index on open sessions, so a repeated entry read never opens a second
+session and an exit without an entry closes nothing.
+
+``occupancy`` keeps per (lot, vehicle type) counters of open sessions in
+memory. They are loaded with one grouped query on first read and afterwards
+adjusted by +1/-1 for every session opened or closed, so reading live
+occupancy never touches the logs. ``invalidate()`` forces a reload.
+
+Loads run one at a time under a lock. Sessions opened or closed while the
+grouped query is in flight are buffered and applied once it returns, so an
+entry or exit committed during a load is not lost.
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parking_session import ParkingSession
+from app.models.vehicle import VehicleType
+
+OccupancyKey = tuple[int | None, str]
+
+
+class OccupancyCounters:
+    def __init__(self):
+        self._counts: dict[OccupancyKey, int] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # Deltas seen while a load is in flight; None when not loading
+        self._pending: list[tuple[OccupancyKey, int]] | None = None
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            self._pending = []
+            try:
+                result = await db.execute(
+                    select(ParkingSession.lot_id, ParkingSession.vehicle_type, func.count())
+                    .where(ParkingSession.exited_at.is_(None))
+                    .group_by(ParkingSession.lot_id, ParkingSession.vehicle_type)
+                )
+                self._counts = {(lot_id, vehicle_type.value): count for lot_id, vehicle_type, count in result.all()}
+                for key, delta in self._pending:
+                    self._apply(key, delta)
+                self._loaded = True
+            finally:
+                self._pending = None
+
+    def _apply(self, key: OccupancyKey, delta: int):
+        self._counts[key] = max(0, self._counts.get(key, 0) + delta)
+
+    def _change(self, key: OccupancyKey, delta: int):
+        if self._loaded:
+            self._apply(key, delta)
+        elif self._pending is not None:
+            self._pending.append((key, delta))
+        # Otherwise nothing is loaded yet: the next load reads the truth from the database
+
+    def entered(self, lot_id: int | None, vehicle_type: str):
+        self._change((lot_id, vehicle_type), 1)
+
+    def exited(self, lot_id: int | None, vehicle_type: str):
+        self._change((lot_id, vehicle_type), -1)
+
+    def snapshot(self, lot_id: int | None = None) -> list[tuple[int | None, str, int]]:
+        return sorted(
+            ((lot, vehicle_type, count) for (lot, vehicle_type), count in self._counts.items()
+             if lot_id is None or lot == lot_id),
+            key=lambda row: (row[0] is None, row[0] or 0, row[1]),
+        )
+
+    def invalidate(self):
+        self._loaded = False
+
+
+occupancy = OccupancyCounters()
+
+
+async def open_session(
+    db: AsyncSession,
+    vehicle_id: int,
+    license_plate: str,
+    vehicle_type: str,
+    lot_id: int | None,
+    gate_id: int | None,
+) -> bool:
+    """Open a session for the vehicle; returns False when it already has one open."""
+    result = await db.execute(
+        insert(ParkingSession)
+        .values(
+            license_plate=license_plate,
+            vehicle_id=vehicle_id,
+            vehicle_type=VehicleType(vehicle_type),
+            lot_id=lot_id,
+            entry_gate_id=gate_id,
+            entered_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["vehicle_id"], index_where=text("exited_at IS NULL"))
+        .returning(ParkingSession.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def close_session(db: AsyncSession, vehicle_id: int, gate_id: int | None):
+    """Close the vehicle's open session, returning the closed row (or None if it was not inside)."""
+    result = await db.execute(
+        update(ParkingSession)
+        .where(ParkingSession.vehicle_id == vehicle_id, ParkingSession.exited_at.is_(None))
+        .values(exited_at=datetime.utcnow(), exit_gate_id=gate_id)
+        .returning(ParkingSession.lot_id, ParkingSession.vehicle_type, ParkingSession.entered_at, ParkingSession.exited_at)
+    )
+    return result.one_or_none()
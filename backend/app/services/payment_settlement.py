@@ -0,0 +1,139 @@
+"""Bulk payment settlement.
+
+Reconciling bank transfers settles many payments at once. Each item names
+either a payment (``payment_id``) or a subscription and the amount received
+(``subscription_id`` + ``amount``). One query loads every referenced
+subscription with its payments, amounts are checked against
+``price_at_subscription`` in memory, and the accepted items are applied with
+one UPDATE (pending payments marked paid) and one multi-row INSERT
+(subscriptions without any payment yet), all in the caller's transaction.
+Rejected items don't stop the others; each gets its own result.
+
+The referenced subscriptions are locked (``FOR UPDATE``, in id order) before
+their payments are read, so concurrent settlements of the same subscription,
+and ``POST /payments/``, run one after the other instead of both creating a
+payment. The UPDATE also only touches payments that are not paid yet and
+reports the others as ``already_paid``.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.payment import Payment
+from app.models.schemas import PaymentSettlementItem, PaymentSettlementResult
+from app.models.subscription import Subscription
+
+
+async def settle_payments(db: AsyncSession, items: list[PaymentSettlementItem]) -> list[PaymentSettlementResult]:
+    payment_ids = {item.payment_id for item in items if item.payment_id is not None}
+    subscription_ids = {item.subscription_id for item in items if item.subscription_id is not None}
+    subscriptions = {}
+    payments_by_subscription = defaultdict(list)
+    payments = {}
+    if payment_ids or subscription_ids:
+        referenced = or_(
+            Subscription.id.in_(subscription_ids),
+            Subscription.id.in_(select(Payment.subscription_id).where(Payment.id.in_(payment_ids))),
+        )
+        await db.execute(select(Subscription.id).where(referenced).order_by(Subscription.id).with_for_update())
+        result = await db.execute(
+            select(
+                Subscription.id, Subscription.status, Subscription.price_at_subscription,
+                Payment.id, Payment.status,
+            )
+            .outerjoin(Payment, Payment.subscription_id == Subscription.id)
+            .where(referenced)
+            .order_by(Subscription.id, Payment.id)
+        )
+        for sub_id, sub_status, price, payment_id, payment_status in result.all():
+            subscriptions[sub_id] = (sub_status, price)
+            if payment_id is not None:
+                payments[payment_id] = (sub_id, payment_status)
+                payments_by_subscription[sub_id].append((payment_id, payment_status))
+
+    now = datetime.utcnow()
+    results = []
+    to_settle: dict[int, PaymentSettlementResult] = {}
+    to_create = []
+    for index, item in enumerate(items):
+        outcome = PaymentSettlementResult(
+            index=index, payment_id=item.payment_id, subscription_id=item.subscription_id, status="invalid",
+        )
+        results.append(outcome)
+        if item.payment_id is not None:
+            if item.payment_id not in payments:
+                outcome.status, outcome.detail = "not_found", "Payment not found"
+                continue
+            sub_id, payment_status = payments[item.payment_id]
+            if item.subscription_id is not None and item.subscription_id != sub_id:
+                outcome.detail = "Payment belongs to another subscription"
+                continue
+            outcome.subscription_id = sub_id
+            target = item.payment_id
+        elif item.subscription_id is not None and item.amount is not None:
+            sub_id = item.subscription_id
+            if sub_id not in subscriptions:
+                outcome.status, outcome.detail = "not_found", "Subscription not found"
+                continue
+            pending = [pid for pid, status in payments_by_subscription[sub_id] if status == "pending"]
+            if pending:
+                target, payment_status = pending[-1], "pending"
+            elif payments_by_subscription[sub_id]:
+                outcome.status, outcome.detail = "already_paid", "Payment for this subscription already exists"
+                continue
+            else:
+                target, payment_status = None, None
+        else:
+            outcome.detail = "Either payment_id or subscription_id and amount are required"
+            continue
+
+        sub_status, price = subscriptions[sub_id]
+        if item.amount is not None and item.amount != price:
+            outcome.detail = f"Payment amount must match subscription price: {price}"
+            continue
+        if target is None:
+            if sub_status != "active":
+                outcome.detail = "Subscription is not active"
+                continue
+            if any(values["subscription_id"] == sub_id for _, values in to_create):
+                outcome.status, outcome.detail = "duplicate", "Subscription settled earlier in this request"
+                continue
+            to_create.append((outcome, {"subscription_id": sub_id, "amount": price, "paid_at": now, "status": "paid"}))
+            continue
+        if payment_status == "paid":
+            outcome.status, outcome.detail = "already_paid", "Payment already paid"
+            outcome.payment_id = target
+            continue
+        if target in to_settle:
+            outcome.status, outcome.detail = "duplicate", "Payment settled earlier in this request"
+            outcome.payment_id = target
+            continue
+        to_settle[target] = outcome
+        outcome.payment_id = target
+
+    if to_settle:
+        result = await db.execute(
+            update(Payment)
+            .where(Payment.id.in_(to_settle), Payment.status != "paid")
+            .values(status="paid", paid_at=now)
+            .returning(Payment.id)
+        )
+        settled = set(result.scalars().all())
+        for target, outcome in to_settle.items():
+            if target in settled:
+                outcome.status = "settled"
+            else:
+                outcome.status, outcome.detail = "already_paid", "Payment already paid"
+    if to_create:
+        result = await db.execute(
+            insert(Payment).returning(Payment.id, Payment.subscription_id),
+            [values for _, values in to_create],
+        )
+        created = dict((sub_id, payment_id) for payment_id, sub_id in result.all())
+        for outcome, values in to_create:
+            outcome.payment_id = created[values["subscription_id"]]
+            outcome.status = "created"
+    return results
@@ -0,0 +1,156 @@
+"""Approximate license plate matching for OCR misreads.
+
+OCR mostly confuses look-alike characters (``0``/``O``/``D``, ``8``/``B``,
+``5``/``S``...), and sometimes drops or adds a character. Registered plates
+are indexed in memory under a *canonical key* where each group of look-alike
+characters is folded to one symbol, so a confused read finds its plate with a
+single dict lookup. Only such a confusable match (``match``) may grant access:
+a different real plate never folds to the same key unless it differs from a
+registered one by look-alike characters alone.
+
+Reads within one edit of a registered plate (a dropped, added or arbitrary
+character) are found by ``near_miss``, which probes every key within one edit
+of the read (in the 27-symbol canonical alphabet, a few hundred variants), so
+the lookup cost does not depend on the number of registered plates. Such a
+plate may just as well be another vehicle one character off, so near misses
+are only logged for review, never granted.
+
+Candidates are ranked by the edit distance between the read and the plate as
+registered; a tie between different vehicles is treated as no match rather
+than a guess. The index loads lazily on the first miss and is kept current by
+the vehicle endpoints.
+"""
+import asyncio
+import re
+import string
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vehicle import Vehicle
+
+CONFUSABLE = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "Z": "2",
+    "S": "5",
+    "G": "6",
+    "B": "8",
+})
+CANONICAL_ALPHABET = sorted(set((string.ascii_uppercase + string.digits).translate(CONFUSABLE)))
+_NOT_ALNUM = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_plate(plate: str) -> str:
+    return _NOT_ALNUM.sub("", plate.upper())
+
+
+def canonical_key(plate: str) -> str:
+    return normalize_plate(plate).translate(CONFUSABLE)
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def one_edit_variants(key: str):
+    """Every string one deletion, substitution or insertion away from ``key``."""
+    for i in range(len(key) + 1):
+        if i < len(key):
+            yield key[:i] + key[i + 1:]
+            for char in CANONICAL_ALPHABET:
+                if char != key[i]:
+                    yield key[:i] + char + key[i + 1:]
+        for char in CANONICAL_ALPHABET:
+            yield key[:i] + char + key[i:]
+
+
+class PlateIndex:
+    def __init__(self):
+        # canonical key -> vehicle id, or a list of ids when plates collide
+        self._by_key: dict[str, int | list[int]] = {}
+        self._plates: dict[int, str] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            result = await db.execute(select(Vehicle.id, Vehicle.license_plate))
+            self._by_key, self._plates = {}, {}
+            for vehicle_id, plate in result.all():
+                self._add(vehicle_id, plate)
+            self._loaded = True
+
+    def _add(self, vehicle_id: int, plate: str):
+        plate = normalize_plate(plate)
+        self._plates[vehicle_id] = plate
+        key = plate.translate(CONFUSABLE)
+        current = self._by_key.get(key)
+        if current is None:
+            self._by_key[key] = vehicle_id
+        elif isinstance(current, list):
+            current.append(vehicle_id)
+        else:
+            self._by_key[key] = [current, vehicle_id]
+
+    def _ids(self, key: str) -> list[int]:
+        ids = self._by_key.get(key)
+        if ids is None:
+            return []
+        return ids if isinstance(ids, list) else [ids]
+
+    def upsert(self, vehicle_id: int, plate: str):
+        """Reflect a created or updated vehicle; call after the write commits."""
+        if self._loaded:
+            self.remove(vehicle_id)
+            self._add(vehicle_id, plate)
+
+    def remove(self, vehicle_id: int):
+        plate = self._plates.pop(vehicle_id, None)
+        if plate is None:
+            return
+        key = plate.translate(CONFUSABLE)
+        remaining = [i for i in self._ids(key) if i != vehicle_id]
+        if not remaining:
+            del self._by_key[key]
+        else:
+            self._by_key[key] = remaining if len(remaining) > 1 else remaining[0]
+
+    def _best(self, read: str, candidates) -> tuple[int, str, int] | None:
+        best = None
+        tied = False
+        for vehicle_id in candidates:
+            plate = self._plates[vehicle_id]
+            distance = edit_distance(read, plate)
+            if best is None or distance < best[2]:
+                best, tied = (vehicle_id, plate, distance), False
+            elif distance == best[2]:
+                tied = True
+        return None if tied else best
+
+    def match(self, read: str) -> tuple[int, str, int] | None:
+        """Registered plate differing from an OCR read only by look-alike characters,
+        as ``(vehicle_id, plate, distance)``, or None."""
+        read = normalize_plate(read)
+        return self._best(read, self._ids(read.translate(CONFUSABLE)))
+
+    def near_miss(self, read: str) -> tuple[int, str, int] | None:
+        """Closest registered plate one edit away from the read's canonical key; not an identification."""
+        read = normalize_plate(read)
+        candidates = set()
+        for variant in one_edit_variants(read.translate(CONFUSABLE)):
+            candidates.update(self._ids(variant))
+        return self._best(read, candidates)
+
+
+plate_index = PlateIndex()
@@ -0,0 +1,230 @@
+"""Subscription expiry and renewal, fired when each subscription is due.
+
+``ExpiryScheduler`` keeps a min-heap of ``(end_date, subscription id)`` for
+the active subscriptions ending within ``HORIZON``, loaded with one query on
+the partial index ``ix_subscriptions_active_end_date`` and reloaded as the
+horizon rolls forward. A background task sleeps until the earliest end date
+and then processes just the subscriptions due at that moment, so expiry work
+is proportional to the expiring rows instead of a scan of every active
+subscription, and happens on time instead of up to an hour late.
+
+The subscription endpoints call ``schedule`` / ``unschedule`` after committing;
+a cancelled or rescheduled entry stays in the heap and is skipped when popped
+(``_due`` holds the current end date per id). ``expire_or_renew`` re-checks
+the row in the database, so a stale entry can never expire a subscription
+early. ``app/jobs.py`` runs the same processing as an hourly safety-net sweep;
+both load the due rows with ``due_subscriptions``, which locks them and skips
+rows the other one holds, so a subscription is never renewed twice. Ids the
+scheduler could not process (the pass failed, or the row was held by the other
+pass) are put back in the heap ``RETRY_DELAY`` later.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.parking_space import ParkingSpace
+from app.models.payment import Payment
+from app.models.plan import Plan
+from app.models.subscription import Subscription
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+from app.services.entitlements import refresh_owner_entitlements
+
+logger = logging.getLogger("gatewise.subscription_expiry")
+
+HORIZON = timedelta(hours=24)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+def due_subscriptions(now: datetime, ids=None):
+    """Active subscriptions ended before ``now``, locked; rows already locked by another pass are skipped."""
+    query = select(Subscription).where(Subscription.status == "active", Subscription.end_date < now)
+    if ids is not None:
+        query = query.where(Subscription.id.in_(ids))
+    return query.with_for_update(skip_locked=True)
+
+
+async def expire_or_renew(db: AsyncSession, subscriptions, now: datetime) -> list[Subscription]:
+    """Expire the given subscriptions that ended before ``now``, renewing the paid ones.
+
+    Load them with ``due_subscriptions`` so concurrent passes cannot process the same row.
+    Returns the renewals created; the caller commits.
+    """
+    changed_owners = set()
+    renewals = []
+    for sub in subscriptions:
+        # Verifica se a subscription expirou
+        if sub.status != "active" or sub.end_date >= now:
+            continue
+        changed_owners.add(sub.user_id)
+        payment_result = await db.execute(
+            select(Payment)
+            .where(Payment.subscription_id == sub.id, Payment.status == "paid")
+            .order_by(Payment.paid_at.desc())
+        )
+        payment = payment_result.scalars().first()
+        if not payment or payment.paid_at > sub.end_date:
+            # Não está paga: expira
+            sub.status = "inactive"
+            continue
+        # Está paga: renova
+        # Busca plano para duração
+        plan_result = await db.execute(select(Plan).where(Plan.id == sub.plan_id))
+        plan = plan_result.scalar_one_or_none()
+        if not plan:
+            continue
+        # Cria nova subscription
+        new_start = sub.end_date
+        new_end = new_start + timedelta(days=plan.duration_days)
+        new_sub = Subscription(
+            user_id=sub.user_id,
+            plan_id=sub.plan_id,
+            start_date=new_start,
+            end_date=new_end,
+            status="active",
+            spaces_allocated=sub.spaces_allocated,
+            price_at_subscription=sub.price_at_subscription,
+        )
+        db.add(new_sub)
+        await db.flush()  # Garante que new_sub.id está disponível
+        # Copia associações de parking spaces
+        assoc_result = await db.execute(select(SubscriptionParkingSpace).where(SubscriptionParkingSpace.subscription_id == sub.id))
+        assocs = assoc_result.scalars().all()
+        for assoc in assocs:
+            new_assoc = SubscriptionParkingSpace(subscription_id=new_sub.id, parking_space_id=assoc.parking_space_id)
+            db.add(new_assoc)
+        # Opcional: copiar veículos ocupando as vagas
+        for assoc in assocs:
+            ps_result = await db.execute(select(ParkingSpace).where(ParkingSpace.id == assoc.parking_space_id))
+            ps = ps_result.scalar_one_or_none()
+            if ps and ps.vehicle_id:
+                # Atualiza vehicle_id para a nova subscription (se for necessário no seu modelo)
+                ps.vehicle_id = ps.vehicle_id  # Mantém o mesmo veículo
+                db.add(ps)
+        # Expira a antiga
+        sub.status = "inactive"
+        renewals.append(new_sub)
+    # Renovações e expirações mudam os direitos de acesso dos veículos
+    for owner_id in changed_owners:
+        await refresh_owner_entitlements(db, owner_id)
+    return renewals
+
+
+class ExpiryScheduler:
+    def __init__(self, session_factory, horizon: timedelta = HORIZON):
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self.horizon_end: datetime | None = None
+        self._heap: list[tuple[datetime, int]] = []
+        self._due: dict[int, datetime] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def schedule(self, subscription_id: int, end_date: datetime):
+        """Track an active subscription; call after the write commits."""
+        if self.horizon_end is None or end_date >= self.horizon_end:
+            # Picked up by the next horizon reload
+            self._due.pop(subscription_id, None)
+            return
+        self._due[subscription_id] = end_date
+        heapq.heappush(self._heap, (end_date, subscription_id))
+        if self._heap[0][1] == subscription_id:
+            self._wake.set()
+
+    def unschedule(self, subscription_id: int):
+        self._due.pop(subscription_id, None)
+
+    async def load(self, now: datetime):
+        """(Re)load the active subscriptions ending before ``now + horizon``."""
+        horizon_end = now + self.horizon
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Subscription.id, Subscription.end_date)
+                .where(Subscription.status == "active", Subscription.end_date < horizon_end)
+            )
+            rows = result.all()
+        self.horizon_end = horizon_end
+        self._due = dict(rows)
+        self._heap = [(end_date, subscription_id) for subscription_id, end_date in rows]
+        heapq.heapify(self._heap)
+        self._wake.set()
+
+    async def fire_due(self, now: datetime):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            end_date, subscription_id = heapq.heappop(self._heap)
+            if self._due.get(subscription_id) == end_date:
+                del self._due[subscription_id]
+                due.append(subscription_id)
+        if not due:
+            return
+        # end_date is exclusive in expire_or_renew; a subscription is due at its end_date
+        due_at = now + timedelta(microseconds=1)
+        try:
+            async with self.session_factory() as db:
+                subscriptions = (await db.execute(due_subscriptions(due_at, due))).scalars().all()
+                locked = {sub.id for sub in subscriptions}
+                skipped = [subscription_id for subscription_id in due if subscription_id not in locked]
+                if skipped:
+                    # Not returned: either no longer due (stale entry) or held by the hourly sweep
+                    skipped = (await db.execute(
+                        select(Subscription.id).where(
+                            Subscription.id.in_(skipped), Subscription.status == "active", Subscription.end_date < due_at,
+                        )
+                    )).scalars().all()
+                renewals = await expire_or_renew(db, subscriptions, due_at)
+                await db.commit()
+        except Exception:
+            logger.exception("Processing %d due subscriptions failed, retrying in %s", len(due), RETRY_DELAY)
+            self._retry(due, now)
+            return
+        self._retry(skipped, now)
+        for renewal in renewals:
+            self.schedule(renewal.id, renewal.end_date)
+        logger.info(
+            "Processed %d due subscriptions, %d renewed, %d locked elsewhere", len(locked), len(renewals), len(skipped)
+        )
+
+    def _retry(self, subscription_ids, now: datetime):
+        for subscription_id in subscription_ids:
+            # Unless the subscription was rescheduled meanwhile
+            if subscription_id not in self._due:
+                self.schedule(subscription_id, now + RETRY_DELAY)
+
+    async def run(self):
+        while True:
+            try:
+                now = datetime.utcnow()
+                if self.horizon_end is None or now >= self.horizon_end - self.horizon / 2:
+                    await self.load(now)
+                await self.fire_due(now)
+                next_due = self._heap[0][0] if self._heap else self.horizon_end
+                delay = min(next_due, self.horizon_end - self.horizon / 2) - datetime.utcnow()
+            except Exception:
+                logger.exception("Subscription expiry pass failed")
+                delay = timedelta(minutes=1)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(delay.total_seconds(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+expiry_scheduler = ExpiryScheduler(AsyncSessionLocal)
@@ -0,0 +1,126 @@
+"""Bulk user onboarding.
+
+Imported accounts are invite-only: they get ``UNUSABLE_PASSWORD`` instead of
+a bcrypt hash of a throwaway password, so no hashing happens at import time,
+and the invitation's reset link is the only way to set a password.
+Username/email clashes with existing users are found with one query, rows
+are inserted in chunks with ``ON CONFLICT DO NOTHING``, and the invitation
+emails are sent afterwards by a background job, ``INVITE_BATCH`` messages
+per SMTP connection, with progress exposed through the job status.
+"""
+import asyncio
+
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.email import send_emails_gmail
+from app.core.security import UNUSABLE_PASSWORD, create_password_reset_token
+from app.models.schemas import UserImportRowResult
+from app.models.user import User, UserType
+from app.services.background_jobs import JobStatus
+
+CHUNK = 500
+INVITE_BATCH = 50
+RESET_PASSWORD_URL = "https://your-frontend-app.com/reset-password?token={token}"
+
+
+async def import_users(db: AsyncSession, users: list) -> tuple[list[UserImportRowResult], list[tuple[int, str, str]]]:
+    """Insert ``users`` (``UserCreate``) in the caller's transaction.
+
+    Returns one result per row and the ``(id, email, full_name)`` of the created users.
+    """
+    results = []
+    candidates = []
+    seen_usernames, seen_emails = set(), set()
+    for row, user in enumerate(users, 1):
+        username, email = user.username.strip(), user.email.strip()
+        if not username or "@" not in email or user.type not in UserType.__members__:
+            results.append(UserImportRowResult(
+                row=row, username=user.username, email=user.email, status="invalid",
+                detail="username, a valid email and type 'user' or 'admin' are required",
+            ))
+        elif username in seen_usernames or email in seen_emails:
+            results.append(UserImportRowResult(
+                row=row, username=username, email=email, status="duplicate", detail="Repeated in the import",
+            ))
+        else:
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            candidates.append((row, {
+                "username": username,
+                "full_name": user.full_name,
+                "email": email,
+                "hashed_password": UNUSABLE_PASSWORD,
+                "type": UserType[user.type],
+            }))
+
+    existing_usernames, existing_emails = set(), set()
+    if candidates:
+        result = await db.execute(select(User.username, User.email).where(or_(
+            User.username.in_([values["username"] for _, values in candidates]),
+            User.email.in_([values["email"] for _, values in candidates]),
+        )))
+        for username, email in result.all():
+            existing_usernames.add(username)
+            existing_emails.add(email)
+
+    to_insert = []
+    for row, values in candidates:
+        if values["username"] in existing_usernames:
+            detail = "Username already exists"
+        elif values["email"] in existing_emails:
+            detail = "Email already exists"
+        else:
+            to_insert.append((row, values))
+            continue
+        results.append(UserImportRowResult(
+            row=row, username=values["username"], email=values["email"], status="exists", detail=detail,
+        ))
+
+    created = []
+    for start in range(0, len(to_insert), CHUNK):
+        chunk = to_insert[start:start + CHUNK]
+        result = await db.execute(
+            insert(User).on_conflict_do_nothing().returning(User.username, User.id),
+            [values for _, values in chunk],
+        )
+        inserted = dict(result.all())
+        for row, values in chunk:
+            user_id = inserted.get(values["username"])
+            if user_id is None:
+                # Registered concurrently since the uniqueness check
+                results.append(UserImportRowResult(
+                    row=row, username=values["username"], email=values["email"], status="exists",
+                    detail="Username or email already exists",
+                ))
+                continue
+            results.append(UserImportRowResult(
+                row=row, username=values["username"], email=values["email"], status="created", user_id=user_id,
+            ))
+            created.append((user_id, values["email"], values["full_name"]))
+    results.sort(key=lambda result: result.row)
+    return results, created
+
+
+def invitation(user_id: int, email: str, full_name: str) -> tuple[str, str, str]:
+    link = RESET_PASSWORD_URL.format(token=create_password_reset_token(user_id))
+    return email, "Set your password", f"Hello {full_name}, set your password here: {link}"
+
+
+def invitation_sender(recipients: list[tuple[int, str, str]]):
+    """Job body sending the invitations in batches, one SMTP connection per batch."""
+    async def send(job: JobStatus):
+        for start in range(0, len(recipients), INVITE_BATCH):
+            batch = recipients[start:start + INVITE_BATCH]
+            # Tokens are minted at send time, so their expiry counts from delivery
+            messages = [invitation(*recipient) for recipient in batch]
+            try:
+                failures = await asyncio.to_thread(send_emails_gmail, messages)
+            except RuntimeError as exc:
+                failures = {email: str(exc) for email, _, _ in messages}
+            job.processed += len(batch)
+            job.failed += len(failures)
+            for email, error in failures.items():
+                job.error(f"{email}: {error}")
+    return send
@@ -0,0 +1,195 @@
+"""Bulk vehicle import for fleet customers.
+
+The request body is read as a stream (CSV or JSON lines; a plain JSON array
+is parsed whole) and processed in chunks of ``CHUNK`` rows. Per chunk, rows
+are validated and their plates normalized in Python. Duplicates against
+registered vehicles are found with one primary-key ``IN`` query on
+``vehicle_entitlements``, which is keyed by normalized plate. The new rows are
+then written with a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING``,
+so a plate registered concurrently is reported instead of failing the batch.
+
+Every input row gets an entry in the report. CSV fields may be quoted but
+must not contain line breaks.
+"""
+import codecs
+import csv
+from typing import AsyncIterator
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schemas import VehicleCreate, VehicleImportRowResult
+from app.models.vehicle import Vehicle, VehicleType
+from app.models.vehicle_entitlement import VehicleEntitlement
+from app.services.plate_index import normalize_plate
+
+CHUNK = 1000
+MAX_PLATE_LENGTH = 10
+
+
+class VehicleImportError(ValueError):
+    """The body as a whole cannot be parsed (bad encoding, JSON or CSV header)."""
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in stream:
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise VehicleImportError(f"Body is not valid UTF-8: {exc}") from exc
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    header = None
+    async for line in _lines(stream):
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if "license_plate" not in header:
+                raise VehicleImportError("CSV header must include license_plate")
+            continue
+        yield dict(zip(header, values))
+
+
+async def json_lines_records(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    async for line in _lines(stream):
+        if line.strip():
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # Reported per row by the validation step
+                yield {"__error__": "Invalid JSON"}
+
+
+async def json_array_records(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    body = b"".join([chunk async for chunk in stream])
+    try:
+        records = orjson.loads(body)
+    except orjson.JSONDecodeError as exc:
+        raise VehicleImportError(f"Invalid JSON: {exc}") from exc
+    if not isinstance(records, list):
+        raise VehicleImportError("JSON body must be an array of vehicles")
+    for record in records:
+        yield record
+
+
+def _validate(row: int, record) -> tuple[dict | None, VehicleImportRowResult | None]:
+    if not isinstance(record, dict) or "__error__" in record:
+        detail = record.get("__error__", "Expected an object") if isinstance(record, dict) else "Expected an object"
+        return None, VehicleImportRowResult(row=row, status="invalid", detail=detail)
+    try:
+        vehicle = VehicleCreate.model_validate(record)
+        vehicle_type = VehicleType(record.get("type") or VehicleType.car.value)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        detail = f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        return None, VehicleImportRowResult(
+            row=row, license_plate=record.get("license_plate"), status="invalid", detail=detail,
+        )
+    except ValueError as exc:
+        return None, VehicleImportRowResult(
+            row=row, license_plate=record.get("license_plate"), status="invalid", detail=str(exc),
+        )
+    plate = normalize_plate(vehicle.license_plate)
+    if not plate or len(plate) > MAX_PLATE_LENGTH:
+        return None, VehicleImportRowResult(
+            row=row, license_plate=vehicle.license_plate, status="invalid", detail="Invalid license plate",
+        )
+    return {
+        "row": row,
+        "plate": plate,
+        "values": {
+            "license_plate": vehicle.license_plate.strip().upper(),
+            "make": vehicle.make,
+            "model": vehicle.model,
+            "color": vehicle.color,
+            "type": vehicle_type,
+        },
+    }, None
+
+
+async def _import_chunk(db: AsyncSession, owner_id: int, chunk: list[dict], seen: set[str]) -> list[VehicleImportRowResult]:
+    results = []
+    fresh = []
+    for item in chunk:
+        if item["plate"] in seen:
+            results.append(VehicleImportRowResult(
+                row=item["row"], license_plate=item["values"]["license_plate"], status="duplicate",
+                detail="License plate repeated in the import",
+            ))
+        else:
+            seen.add(item["plate"])
+            fresh.append(item)
+    if not fresh:
+        return results
+
+    existing = set((await db.execute(
+        select(VehicleEntitlement.plate).where(VehicleEntitlement.plate.in_([item["plate"] for item in fresh]))
+    )).scalars().all())
+    to_insert = []
+    for item in fresh:
+        if item["plate"] in existing:
+            results.append(VehicleImportRowResult(
+                row=item["row"], license_plate=item["values"]["license_plate"], status="exists",
+                detail="License plate already exists",
+            ))
+        else:
+            to_insert.append(item)
+    if not to_insert:
+        return results
+
+    # executemany with RETURNING: SQLAlchemy batches it into multi-row INSERTs, compiled once.
+    # No conflict target: a plate taken meanwhile may collide on the normalized-plate index too
+    inserted = dict((await db.execute(
+        insert(Vehicle)
+        .on_conflict_do_nothing()
+        .returning(Vehicle.license_plate, Vehicle.id),
+        [{**item["values"], "owner_id": owner_id} for item in to_insert],
+    )).all())
+    for item in to_insert:
+        plate = item["values"]["license_plate"]
+        vehicle_id = inserted.get(plate)
+        if vehicle_id is None:
+            results.append(VehicleImportRowResult(
+                row=item["row"], license_plate=plate, status="exists", detail="License plate already exists",
+            ))
+        else:
+            results.append(VehicleImportRowResult(
+                row=item["row"], license_plate=plate, status="created", vehicle_id=vehicle_id,
+            ))
+    return results
+
+
+async def import_vehicles(db: AsyncSession, owner_id: int, records: AsyncIterator[dict]) -> list[VehicleImportRowResult]:
+    """Import ``records`` for ``owner_id`` in the caller's transaction; returns one result per row."""
+    results: list[VehicleImportRowResult] = []
+    seen: set[str] = set()
+    chunk: list[dict] = []
+    row = 0
+    async for record in records:
+        row += 1
+        item, failure = _validate(row, record)
+        if failure:
+            results.append(failure)
+            continue
+        chunk.append(item)
+        if len(chunk) >= CHUNK:
+            results.extend(await _import_chunk(db, owner_id, chunk, seen))
+            chunk = []
+    if chunk:
+        results.extend(await _import_chunk(db, owner_id, chunk, seen))
+    results.sort(key=lambda result: result.row)
+    return results
@@ -0,0 +1,58 @@
+"""Rebuild the access-event rollup tables from ``access_logs``.
+
+Live access checks keep the rollups up to date; run this once after deploying
+the rollup tables, and after loading logs out of band (e.g. with
+``generate_data.py``). Each day is rebuilt in its own transaction, and
+rebuilding a range twice gives the same result.
+
+Examples (from the ``backend`` directory)::
+
+    python backfill_rollups.py --days 90
+    python backfill_rollups.py --since 2025-06-01 --until 2025-07-01
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.access_log import AccessLog
+from app.services.access_rollups import backfill, day_start
+from sqlalchemy import func, select
+
+
+async def run(since: datetime | None, until: datetime | None):
+    engine.echo = False
+    async with AsyncSessionLocal() as db:
+        if since is None:
+            since = (await db.execute(select(func.min(AccessLog.timestamp)))).scalar()
+            if since is None:
+                print("access_logs is empty, nothing to backfill")
+                return
+    until = until or datetime.utcnow()
+    day = day_start(since)
+    total_start = time.perf_counter()
+    while day < until:
+        next_day = day + timedelta(days=1)
+        async with AsyncSessionLocal() as db:
+            await backfill(db, max(day, since), min(next_day, until))
+            await db.commit()
+        print(f"{day.date()}: rebuilt")
+        day = next_day
+    print(f"Done in {time.perf_counter() - total_start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild hourly/daily access rollups from access_logs.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Start (UTC); default: the oldest log")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="End (UTC, exclusive); default: now")
+    parser.add_argument("--days", type=int, help="Shortcut for --since <now - DAYS days>")
+    args = parser.parse_args()
+    since = args.since
+    if args.days is not None:
+        since = datetime.utcnow() - timedelta(days=args.days)
+    asyncio.run(run(since, args.until))
+
+
+if __name__ == "__main__":
+    main()
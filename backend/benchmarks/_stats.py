@@ -0,0 +1,10 @@
+"""Statistics shared by the benchmark scripts."""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; returns 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
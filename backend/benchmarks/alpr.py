@@ -0,0 +1,174 @@
+"""Offline benchmark for the licence plate recognition pipeline.
+
+Replays recorded footage (a directory of images and/or video files) through
+the same detect -> filter -> OCR code path used by ``camera_local`` and
+reports throughput, per-stage latency percentiles and plate accuracy.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.alpr footage/ --ground-truth footage/labels.csv
+
+The ground-truth file is a CSV with ``file,plate`` columns, where ``file`` is
+the path relative to the footage directory. Video files are scored once, using
+the most frequent plate read across their frames.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import cv2
+
+import camera_local
+from benchmarks._stats import percentile
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
+STAGES = ("detect", "filter", "ocr", "total")
+
+
+def load_ground_truth(path):
+    if path is None:
+        return {}
+    with open(path, newline="") as f:
+        return {
+            # Same normalisation as the OCR output, so "AA-00-BB" matches "AA00BB"
+            row["file"].strip(): re.sub(r"[^A-Z0-9]", "", row["plate"].upper())
+            for row in csv.DictReader(f)
+        }
+
+
+def iter_samples(footage_dir, frame_step=1):
+    """Yield ``(relative_name, frames)`` for every image or video in the directory."""
+    root = Path(footage_dir)
+    for path in sorted(root.rglob("*")):
+        suffix = path.suffix.lower()
+        name = path.relative_to(root).as_posix()
+        if suffix in IMAGE_EXTENSIONS:
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                yield name, [frame]
+        elif suffix in VIDEO_EXTENSIONS:
+            yield name, iter_video_frames(path, frame_step)
+
+
+def iter_video_frames(path, frame_step=1):
+    cap = cv2.VideoCapture(str(path))
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % frame_step == 0:
+                yield frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def process_frame(frame, timings):
+    """Run one frame through the pipeline, recording per-stage latency in ms."""
+    start = time.perf_counter()
+    boxes = camera_local.detect(frame)
+    t_detect = time.perf_counter()
+    rois = camera_local.extract_plate_rois(frame, boxes)
+    t_filter = time.perf_counter()
+    plates = []
+    for roi in rois:
+        _, clean = camera_local.preprocess_and_ocr(roi)
+        if camera_local.is_plate_candidate(clean):
+            plates.append(clean)
+    end = time.perf_counter()
+
+    timings["detect"].append((t_detect - start) * 1000)
+    timings["filter"].append((t_filter - t_detect) * 1000)
+    timings["ocr"].append((end - t_filter) * 1000)
+    timings["total"].append((end - start) * 1000)
+    return plates
+
+
+def run(footage_dir, ground_truth, frame_step=1, warmup=1, max_frames=None):
+    timings = defaultdict(list)
+    results = []
+    frames_seen = 0
+
+    for name, frames in iter_samples(footage_dir, frame_step):
+        reads = Counter()
+        for frame in frames:
+            # The first inferences pay for lazy model initialisation; keep them out of the numbers.
+            stage_timings = timings if frames_seen >= warmup else defaultdict(list)
+            for plate in process_frame(frame, stage_timings):
+                reads[plate] += 1
+            frames_seen += 1
+            if max_frames and frames_seen >= max_frames:
+                break
+        predicted = reads.most_common(1)[0][0] if reads else ""
+        results.append({"file": name, "predicted": predicted, "expected": ground_truth.get(name)})
+        if max_frames and frames_seen >= max_frames:
+            break
+
+    timed_frames = len(timings["total"])
+    wall_ms = sum(timings["total"])
+    labelled = [r for r in results if r["expected"]]
+    correct = sum(1 for r in labelled if r["predicted"] == r["expected"])
+    return {
+        "frames": frames_seen,
+        "samples": len(results),
+        "fps": timed_frames / (wall_ms / 1000) if wall_ms else 0.0,
+        "latency_ms": {
+            stage: {
+                "p50": percentile(timings[stage], 50),
+                "p95": percentile(timings[stage], 95),
+                "p99": percentile(timings[stage], 99),
+            }
+            for stage in STAGES
+        },
+        "labelled_samples": len(labelled),
+        "accuracy": correct / len(labelled) if labelled else None,
+        "misses": [r for r in labelled if r["predicted"] != r["expected"]],
+    }
+
+
+def print_report(report):
+    print(f"Frames: {report['frames']}  Samples: {report['samples']}  FPS: {report['fps']:.2f}")
+    print(f"{'stage':<8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage in STAGES:
+        lat = report["latency_ms"][stage]
+        print(f"{stage:<8}{lat['p50']:>10.1f}{lat['p95']:>10.1f}{lat['p99']:>10.1f}")
+    if report["accuracy"] is not None:
+        print(f"Plate accuracy: {report['accuracy']:.1%} ({report['labelled_samples']} labelled samples)")
+        for miss in report["misses"]:
+            print(f"  - {miss['file']}: expected {miss['expected']}, got {miss['predicted'] or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded footage through the ALPR pipeline.")
+    parser.add_argument("footage", help="Directory with images and/or video files")
+    parser.add_argument("--ground-truth", help="CSV file with 'file,plate' columns")
+    parser.add_argument("--frame-step", type=int, default=1, help="Only process every Nth video frame")
+    parser.add_argument("--warmup", type=int, default=1, help="Frames run before timing starts")
+    parser.add_argument("--max-frames", type=int, help="Stop after this many frames")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.footage,
+        load_ground_truth(args.ground_truth),
+        frame_step=args.frame_step,
+        warmup=args.warmup,
+        max_frames=args.max_frames,
+    )
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Performance benchmark for the hot API endpoints.
+
+Drives ``app.main:app`` in-process through an ASGI client against a seeded
+local database, and reports throughput and p50/p95/p99 latency per endpoint.
+Results can be saved as a baseline and later runs compared against it; the
+command exits non-zero when an endpoint regresses beyond the threshold or any
+request fails.
+
+Access checks are spread over ``--cameras`` simulated cameras, each sending its
+own signed ``X-Camera-Token``, so admission control (app/core/admission.py)
+sees the same per-camera rates as in production. By default there are enough
+cameras for none to exceed its ``ACCESS_BURST``.
+
+Usage (from the ``backend`` directory, pointing DATABASE_URL at a scratch DB)::
+
+    python -m benchmarks.api --reset --users 1000 --access-logs 200000 --save-baseline
+    python -m benchmarks.api --users 1000 --access-logs 200000 --threshold 0.2
+
+WARNING: ``--reset`` drops and recreates every table in DATABASE_URL.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.core.security import create_camera_token
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.base import Base
+from app.models.access_log import AccessLog
+from app.models.parking_space import ParkingSpace
+from app.models.payment import Payment
+from app.models.plan import Plan
+from app.models.subscription import Subscription
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+from app.models.token_blacklist import TokenBlacklist  # noqa: F401 - registers the table
+from app.models.user import User, UserType
+from app.models.vehicle import Vehicle
+from app.services.entitlements import rebuild_entitlements
+from benchmarks._stats import percentile
+
+BASELINE_PATH = Path(__file__).with_name("api_baseline.json")
+ADMIN_USERNAME = "bench_admin"
+BENCH_PASSWORD = "bench123"
+CHUNK = 5000
+
+
+async def insert_rows(session, model, rows, returning=None):
+    """Bulk insert ``rows`` in chunks, optionally returning a column per row."""
+    returned = []
+    for start in range(0, len(rows), CHUNK):
+        chunk = rows[start:start + CHUNK]
+        if returning is not None:
+            result = await session.execute(insert(model).returning(returning), chunk)
+            returned.extend(result.scalars().all())
+        else:
+            await session.execute(insert(model), chunk)
+    return returned
+
+
+async def seed_dataset(users, vehicles_per_user, access_logs):
+    """Create a synthetic dataset of the requested size in an empty schema."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # bcrypt is deliberately slow; every benchmark user shares one hash.
+    hashed = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(BENCH_PASSWORD)
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        user_rows = [{"username": ADMIN_USERNAME, "full_name": "Bench Admin", "email": "bench_admin@gatewise.com",
+                      "hashed_password": hashed, "type": UserType.admin}]
+        user_rows += [
+            {"username": f"bench_user{i}", "full_name": f"Bench User {i}", "email": f"bench_user{i}@gatewise.com",
+             "hashed_password": hashed, "type": UserType.user}
+            for i in range(users)
+        ]
+        user_ids = await insert_rows(session, User, user_rows, returning=User.id)
+
+        vehicle_rows = [
+            {"license_plate": f"BN{idx:06d}{v}", "make": "Make", "model": "Model", "color": "black", "owner_id": uid}
+            for idx, uid in enumerate(user_ids)
+            for v in range(vehicles_per_user)
+        ]
+        vehicle_ids = await insert_rows(session, Vehicle, vehicle_rows, returning=Vehicle.id)
+
+        plan_id = (await insert_rows(session, Plan, [{"name": "Bench", "price": 10.0, "num_spaces": 1,
+                                                      "description": "Benchmark plan", "duration_days": 30}],
+                                     returning=Plan.id))[0]
+        sub_rows = [
+            {"user_id": uid, "plan_id": plan_id, "start_date": now - timedelta(days=5),
+             "end_date": now + timedelta(days=25), "status": "active", "spaces_allocated": 1,
+             "price_at_subscription": 10.0}
+            for uid in user_ids
+        ]
+        sub_ids = await insert_rows(session, Subscription, sub_rows, returning=Subscription.id)
+        await insert_rows(session, Payment, [
+            {"subscription_id": sid, "amount": 10.0, "paid_at": now - timedelta(days=random.randint(0, 5)),
+             "status": random.choice(["paid", "paid", "pending"])}
+            for sid in sub_ids
+        ])
+        space_ids = await insert_rows(session, ParkingSpace, [
+            {"name": f"PS-{i:06d}", "description": f"Vaga {i}", "is_allocated": True, "is_occupied": False}
+            for i in range(len(sub_ids))
+        ], returning=ParkingSpace.id)
+        await insert_rows(session, SubscriptionParkingSpace, [
+            {"subscription_id": sid, "parking_space_id": psid, "order": 0}
+            for sid, psid in zip(sub_ids, space_ids)
+        ])
+        log_rows = []
+        for _ in range(access_logs):
+            idx = random.randrange(len(vehicle_rows))
+            granted = random.random() < 0.9
+            log_rows.append({
+                "license_plate": vehicle_rows[idx]["license_plate"], "vehicle_id": vehicle_ids[idx],
+                "user_id": vehicle_rows[idx]["owner_id"], "granted": granted,
+                "reason": "Access granted" if granted else "No active subscription for vehicle owner",
+                "timestamp": now - timedelta(minutes=random.randint(0, 60 * 24 * 90)),
+            })
+            if len(log_rows) >= CHUNK:
+                await insert_rows(session, AccessLog, log_rows)
+                log_rows = []
+        await insert_rows(session, AccessLog, log_rows)
+        await rebuild_entitlements(session)
+        await session.commit()
+    return [row["license_plate"] for row in vehicle_rows]
+
+
+async def login(client, username):
+    response = await client.post("/api/v1/login", data={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def build_scenarios(plates, admin_headers, users, cameras):
+    """Map endpoint name -> coroutine factory issuing one request."""
+    camera_tokens = itertools.cycle([create_camera_token(f"bench-camera-{i}") for i in range(cameras)])
+    return {
+        "access_check": lambda c: c.post("/api/v1/access_check", json={"license_plate": random.choice(plates)},
+                                         headers={"X-Camera-Token": next(camera_tokens)}),
+        "login": lambda c: c.post("/api/v1/login", data={"username": f"bench_user{random.randrange(users)}",
+                                                          "password": BENCH_PASSWORD}),
+        "access_logs": lambda c: c.get("/api/v1/access_logs", params={"page": 1, "size": 50}, headers=admin_headers),
+        "payments": lambda c: c.get("/api/v1/payments/", params={"page": 1, "size": 50}, headers=admin_headers),
+        "parking_spaces": lambda c: c.get("/api/v1/parking-spaces/", params={"page": 1, "size": 50},
+                                          headers=admin_headers),
+        "subscriptions": lambda c: c.get("/api/v1/subscriptions/", headers=admin_headers),
+    }
+
+
+async def measure(client, request_factory, requests, concurrency):
+    latencies = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            response = await request_factory(client)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def run_benchmark(args):
+    # SQL echo would dominate the timings.
+    engine.echo = False
+    if args.reset:
+        plates = await seed_dataset(args.users, args.vehicles_per_user, args.access_logs)
+    else:
+        plates = [f"BN{idx:06d}{v}" for idx in range(args.users + 1) for v in range(args.vehicles_per_user)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        admin_headers = {"Authorization": f"Bearer {await login(client, ADMIN_USERNAME)}"}
+        cameras = args.cameras or math.ceil((args.requests + args.warmup) / get_settings().ACCESS_BURST)
+        scenarios = build_scenarios(plates, admin_headers, args.users, cameras)
+        selected = args.endpoints or list(scenarios)
+        results = {}
+        for name in selected:
+            # login runs bcrypt on purpose, so it gets far fewer iterations
+            requests = max(1, args.requests // 10) if name == "login" else args.requests
+            await measure(client, scenarios[name], min(requests, args.warmup), args.concurrency)
+            results[name] = await measure(client, scenarios[name], requests, args.concurrency)
+    return results
+
+
+def scale_key(args):
+    return f"users={args.users},vehicles_per_user={args.vehicles_per_user},access_logs={args.access_logs}"
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human readable regressions against the baseline."""
+    regressions = []
+    for name, current in results.items():
+        if current["errors"]:
+            # Failed requests (e.g. 429 from admission control) are cheap and would pass for a speedup
+            regressions.append(f"{name}: {current['errors']} of {current['requests']} requests failed")
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f}ms vs baseline {previous['p95_ms']:.1f}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']:.1f} rps vs baseline {previous['throughput_rps']:.1f} rps"
+            )
+    return regressions
+
+
+def print_report(results):
+    print(f"{'endpoint':<16}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['throughput_rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints in-process.")
+    parser.add_argument("--reset", action="store_true", help="Drop, recreate and seed the database first")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--vehicles-per-user", type=int, default=2)
+    parser.add_argument("--access-logs", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per endpoint")
+    parser.add_argument("--cameras", type=int, help="Simulated cameras for access_check (default: none over its burst)")
+    parser.add_argument("--endpoints", nargs="*", help="Subset of endpoints to run")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_benchmark(args))
+    print_report(results)
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    key = scale_key(args)
+    failed = [name for name, r in results.items() if r["errors"]]
+    if args.save_baseline:
+        if failed:
+            print(f"Not saving a baseline: requests failed for {', '.join(failed)}")
+            return 1
+        baselines[key] = results
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"Baseline saved to {args.baseline} [{key}]")
+        return 0
+    if key not in baselines:
+        print(f"No baseline for [{key}]; run with --save-baseline to record one.")
+        if failed:
+            print(f"Requests failed for {', '.join(failed)}")
+            return 1
+        return 0
+    regressions = compare(results, baselines[key], args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Micro-benchmark for list response serialization.
+
+Compares, per page of items, the CPU time of the previous path (per-item
+``model_validate`` followed by ``jsonable_encoder`` and the standard JSON
+encoder) with the batch ``TypeAdapter`` validation and trusted rendering in
+``app.core.serialization``.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.serialization --items 1000 --repeat 50
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_pagination import Page, Params
+
+from app.core.serialization import trusted_page, validate_list
+from app.models.schemas import PaymentWithDetailsOut, SubscriptionWithDetailsOut
+
+
+def make_subscriptions(n):
+    """ORM-like objects shaped like a joined Subscription row."""
+    now = datetime.utcnow()
+    plan = SimpleNamespace(id=1, name="Basic", price=10.0, num_spaces=1, description="Plano básico",
+                           duration_days=30, active=1)
+    return [
+        SimpleNamespace(
+            id=i, user_id=i, plan_id=1, start_date=now, end_date=now + timedelta(days=30), status="active",
+            cancellation_date=None, spaces_allocated=1, price_at_subscription=10.0, plan=plan,
+            user=SimpleNamespace(id=i, email=f"user{i}@gatewise.com", full_name=f"User {i}"),
+        )
+        for i in range(n)
+    ]
+
+
+def make_payments(n):
+    now = datetime.utcnow()
+    return [
+        {"id": i, "subscription_id": i, "amount": 10.0, "paid_at": now, "status": "paid",
+         "plan_name": "Basic", "user_full_name": f"User {i}"}
+        for i in range(n)
+    ]
+
+
+def render_standard(page):
+    """What FastAPI + Starlette's JSONResponse did for these endpoints before."""
+    return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def subscriptions_before(objs, params):
+    items = [SubscriptionWithDetailsOut.model_validate(o, from_attributes=True) for o in objs]
+    return render_standard(Page.create(items=items, total=len(items), params=params))
+
+
+def subscriptions_after(objs, params):
+    items = validate_list(SubscriptionWithDetailsOut, objs)
+    return trusted_page(SubscriptionWithDetailsOut, Page.create(items=items, total=len(items), params=params)).body
+
+
+def payments_before(rows, params):
+    items = [PaymentWithDetailsOut.model_validate(r) for r in rows]
+    return render_standard(Page.create(items=items, total=len(items), params=params))
+
+
+def payments_after(rows, params):
+    items = [PaymentWithDetailsOut.model_construct(**r) for r in rows]
+    return trusted_page(PaymentWithDetailsOut, Page.create(items=items, total=len(items), params=params)).body
+
+
+def cpu_ms_per_call(func, data, params, repeat):
+    func(data, params)  # warm up adapter/serializer caches
+    start = time.process_time()
+    for _ in range(repeat):
+        func(data, params)
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CPU time spent serializing list pages.")
+    parser.add_argument("--items", type=int, default=1000, help="Items per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    SubscriptionWithDetailsOut.model_rebuild()
+    params = Params(page=1, size=min(args.items, 100))
+    cases = [
+        ("subscriptions", make_subscriptions(args.items), subscriptions_before, subscriptions_after),
+        ("payments", make_payments(args.items), payments_before, payments_after),
+    ]
+    print(f"CPU ms per {args.items}-item page")
+    print(f"{'endpoint':<15}{'before':>10}{'after':>10}{'saved':>10}")
+    for name, data, before, after in cases:
+        assert json.loads(before(data, params)) == json.loads(after(data, params))
+        t_before = cpu_ms_per_call(before, data, params, args.repeat)
+        t_after = cpu_ms_per_call(after, data, params, args.repeat)
+        print(f"{name:<15}{t_before:>10.2f}{t_after:>10.2f}{1 - t_after / t_before:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
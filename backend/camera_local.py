@@ -2,6 +2,7 @@ import cv2
 from ultralytics import YOLO
 import easyocr
 import numpy as np
+import os
 import re
 import time
 import requests
@@ -9,11 +10,20 @@ import requests
 # === Configurações ===
 model = YOLO("models/license_plate.pt")  # Modelo YOLO treinado para matrículas
 API_URL = "http://localhost:8000/api/v1/access_check"  # Endpoint da API
+# Token da câmara (POST /api/v1/access_check/camera_tokens): dá-lhe um limite próprio no
+# controlo de admissão da API; sem ele a câmara partilha o limite do seu endereço IP
+CAMERA_TOKEN = os.getenv("CAMERA_TOKEN")
 CONF_THRESH = 0.3  # Confiança mínima para deteção
 SHOW_DEBUG = True  # Mostrar janelas com imagem
 
 reader = easyocr.Reader(['en'])  # Inicializar OCR
 
+# Sessão HTTP persistente: reutiliza a ligação TCP entre pedidos
+# (controladores de cancela podem usar o canal WebSocket /api/v1/gates/{gate_id}/ws)
+session = requests.Session()
+if CAMERA_TOKEN:
+    session.headers["X-Camera-Token"] = CAMERA_TOKEN
+
 def preprocess_and_ocr(img):
     """
     Remove zonas amarelas (selo) da imagem antes de passar para OCR.
@@ -39,11 +49,52 @@ def validate_plate(plate):
     Faz chamada à API com a matrícula.
     """
     try:
-        r = requests.post(API_URL, json={"license_plate": plate}, timeout=2)
+        r = session.post(API_URL, json={"license_plate": plate}, timeout=2)
+        if r.status_code == 429:
+            return {"error": "rate_limited", "retry_after": r.headers.get("Retry-After")}
         return r.json()
     except:
         return {"error": "timeout"}
 
+def detect(frame):
+    """
+    Corre o YOLO sobre o frame e devolve as caixas detetadas.
+    """
+    return model(frame)[0].boxes
+
+def extract_plate_rois(frame, boxes):
+    """
+    Filtra as caixas por confiança e proporção e devolve os recortes (com margem).
+    """
+    rois = []
+    h, w = frame.shape[:2]
+    pad = 10
+    for b in boxes:
+        if float(b.conf[0]) < CONF_THRESH:
+            continue
+
+        x1, y1, x2, y2 = map(int, b.xyxy[0])
+        box_width = x2 - x1
+        box_height = y2 - y1
+        aspect_ratio = box_width / box_height
+
+        if aspect_ratio < 2.5:
+            continue
+
+        x1 = max(0, x1 - pad)
+        y1 = max(0, y1 - pad)
+        x2 = min(w, x2 + pad)
+        y2 = min(h, y2 + pad)
+        rois.append(frame[y1:y2, x1:x2])
+    return rois
+
+def is_plate_candidate(clean):
+    """
+    Aceita leituras com um caráter a mais ou a menos do que uma matrícula
+    portuguesa (6); o servidor faz a correspondência aproximada.
+    """
+    return 5 <= len(clean) <= 7
+
 def main():
     cap = cv2.VideoCapture(0)
     print("🔁 Loop iniciado. Pressiona 'q' para sair.")
@@ -58,32 +109,12 @@ def main():
             print("⛔ Erro na câmara")
             break
 
-        results = model(frame)[0]
-        for b in results.boxes:
-            if float(b.conf[0]) < CONF_THRESH:
-                continue
-
-            x1, y1, x2, y2 = map(int, b.xyxy[0])
-            box_width = x2 - x1
-            box_height = y2 - y1
-            aspect_ratio = box_width / box_height
-
-            if aspect_ratio < 2.5:
-                continue
-
-            pad = 10
-            h, w = frame.shape[:2]
-            x1 = max(0, x1 - pad)
-            y1 = max(0, y1 - pad)
-            x2 = min(w, x2 + pad)
-            y2 = min(h, y2 + pad)
-
-            roi = frame[y1:y2, x1:x2]
+        for roi in extract_plate_rois(frame, detect(frame)):
             raw, clean = preprocess_and_ocr(roi)
 
             now = time.time()
 
-            if len(clean) != 6:
+            if not is_plate_candidate(clean):
                 continue
 
             if clean == last_plate and (now - last_success_time) < 20:
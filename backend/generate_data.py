@@ -0,0 +1,313 @@
+"""Bulk synthetic data generator for performance testing.
+
+Unlike ``seed.py``, which inserts a small demo dataset one ORM object at a
+time, this command loads large datasets with PostgreSQL ``COPY``. Rows are
+generated and copied in parallel chunks by a pool of worker processes, each
+with its own connection, so a 10M row access log builds in minutes.
+
+Examples (from the ``backend`` directory)::
+
+    python generate_data.py --users 20000 --access-logs 10000000
+    python generate_data.py --truncate --users 1000 --access-logs 500000 --workers 4
+
+Generated users share the password ``generated123``.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import asyncpg
+from passlib.context import CryptContext
+
+from app.core.config import get_settings
+from app.services.entitlements import rebuild_sql
+
+GENERATED_PASSWORD = "generated123"
+GRANTED_REASON = "Access granted: active subscription and allocated parking space found"
+DENIED_REASONS = ["No active subscription for vehicle owner", "Vehicle not found", "Subscription expired"]
+PLANS = [
+    {"name": "Basic", "price": 10.0, "num_spaces": 1, "description": "Plano básico", "duration_days": 30},
+    {"name": "Family", "price": 25.0, "num_spaces": 3, "description": "Plano família", "duration_days": 30},
+    {"name": "Premium", "price": 50.0, "num_spaces": 6, "description": "Plano premium", "duration_days": 30},
+    {"name": "Annual", "price": 100.0, "num_spaces": 2, "description": "Plano anual", "duration_days": 365},
+]
+SPACE_TYPES = ["regular"] * 85 + ["ev"] * 7 + ["disabled"] * 5 + ["pregnant"] * 3
+COLORS = ["red", "blue", "green", "black", "white", "grey", "silver"]
+MAKES = ["Renault", "Peugeot", "Volkswagen", "Toyota", "BMW", "Mercedes", "Fiat", "Tesla"]
+
+COLUMNS = {
+    "users": ("id", "username", "full_name", "email", "hashed_password", "type"),
+    "vehicles": ("id", "license_plate", "make", "model", "color", "type", "created_at", "updated_at", "owner_id"),
+    "subscriptions": ("id", "user_id", "plan_id", "start_date", "end_date", "status", "cancellation_date",
+                      "spaces_allocated", "price_at_subscription"),
+    "payments": ("id", "subscription_id", "amount", "paid_at", "status"),
+    "parking_spaces": ("id", "name", "description", "type", "is_allocated", "is_occupied", "vehicle_id"),
+    "subscription_parking_spaces": ("id", "subscription_id", "parking_space_id", "order"),
+    "access_logs": ("id", "license_plate", "vehicle_id", "user_id", "granted", "reason", "timestamp"),
+}
+LOAD_ORDER = ["users", "vehicles", "subscriptions", "payments", "parking_spaces", "access_logs"]
+
+
+def asyncpg_dsn():
+    return get_settings().DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+
+def plate_for(n):
+    """Deterministic, unique "AB12CD" style plate for ``n`` < 45.7M."""
+    n, digits = divmod(n, 100)
+    letters = []
+    for _ in range(4):
+        n, r = divmod(n, 26)
+        letters.append(chr(65 + r))
+    return f"{letters[0]}{letters[1]}{digits:02d}{letters[2]}{letters[3]}"
+
+
+def subscription_profile(i, ctx):
+    """Plan, dates and status of the i-th generated subscription.
+
+    Derived from the index alone so subscription and payment workers agree
+    without sharing state.
+    """
+    rng = random.Random(ctx["seed"] * 1_000_003 + i)
+    plan = ctx["plans"][rng.randrange(len(ctx["plans"]))]
+    now = ctx["now"]
+    roll = rng.random()
+    if roll < 0.75:
+        # Active: currently inside its billing period
+        start = now - timedelta(days=rng.uniform(0, plan["duration_days"]))
+        status = "active"
+    elif roll < 0.95:
+        start = now - timedelta(days=plan["duration_days"] + rng.uniform(1, 365))
+        status = "inactive"
+    else:
+        start = now - timedelta(days=rng.uniform(0, 365))
+        status = "cancelled"
+    end = start + timedelta(days=plan["duration_days"])
+    cancelled_at = start + (end - start) * rng.random() if status == "cancelled" else None
+    return plan, start, end, status, cancelled_at
+
+
+def access_timestamp(rng, ctx):
+    """Weekday-heavy timestamps with morning and evening rush-hour peaks."""
+    while True:
+        day = ctx["now"] - timedelta(days=rng.randrange(ctx["days"]))
+        if day.weekday() < 5 or rng.random() < 0.4:
+            break
+    roll = rng.random()
+    if roll < 0.45:
+        hour = rng.gauss(8.5, 1.0)
+    elif roll < 0.85:
+        hour = rng.gauss(18.0, 1.2)
+    else:
+        hour = rng.uniform(0, 24)
+    hour = min(max(hour, 0.0), 23.999)
+    return day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=hour)
+
+
+def generate_users(lo, hi, ctx):
+    for i in range(lo, hi):
+        uid = ctx["start"]["users"] + i
+        yield (uid, f"gen_user{uid}", f"Generated User {uid}", f"gen_user{uid}@example.com", ctx["password"], "user")
+
+
+def generate_vehicles(lo, hi, ctx):
+    rng = random.Random(ctx["seed"] + lo)
+    for i in range(lo, hi):
+        vid = ctx["start"]["vehicles"] + i
+        created = ctx["now"] - timedelta(days=rng.uniform(0, 365))
+        yield (vid, plate_for(vid), rng.choice(MAKES), f"Model {rng.randrange(1, 20)}", rng.choice(COLORS),
+               "motorcycle" if rng.random() < 0.1 else "car", created, created,
+               ctx["start"]["users"] + i // ctx["vehicles_per_user"])
+
+
+def generate_subscriptions(lo, hi, ctx):
+    for i in range(lo, hi):
+        plan, start, end, status, cancelled_at = subscription_profile(i, ctx)
+        yield (ctx["start"]["subscriptions"] + i, ctx["start"]["users"] + i % ctx["counts"]["users"], plan["id"],
+               start, end, status, cancelled_at, plan["num_spaces"], plan["price"])
+
+
+def generate_payments(lo, hi, ctx):
+    per_sub = ctx["payments_per_subscription"]
+    rng = random.Random(ctx["seed"] + lo)
+    for i in range(lo, hi):
+        sub_index, k = divmod(i, per_sub)
+        plan, start, _, status, _ = subscription_profile(sub_index, ctx)
+        # Payment k covers the k-th billing period before the current one
+        due = start - timedelta(days=plan["duration_days"] * k)
+        pending = k == 0 and status == "active" and rng.random() < 0.1
+        paid_at = due if pending else due + timedelta(hours=rng.expovariate(1 / 36))
+        yield (ctx["start"]["payments"] + i, ctx["start"]["subscriptions"] + sub_index, plan["price"], paid_at,
+               "pending" if pending else "paid")
+
+
+def generate_parking_spaces(lo, hi, ctx):
+    rng = random.Random(ctx["seed"] + lo)
+    for i in range(lo, hi):
+        sid = ctx["start"]["parking_spaces"] + i
+        yield (sid, f"GS-{sid:07d}", f"Vaga {sid}", rng.choice(SPACE_TYPES), i < ctx["allocated_spaces"], False, None)
+
+
+def generate_access_logs(lo, hi, ctx):
+    rng = random.Random(ctx["seed"] + lo)
+    vehicles = ctx["counts"]["vehicles"]
+    for i in range(lo, hi):
+        if vehicles and rng.random() > 0.03:
+            # Commuters are not uniform: a fifth of the fleet makes most of the trips
+            v = int(vehicles * (rng.random() ** 2.5))
+            vid = ctx["start"]["vehicles"] + v
+            plate, user_id = plate_for(vid), ctx["start"]["users"] + v // ctx["vehicles_per_user"]
+            granted = rng.random() < 0.92
+            reason = GRANTED_REASON if granted else rng.choice(DENIED_REASONS[::2])
+        else:
+            plate, vid, user_id, granted, reason = f"ZZ{rng.randrange(10000):04d}", None, None, False, DENIED_REASONS[1]
+        yield (ctx["start"]["access_logs"] + i, plate, vid, user_id, granted, reason, access_timestamp(rng, ctx))
+
+
+GENERATORS = {
+    "users": generate_users,
+    "vehicles": generate_vehicles,
+    "subscriptions": generate_subscriptions,
+    "payments": generate_payments,
+    "parking_spaces": generate_parking_spaces,
+    "access_logs": generate_access_logs,
+}
+
+
+async def _copy(table, records):
+    conn = await asyncpg.connect(asyncpg_dsn())
+    try:
+        await conn.copy_records_to_table(table, records=records, columns=COLUMNS[table])
+    finally:
+        await conn.close()
+
+
+def load_chunk(table, lo, hi, ctx):
+    """Worker entry point: generate rows [lo, hi) of ``table`` and COPY them in."""
+    records = list(GENERATORS[table](lo, hi, ctx))
+    asyncio.run(_copy(table, records))
+    return len(records)
+
+
+async def prepare(args):
+    """Truncate if asked, make sure plans exist and reserve id ranges per table."""
+    conn = await asyncpg.connect(asyncpg_dsn())
+    try:
+        if args.truncate:
+            await conn.execute(
+                "TRUNCATE access_logs, access_rollups_hourly, access_rollups_daily, parking_sessions, gates, vehicle_entitlements, "
+                "subscription_parking_spaces, payments, subscriptions, parking_spaces, vehicles, token_blacklist, users "
+                "RESTART IDENTITY CASCADE"
+            )
+        plans = [dict(r) for r in await conn.fetch("SELECT id, price, num_spaces, duration_days FROM plans")]
+        if not plans:
+            for plan in PLANS:
+                row = await conn.fetchrow(
+                    "INSERT INTO plans (name, price, num_spaces, description, duration_days, active) "
+                    "VALUES ($1, $2, $3, $4, $5, 1) RETURNING id, price, num_spaces, duration_days",
+                    plan["name"], plan["price"], plan["num_spaces"], plan["description"], plan["duration_days"],
+                )
+                plans.append(dict(row))
+        start = {}
+        for table in LOAD_ORDER + ["subscription_parking_spaces"]:
+            start[table] = await conn.fetchval(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    finally:
+        await conn.close()
+    return plans, start
+
+
+def allocate_spaces(ctx):
+    """Hand out generated spaces, in id order, to active subscriptions until none are left."""
+    rows, next_space = [], 0
+    for i in range(ctx["counts"]["subscriptions"]):
+        plan, _, _, status, _ = subscription_profile(i, ctx)
+        if status != "active":
+            continue
+        if next_space + plan["num_spaces"] > ctx["counts"]["parking_spaces"]:
+            break
+        for order in range(plan["num_spaces"]):
+            rows.append((ctx["start"]["subscription_parking_spaces"] + len(rows), ctx["start"]["subscriptions"] + i,
+                         ctx["start"]["parking_spaces"] + next_space, order))
+            next_space += 1
+    return rows, next_space
+
+
+async def finalize(allocations):
+    conn = await asyncpg.connect(asyncpg_dsn())
+    try:
+        if allocations:
+            await conn.copy_records_to_table("subscription_parking_spaces", records=allocations,
+                                             columns=COLUMNS["subscription_parking_spaces"])
+        # Explicit ids were copied in, so move the serial sequences past them
+        for table in COLUMNS:
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            )
+        # Rows were copied in behind the application's back, so derive the entitlements in bulk
+        for statement in rebuild_sql():
+            await conn.execute(statement)
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic GateWise dataset.")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--vehicles-per-user", type=int, default=2)
+    parser.add_argument("--subscriptions", type=int, help="Defaults to one per user")
+    parser.add_argument("--payments-per-subscription", type=int, default=3)
+    parser.add_argument("--parking-spaces", type=int, default=5000)
+    parser.add_argument("--access-logs", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365, help="History spanned by access logs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Empty all data tables first")
+    args = parser.parse_args()
+
+    plans, start = asyncio.run(prepare(args))
+    counts = {
+        "users": args.users,
+        "vehicles": args.users * args.vehicles_per_user,
+        "subscriptions": args.users if args.subscriptions is None else args.subscriptions,
+        "parking_spaces": args.parking_spaces,
+        "access_logs": args.access_logs,
+    }
+    counts["payments"] = counts["subscriptions"] * args.payments_per_subscription
+    ctx = {
+        "seed": args.seed,
+        "now": datetime.utcnow(),
+        "days": args.days,
+        "plans": plans,
+        "start": start,
+        "counts": counts,
+        "vehicles_per_user": args.vehicles_per_user,
+        "payments_per_subscription": args.payments_per_subscription,
+        # bcrypt is deliberately slow, so every generated user shares one hash
+        "password": CryptContext(schemes=["bcrypt"], deprecated="auto").hash(GENERATED_PASSWORD),
+    }
+    allocations, ctx["allocated_spaces"] = allocate_spaces(ctx)
+
+    total_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for table in LOAD_ORDER:
+            table_start = time.perf_counter()
+            futures = [
+                pool.submit(load_chunk, table, lo, min(lo + args.chunk_size, counts[table]), ctx)
+                for lo in range(0, counts[table], args.chunk_size)
+            ]
+            loaded = sum(f.result() for f in futures)
+            elapsed = time.perf_counter() - table_start
+            print(f"{table}: {loaded} rows in {elapsed:.1f}s ({loaded / elapsed if elapsed else 0:.0f} rows/s)")
+    asyncio.run(finalize(allocations))
+    print(f"subscription_parking_spaces: {len(allocations)} rows")
+    print(f"Done in {time.perf_counter() - total_start:.1f}s. Password for generated users: {GENERATED_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""add matched_plate to access_logs
+
+Revision ID: 20261019_access_log_match
+Revises: 20261019_hot_path_indexes
+Create Date: 2026-10-19 19:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_access_log_match'
+down_revision = '20261019_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('access_logs', sa.Column('matched_plate', sa.String(), nullable=True))
+    op.create_index('ix_access_logs_matched_plate', 'access_logs', ['matched_plate'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_access_logs_matched_plate', table_name='access_logs')
+    op.drop_column('access_logs', 'matched_plate')
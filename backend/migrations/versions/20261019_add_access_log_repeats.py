@@ -0,0 +1,25 @@
+"""add repeat_count and last_seen_at to access_logs
+
+Revision ID: 20261019_access_log_repeats
+Revises: 20261019_vehicle_entitlements
+Create Date: 2026-10-19 15:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_access_log_repeats'
+down_revision = '20261019_vehicle_entitlements'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('access_logs', sa.Column('repeat_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('access_logs', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('access_logs', 'last_seen_at')
+    op.drop_column('access_logs', 'repeat_count')
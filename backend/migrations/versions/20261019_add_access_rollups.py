@@ -0,0 +1,45 @@
+"""add hourly and daily access rollup tables
+
+Revision ID: 20261019_access_rollups
+Revises: 20261019_parking_sessions
+Create Date: 2026-10-19 12:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_access_rollups'
+down_revision = '20261019_parking_sessions'
+branch_labels = None
+depends_on = None
+
+TABLES = ('access_rollups_hourly', 'access_rollups_daily')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_table(
+            table,
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('bucket_start', sa.DateTime(), nullable=False),
+            sa.Column('lot_id', sa.Integer(), nullable=True),
+            sa.Column('granted', sa.Boolean(), nullable=False),
+            sa.Column('reason', sa.String(), nullable=False),
+            sa.Column('vehicle_type', sa.String(), nullable=True),
+            sa.Column('user_type', sa.String(), nullable=True),
+            sa.Column('events', sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            f'ux_{table}_bucket_dims',
+            table,
+            ['bucket_start', 'lot_id', 'granted', 'reason', 'vehicle_type', 'user_type'],
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f'ux_{table}_bucket_dims', table_name=table)
+        op.drop_table(table)
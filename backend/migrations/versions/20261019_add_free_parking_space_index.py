@@ -0,0 +1,28 @@
+"""add partial index on free parking spaces by type
+
+Revision ID: 20261019_free_space_index
+Revises: 20250623_add_type_parking_space
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_free_space_index'
+down_revision = '20250623_add_type_parking_space'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_parking_spaces_free_by_type',
+        'parking_spaces',
+        ['type', 'id'],
+        postgresql_where=sa.text('NOT is_allocated'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_parking_spaces_free_by_type', table_name='parking_spaces')
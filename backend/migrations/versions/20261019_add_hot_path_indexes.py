@@ -0,0 +1,46 @@
+"""add indexes for hot subscription, payment, allocation, vehicle and access log filters
+
+Revision ID: 20261019_hot_path_indexes
+Revises: 20261019_subscription_expiry
+Create Date: 2026-10-19 17:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_hot_path_indexes'
+down_revision = '20261019_subscription_expiry'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Active subscriptions of a user (create/allocate/entitlements)
+    op.create_index('ix_subscriptions_user_id_status', 'subscriptions', ['user_id', 'status'])
+    # Latest paid payment of a subscription (renewals) and existing-payment checks
+    op.create_index(
+        'ix_payments_subscription_id_status_paid_at', 'payments', ['subscription_id', 'status', 'paid_at']
+    )
+    # Paid amounts per period (summary, total-paid)
+    op.create_index(
+        'ix_payments_paid_at_paid', 'payments', ['paid_at'], postgresql_where=sa.text("status = 'paid'")
+    )
+    # Spaces of a subscription in allocation order
+    op.create_index(
+        'ix_subscription_parking_spaces_subscription_id_order',
+        'subscription_parking_spaces',
+        ['subscription_id', 'order'],
+    )
+    op.create_index('ix_vehicles_owner_id', 'vehicles', ['owner_id'])
+    # Newest-first access log pages and time range scans
+    op.create_index('ix_access_logs_timestamp', 'access_logs', ['timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_access_logs_timestamp', table_name='access_logs')
+    op.drop_index('ix_vehicles_owner_id', table_name='vehicles')
+    op.drop_index('ix_subscription_parking_spaces_subscription_id_order', table_name='subscription_parking_spaces')
+    op.drop_index('ix_payments_paid_at_paid', table_name='payments')
+    op.drop_index('ix_payments_subscription_id_status_paid_at', table_name='payments')
+    op.drop_index('ix_subscriptions_user_id_status', table_name='subscriptions')
@@ -0,0 +1,59 @@
+"""add gates table and lot_id to parking_spaces and access_logs
+
+Revision ID: 20261019_lot_scoping
+Revises: 20261019_free_space_index
+Create Date: 2026-10-19 10:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_lot_scoping'
+down_revision = '20261019_free_space_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'gates',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('lot_id', sa.Integer(), sa.ForeignKey('parking_lots.id'), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+    )
+    op.create_index('ix_gates_id', 'gates', ['id'])
+    op.create_index('ix_gates_lot_id', 'gates', ['lot_id'])
+
+    op.add_column('parking_spaces', sa.Column('lot_id', sa.Integer(), sa.ForeignKey('parking_lots.id'), nullable=True))
+    op.add_column('access_logs', sa.Column('lot_id', sa.Integer(), sa.ForeignKey('parking_lots.id'), nullable=True))
+    op.add_column('access_logs', sa.Column('gate_id', sa.Integer(), sa.ForeignKey('gates.id'), nullable=True))
+
+    # The allocator's free-space index becomes lot-scoped
+    op.drop_index('ix_parking_spaces_free_by_type', table_name='parking_spaces')
+    op.create_index(
+        'ix_parking_spaces_free_by_lot_type',
+        'parking_spaces',
+        ['lot_id', 'type', 'id'],
+        postgresql_where=sa.text('NOT is_allocated'),
+    )
+    op.create_index('ix_parking_spaces_lot_id_id', 'parking_spaces', ['lot_id', 'id'])
+    op.create_index('ix_access_logs_lot_id_timestamp', 'access_logs', ['lot_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_access_logs_lot_id_timestamp', table_name='access_logs')
+    op.drop_index('ix_parking_spaces_lot_id_id', table_name='parking_spaces')
+    op.drop_index('ix_parking_spaces_free_by_lot_type', table_name='parking_spaces')
+    op.create_index(
+        'ix_parking_spaces_free_by_type',
+        'parking_spaces',
+        ['type', 'id'],
+        postgresql_where=sa.text('NOT is_allocated'),
+    )
+    op.drop_column('access_logs', 'gate_id')
+    op.drop_column('access_logs', 'lot_id')
+    op.drop_column('parking_spaces', 'lot_id')
+    op.drop_index('ix_gates_lot_id', table_name='gates')
+    op.drop_index('ix_gates_id', table_name='gates')
+    op.drop_table('gates')
@@ -0,0 +1,57 @@
+"""add parking_sessions table and direction to access_logs
+
+Revision ID: 20261019_parking_sessions
+Revises: 20261019_lot_scoping
+Create Date: 2026-10-19 11:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_parking_sessions'
+down_revision = '20261019_lot_scoping'
+branch_labels = None
+depends_on = None
+
+# Created by add_vehicle_type_column
+vehicle_type_enum = postgresql.ENUM('car', 'motorcycle', name='vehicletype', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'parking_sessions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('license_plate', sa.String(), nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), sa.ForeignKey('vehicles.id'), nullable=False),
+        sa.Column('vehicle_type', vehicle_type_enum, nullable=False),
+        sa.Column('lot_id', sa.Integer(), sa.ForeignKey('parking_lots.id'), nullable=True),
+        sa.Column('entry_gate_id', sa.Integer(), sa.ForeignKey('gates.id'), nullable=True),
+        sa.Column('exit_gate_id', sa.Integer(), sa.ForeignKey('gates.id'), nullable=True),
+        sa.Column('entered_at', sa.DateTime(), nullable=False),
+        sa.Column('exited_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_parking_sessions_id', 'parking_sessions', ['id'])
+    op.create_index(
+        'ux_parking_sessions_open_vehicle',
+        'parking_sessions',
+        ['vehicle_id'],
+        unique=True,
+        postgresql_where=sa.text('exited_at IS NULL'),
+    )
+    op.create_index(
+        'ix_parking_sessions_open_lot',
+        'parking_sessions',
+        ['lot_id', 'entered_at'],
+        postgresql_where=sa.text('exited_at IS NULL'),
+    )
+    op.add_column('access_logs', sa.Column('direction', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('access_logs', 'direction')
+    op.drop_index('ix_parking_sessions_open_lot', table_name='parking_sessions')
+    op.drop_index('ux_parking_sessions_open_vehicle', table_name='parking_sessions')
+    op.drop_index('ix_parking_sessions_id', table_name='parking_sessions')
+    op.drop_table('parking_sessions')
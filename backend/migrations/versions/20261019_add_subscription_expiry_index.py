@@ -0,0 +1,28 @@
+"""add partial index on active subscriptions by end_date
+
+Revision ID: 20261019_subscription_expiry
+Revises: 20261019_access_log_repeats
+Create Date: 2026-10-19 16:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_subscription_expiry'
+down_revision = '20261019_access_log_repeats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_subscriptions_active_end_date',
+        'subscriptions',
+        ['end_date'],
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subscriptions_active_end_date', table_name='subscriptions')
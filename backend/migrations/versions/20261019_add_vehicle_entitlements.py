@@ -0,0 +1,66 @@
+"""add vehicle_entitlements table
+
+Revision ID: 20261019_vehicle_entitlements
+Revises: 20261019_access_rollups
+Create Date: 2026-10-19 13:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_vehicle_entitlements'
+down_revision = '20261019_access_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vehicle_entitlements',
+        sa.Column('plate', sa.String(), primary_key=True),
+        sa.Column('vehicle_id', sa.Integer(), sa.ForeignKey('vehicles.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('vehicle_type', sa.String(), nullable=False),
+        sa.Column('owner_type', sa.String(), nullable=False),
+        sa.Column('valid_until', sa.DateTime(), nullable=True),
+        sa.Column('subscription_id', sa.Integer(), nullable=True),
+        sa.Column('plan_id', sa.Integer(), nullable=True),
+        sa.Column('space_types', postgresql.ARRAY(sa.String()), nullable=False),
+    )
+    op.create_index('ix_vehicle_entitlements_vehicle_id', 'vehicle_entitlements', ['vehicle_id'])
+    op.create_index('ix_vehicle_entitlements_owner_id', 'vehicle_entitlements', ['owner_id'])
+
+    # Initial population; afterwards the application keeps the table current
+    op.execute("""
+        INSERT INTO vehicle_entitlements
+            (plate, vehicle_id, owner_id, vehicle_type, owner_type, valid_until, subscription_id, plan_id, space_types)
+        SELECT DISTINCT ON (regexp_replace(upper(v.license_plate), '[^A-Z0-9]', '', 'g'))
+            regexp_replace(upper(v.license_plate), '[^A-Z0-9]', '', 'g'),
+            v.id, v.owner_id, v.type::text, u.type::text,
+            latest.end_date, latest.id, latest.plan_id,
+            COALESCE((
+                SELECT array_agg(DISTINCT ps.type::text)
+                FROM subscription_parking_spaces sps
+                JOIN parking_spaces ps ON ps.id = sps.parking_space_id
+                JOIN subscriptions s ON s.id = sps.subscription_id
+                WHERE s.user_id = v.owner_id AND s.status = 'active'
+            ), ARRAY[]::varchar[])
+        FROM vehicles v
+        JOIN users u ON u.id = v.owner_id
+        LEFT JOIN LATERAL (
+            SELECT s.id, s.plan_id, s.end_date
+            FROM subscriptions s
+            WHERE s.user_id = v.owner_id AND s.status = 'active'
+            ORDER BY s.end_date DESC
+            LIMIT 1
+        ) latest ON true
+        ORDER BY regexp_replace(upper(v.license_plate), '[^A-Z0-9]', '', 'g'), v.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicle_entitlements_owner_id', table_name='vehicle_entitlements')
+    op.drop_index('ix_vehicle_entitlements_vehicle_id', table_name='vehicle_entitlements')
+    op.drop_table('vehicle_entitlements')
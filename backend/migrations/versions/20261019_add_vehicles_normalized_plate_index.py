@@ -0,0 +1,34 @@
+"""add unique index on the normalized vehicle license plate
+
+Revision ID: 20261019_vehicle_plate_unique
+Revises: 20261019_access_log_match
+Create Date: 2026-10-19 20:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_vehicle_plate_unique'
+down_revision = '20261019_access_log_match'
+branch_labels = None
+depends_on = None
+
+NORMALIZED_PLATE = "regexp_replace(upper(license_plate), '[^A-Z0-9]', '', 'g')"
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT {NORMALIZED_PLATE} AS plate, string_agg(license_plate, ', ' ORDER BY id) "
+        f"FROM vehicles GROUP BY 1 HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        listed = "; ".join(f"{plate}: {plates}" for plate, plates in duplicates)
+        raise RuntimeError(f"Vehicles share a normalized license plate, resolve them first: {listed}")
+    op.create_index(
+        'ux_vehicles_normalized_plate', 'vehicles', [sa.text(NORMALIZED_PLATE)], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_vehicles_normalized_plate', table_name='vehicles')
@@ -5,6 +5,7 @@ from app.db.session import AsyncSessionLocal, engine
 from app.models.user import User, UserType
 from app.models.vehicle import Vehicle
 from passlib.context import CryptContext
+from app.services.entitlements import rebuild_entitlements
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -82,6 +83,14 @@ async def seed_all():
     await seed_parking_spaces()
     await seed_subscriptions_and_allocations()
     await seed_access_logs()
+    await seed_entitlements()
+
+async def seed_entitlements():
+    # Os dados acima foram inseridos diretamente, por isso recalcula os direitos de acesso
+    async with AsyncSessionLocal() as session:
+        await rebuild_entitlements(session)
+        await session.commit()
+    print("Direitos de acesso dos veículos recalculados.")
 
 async def seed_plans():
     plans = [
@@ -0,0 +1,72 @@
+"""Shared fixtures.
+
+Tests that need PostgreSQL use the ``sessions`` fixture and are skipped unless
+``TEST_DATABASE_URL`` points at a scratch database (asyncpg URL), e.g.::
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost/gatewise_test python -m pytest tests
+
+WARNING: the database's ``public`` schema is dropped and rebuilt with
+``alembic upgrade head`` at the start of the run, and every table is truncated
+before each test.
+"""
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def _engine():
+    # NullPool: every asyncio.run() gets fresh connections on its own event loop
+    return create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+
+
+async def _execute(*statements):
+    engine = _engine()
+    async with engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement))
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    """The scratch database, rebuilt from the migrations as production runs them."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    asyncio.run(_execute("DROP SCHEMA public CASCADE", "CREATE SCHEMA public"))
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "migrations"))
+    sync_url = make_url(TEST_DATABASE_URL).set(drivername="postgresql+psycopg2")
+    config.set_main_option("sqlalchemy.url", sync_url.render_as_string(hide_password=False).replace("%", "%%"))
+    command.upgrade(config, "head")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def sessions(migrated_database):
+    """Session factory on the emptied scratch database; use it inside ``asyncio.run``."""
+    async def truncate():
+        engine = _engine()
+        async with engine.begin() as conn:
+            tables = (await conn.execute(text(
+                "SELECT string_agg(quote_ident(tablename), ', ') FROM pg_tables "
+                "WHERE schemaname = 'public' AND tablename <> 'alembic_version'"
+            ))).scalar()
+            await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        await engine.dispose()
+
+    asyncio.run(truncate())
+    engine = _engine()
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
@@ -0,0 +1,37 @@
+"""Minimal rows for database tests."""
+from datetime import datetime, timedelta
+
+from app.models.parking_space import ParkingSpace, ParkingSpaceType
+from app.models.plan import Plan
+from app.models.subscription import Subscription
+from app.models.user import User, UserType
+from app.models.vehicle import Vehicle
+
+
+async def add(db, row):
+    db.add(row)
+    await db.flush()
+    return row
+
+
+async def user(db, name="owner", type=UserType.user):
+    return await add(db, User(
+        username=name, full_name=name.title(), email=f"{name}@gatewise.test", hashed_password="!", type=type,
+    ))
+
+
+async def vehicle(db, owner, plate):
+    return await add(db, Vehicle(license_plate=plate, make="Make", model="Model", color="black", owner_id=owner.id))
+
+
+async def subscription(db, owner, spaces=1, ends_in=timedelta(days=30), status="active"):
+    plan = await add(db, Plan(name="Monthly", price=10.0, num_spaces=spaces, duration_days=30))
+    now = datetime.utcnow()
+    return await add(db, Subscription(
+        user_id=owner.id, plan_id=plan.id, start_date=now - timedelta(days=1), end_date=now + ends_in,
+        status=status, spaces_allocated=spaces, price_at_subscription=plan.price,
+    ))
+
+
+async def spaces(db, count, type=ParkingSpaceType.regular):
+    return [await add(db, ParkingSpace(name=f"P{i}", type=type)) for i in range(count)]
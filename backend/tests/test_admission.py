@@ -0,0 +1,22 @@
+from starlette.requests import Request
+
+from app.core.admission import client_key
+from app.core.security import create_camera_token, create_password_reset_token
+
+
+def request(**headers):
+    return Request({
+        "type": "http", "method": "POST", "path": "/api/v1/access_check", "client": ("10.0.0.7", 5000),
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_signed_camera_token_gets_its_own_bucket():
+    assert client_key(request(x_camera_token=create_camera_token("lane-1"))) == "camera:lane-1"
+
+
+def test_unsigned_camera_ids_share_the_address_bucket():
+    assert client_key(request(x_camera_id="lane-1")) == "addr:10.0.0.7"
+    assert client_key(request(x_camera_token="lane-1")) == "addr:10.0.0.7"
+    # A valid token of another kind is not a camera credential
+    assert client_key(request(x_camera_token=create_password_reset_token(1))) == "addr:10.0.0.7"
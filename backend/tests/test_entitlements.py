@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.vehicles import create_vehicle
+from app.models.schemas import VehicleCreate
+from app.models.vehicle import Vehicle
+from app.models.vehicle_entitlement import VehicleEntitlement
+from app.services.entitlements import upsert_statement
+from tests import factories
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_refresh_does_not_take_over_another_owners_plate():
+    # "AA-11-BB" of one owner and "AA11BB" of another share the key AA11BB: the conflicting
+    # row may only be updated when it already belongs to the owner being refreshed
+    sql = compiled(upsert_statement(owner_id=1))
+    conflict = sql[sql.index("ON CONFLICT"):]
+    assert "DO UPDATE SET" in conflict
+    assert "WHERE vehicle_entitlements.owner_id = excluded.owner_id" in conflict
+
+
+async def owners(sessions, *names):
+    async with sessions() as db:
+        users = [await factories.user(db, name) for name in names]
+        for owner in users:
+            await factories.subscription(db, owner)
+        await db.commit()
+    return users
+
+
+async def create(sessions, owner, plate):
+    async with sessions() as db:
+        try:
+            vehicle = await create_vehicle(
+                VehicleCreate(license_plate=plate, make="Make", model="Model", color="black"), owner.username, db,
+            )
+            return vehicle.owner_id
+        except HTTPException as exc:
+            return exc.status_code
+
+
+async def plates(sessions):
+    async with sessions() as db:
+        vehicles = (await db.execute(select(Vehicle.license_plate, Vehicle.owner_id))).all()
+        entitlements = (await db.execute(select(VehicleEntitlement.plate, VehicleEntitlement.owner_id))).all()
+    return vehicles, entitlements
+
+
+def test_plate_differing_only_in_punctuation_is_rejected(sessions):
+    async def scenario():
+        first, second = await owners(sessions, "first", "second")
+        assert await create(sessions, first, "AA-11-BB") == first.id
+        assert await create(sessions, second, "aa11bb") == 400
+        return first, await plates(sessions)
+
+    first, (vehicles, entitlements) = asyncio.run(scenario())
+    assert vehicles == [("AA-11-BB", first.id)]
+    assert entitlements == [("AA11BB", first.id)]
+
+
+@pytest.mark.parametrize("plates_created", [("AA-11-BB", "AA11BB"), ("AA11BB", "AA 11 BB")])
+def test_concurrent_creates_of_the_same_plate(sessions, plates_created):
+    async def scenario():
+        users = await owners(sessions, "first", "second")
+        outcomes = await asyncio.gather(*(create(sessions, owner, plate) for owner, plate in zip(users, plates_created)))
+        return outcomes, await plates(sessions)
+
+    outcomes, (vehicles, entitlements) = asyncio.run(scenario())
+    winners = [outcome for outcome in outcomes if outcome != 400]
+    assert len(winners) == 1
+    assert [owner_id for _, owner_id in vehicles] == winners
+    assert entitlements == [("AA11BB", winners[0])]
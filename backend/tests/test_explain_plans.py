@@ -0,0 +1,76 @@
+"""EXPLAIN plan check for the hot queries.
+
+Each query is planned with ``enable_seqscan = off`` on the schema built by the
+migrations: the planner then uses an index whenever one can serve the query,
+so a remaining ``Seq Scan`` means the query has no usable index, whatever the
+size of the data. Cost regressions at production volumes are still measured
+with ``benchmarks.api`` on a generated dataset.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from app.models.access_log import AccessLog
+from app.models.parking_space import ParkingSpace
+from app.models.payment import Payment
+from app.models.subscription import Subscription
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+from app.models.vehicle import Vehicle
+from app.models.vehicle_entitlement import VehicleEntitlement
+
+
+def hot_queries(user_id, subscription_id, plate):
+    now = datetime.utcnow()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "user_active_subscriptions": select(Subscription).where(
+            Subscription.user_id == user_id, Subscription.status == "active"
+        ),
+        "due_subscriptions": select(Subscription.id, Subscription.end_date).where(
+            Subscription.status == "active", Subscription.end_date < now + timedelta(days=1)
+        ),
+        "latest_paid_payment": select(Payment)
+        .where(Payment.subscription_id == subscription_id, Payment.status == "paid")
+        .order_by(Payment.paid_at.desc())
+        .limit(1),
+        "paid_this_month": select(Payment.amount).where(
+            Payment.status == "paid", Payment.paid_at >= month_start, Payment.paid_at < now
+        ),
+        "subscription_spaces": select(ParkingSpace)
+        .join(SubscriptionParkingSpace)
+        .where(SubscriptionParkingSpace.subscription_id == subscription_id)
+        .order_by(SubscriptionParkingSpace.order),
+        "user_vehicles": select(Vehicle).where(Vehicle.owner_id == user_id),
+        "entitlement_lookup": select(VehicleEntitlement).where(VehicleEntitlement.plate == plate),
+        "access_logs_page": select(AccessLog).order_by(AccessLog.timestamp.desc()).limit(50),
+        "access_logs_last_hour": select(AccessLog).where(AccessLog.timestamp >= now - timedelta(hours=1)),
+    }
+
+
+def compile_literal(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def seq_scans(node):
+    """Relations scanned sequentially anywhere in the plan tree."""
+    found = [node["Relation Name"]] if node.get("Node Type") == "Seq Scan" else []
+    for child in node.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+@pytest.mark.parametrize("name", list(hot_queries(1, 1, "AA11BB")))
+def test_hot_query_uses_an_index(sessions, name):
+    async def plan():
+        async with sessions() as db:
+            await db.execute(text("SET enable_seqscan = off"))
+            statement = hot_queries(1, 1, "AA11BB")[name]
+            result = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compile_literal(statement)}"))).scalar()
+            return (result if isinstance(result, list) else json.loads(result))[0]["Plan"]
+
+    assert seq_scans(asyncio.run(plan())) == []
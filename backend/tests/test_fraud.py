@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app.services.fraud import AccessEvent, FraudDetector
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def event(seconds, plate, direction, gate_id, user_id=1, granted=True):
+    return AccessEvent(T0 + timedelta(seconds=seconds), plate, granted, direction, gate_id, user_id)
+
+
+def kinds(alerts):
+    return [alert.kind for alert in alerts]
+
+
+def test_entry_and_exit_at_different_gates_is_a_normal_visit():
+    detector = FraudDetector(gate_hop_window=timedelta(seconds=30))
+    assert detector.observe(event(0, "AA11BB", "entry", gate_id=1)) == []
+    assert detector.observe(event(10, "AA11BB", "exit", gate_id=2)) == []
+
+
+def test_same_direction_at_different_gates_is_a_gate_hop():
+    detector = FraudDetector(gate_hop_window=timedelta(seconds=30))
+    detector.observe(event(0, "AA11BB", "entry", gate_id=1))
+    alerts = detector.observe(event(10, "CC22DD", "entry", gate_id=2))
+    assert kinds(alerts) == ["gate_hop"]
+    assert "AA11BB, CC22DD" in alerts[0].detail
+
+
+def test_gate_hop_ignores_events_outside_the_window():
+    detector = FraudDetector(gate_hop_window=timedelta(seconds=30))
+    detector.observe(event(0, "AA11BB", "entry", gate_id=1))
+    assert detector.observe(event(31, "CC22DD", "entry", gate_id=2)) == []
+
+
+def test_same_gate_reread_after_the_coalescing_window_is_not_a_double_entry():
+    detector = FraudDetector(reread_window=timedelta(seconds=60))
+    detector.observe(event(0, "AA11BB", "entry", gate_id=1))
+    assert detector.observe(event(5, "AA11BB", "entry", gate_id=1)) == []
+    assert detector.observe(event(50, "AA11BB", "entry", gate_id=1)) == []
+
+
+def test_second_entry_at_another_gate_or_later_is_a_double_entry():
+    detector = FraudDetector(reread_window=timedelta(seconds=60))
+    detector.observe(event(0, "AA11BB", "entry", gate_id=1))
+    assert "double_entry" in kinds(detector.observe(event(5, "AA11BB", "entry", gate_id=2)))
+    assert kinds(detector.observe(event(200, "AA11BB", "entry", gate_id=2))) == ["double_entry"]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import access
+from app.main import app
+from app.services.gate_channel import OUTBOX_SIZE, GateChannel, GateChannelHub
+
+
+def test_channel_that_stops_reading_is_closed():
+    async def scenario():
+        channel = GateChannel(1, "token")
+        for i in range(OUTBOX_SIZE + 1):
+            channel.push({"type": "invalidate", "plates": [str(i)]})
+        return channel
+
+    channel = asyncio.run(scenario())
+    assert channel.closed.is_set()
+    assert channel.outbox.qsize() == OUTBOX_SIZE
+
+
+def test_logout_closes_the_channels_of_that_token():
+    async def scenario():
+        hub = GateChannelHub()
+        logged_out, other = GateChannel(1, "token-a"), GateChannel(2, "token-b")
+        hub.register(logged_out)
+        hub.register(other)
+        hub.close_token("token-a")
+        hub.unregister(logged_out)
+        hub.unregister(other)
+        return logged_out.closed.is_set(), other.closed.is_set()
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+class NoSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_channel_is_closed_when_its_token_stops_verifying(monkeypatch):
+    revoked = False
+
+    async def verify_token(token, db):
+        if revoked:
+            raise HTTPException(status_code=401, detail="Token is blacklisted")
+        return "admin"
+
+    async def admin_required(username, db):
+        return None
+
+    async def lot_for_gate(db, gate_id):
+        return 1
+
+    monkeypatch.setattr(access, "AsyncSessionLocal", NoSession)
+    monkeypatch.setattr(access, "verify_token", verify_token)
+    monkeypatch.setattr(access, "admin_required", admin_required)
+    monkeypatch.setattr(access, "lot_for_gate", lot_for_gate)
+    monkeypatch.setattr(access.settings, "GATE_TOKEN_CHECK_SECONDS", 0.05)
+
+    with TestClient(app).websocket_connect("/api/v1/gates/1/ws?token=t") as websocket:
+        websocket.send_text("not json")
+        assert websocket.receive_json()["type"] == "error"
+        revoked = True
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008
+    assert closed.value.reason == "Token is blacklisted"
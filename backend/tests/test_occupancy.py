@@ -0,0 +1,55 @@
+import asyncio
+
+from app.services.parking_sessions import OccupancyCounters
+
+
+class SlowCountQuery:
+    """Stands in for the session: the grouped count returns once ``release`` is set."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def execute(self, statement):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class Car:
+    value = "car"
+
+
+def test_sessions_changing_during_a_load_are_applied():
+    async def scenario():
+        counters = OccupancyCounters()
+        db = SlowCountQuery([(1, Car(), 3)])
+        load = asyncio.create_task(counters.ensure_loaded(db))
+        await db.started.wait()
+        counters.entered(1, "car")
+        counters.entered(1, "car")
+        counters.exited(1, "car")
+        db.release.set()
+        await load
+        return counters.snapshot()
+
+    assert asyncio.run(scenario()) == [(1, "car", 4)]
+
+
+def test_concurrent_first_reads_load_once():
+    async def scenario():
+        counters = OccupancyCounters()
+        db = SlowCountQuery([(1, Car(), 2)])
+        loads = [asyncio.create_task(counters.ensure_loaded(db)) for _ in range(3)]
+        await db.started.wait()
+        db.release.set()
+        await asyncio.gather(*loads)
+        return db.calls, counters.snapshot()
+
+    assert asyncio.run(scenario()) == (1, [(1, "car", 2)])
@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.models.payment import Payment
+from app.models.schemas import PaymentSettlementItem
+from app.services.payment_settlement import settle_payments
+from tests import factories
+
+
+async def settle(sessions, item):
+    async with sessions() as db:
+        [result] = await settle_payments(db, [item])
+        await db.commit()
+    return result.status
+
+
+async def payments(sessions):
+    async with sessions() as db:
+        return (await db.execute(select(Payment.status))).scalars().all()
+
+
+def test_concurrent_settlements_create_one_payment(sessions):
+    async def scenario():
+        async with sessions() as db:
+            sub = await factories.subscription(db, await factories.user(db))
+            await db.commit()
+        item = PaymentSettlementItem(subscription_id=sub.id, amount=sub.price_at_subscription)
+        outcomes = await asyncio.gather(*(settle(sessions, item) for _ in range(4)))
+        return outcomes, await payments(sessions)
+
+    outcomes, statuses = asyncio.run(scenario())
+    assert sorted(outcomes) == ["already_paid", "already_paid", "already_paid", "created"]
+    assert statuses == ["paid"]
+
+
+def test_concurrent_settlements_of_a_pending_payment(sessions):
+    async def scenario():
+        async with sessions() as db:
+            sub = await factories.subscription(db, await factories.user(db))
+            payment = await factories.add(db, Payment(subscription_id=sub.id, amount=10.0, status="pending"))
+            await db.commit()
+        outcomes = await asyncio.gather(*(settle(sessions, PaymentSettlementItem(payment_id=payment.id)) for _ in range(4)))
+        return outcomes, await payments(sessions)
+
+    outcomes, statuses = asyncio.run(scenario())
+    assert sorted(outcomes) == ["already_paid", "already_paid", "already_paid", "settled"]
+    assert statuses == ["paid"]
@@ -0,0 +1,26 @@
+from app.services.plate_index import PlateIndex
+
+
+def index(*plates):
+    plate_index = PlateIndex()
+    for vehicle_id, plate in enumerate(plates, 1):
+        plate_index._add(vehicle_id, plate)
+    plate_index._loaded = True
+    return plate_index
+
+
+def test_confusable_read_matches_registered_plate():
+    plate_index = index("AB-12-CD")
+    assert plate_index.match("A8-1Z-C0") == (1, "AB12CD", 3)
+
+
+def test_plate_one_character_off_is_not_a_match():
+    plate_index = index("AB-12-CD")
+    assert plate_index.match("AB12CE") is None
+    assert plate_index.match("AB12C") is None
+    assert plate_index.near_miss("AB12CE") == (1, "AB12CD", 1)
+
+
+def test_tie_between_vehicles_is_no_match():
+    plate_index = index("AB12C0", "AB12CO")
+    assert plate_index.match("AB12CD") is None
@@ -0,0 +1,39 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import query_profiler
+
+
+def profiled_app():
+    app = FastAPI()
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
+
+    @app.get("/within")
+    @query_profiler.query_budget(2)
+    async def within():
+        query_profiler._current_recorder.get().record("SELECT 1")
+        return {"ok": True}
+
+    @app.get("/over")
+    @query_profiler.query_budget(1)
+    async def over():
+        recorder = query_profiler._current_recorder.get()
+        recorder.record("SELECT * FROM vehicles WHERE id = 1")
+        recorder.record("SELECT * FROM vehicles WHERE id = 2")
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_strict_budget_fails_the_request(monkeypatch):
+    monkeypatch.setattr(query_profiler.settings, "QUERY_BUDGET_STRICT", True)
+    client = profiled_app()
+    assert client.get("/within").json() == {"ok": True}
+    response = client.get("/over")
+    assert response.status_code == 500
+    assert "budget is 1" in response.json()["detail"]
+
+
+def test_lenient_budget_only_logs(monkeypatch):
+    monkeypatch.setattr(query_profiler.settings, "QUERY_BUDGET_STRICT", False)
+    assert profiled_app().get("/over").status_code == 200
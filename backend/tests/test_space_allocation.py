@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.v1.endpoints.subscriptions import allocate_parking_spaces, auto_allocate_parking_spaces
+from app.models.schemas import ParkingSpaceAllocation, ParkingSpaceAutoAllocation
+from app.models.subscription_parking_space import SubscriptionParkingSpace
+from app.services.parking_allocator import free_space_index
+from tests import factories
+
+
+async def setup(sessions, spaces_allowed, free_spaces):
+    free_space_index.invalidate()
+    async with sessions() as db:
+        owner = await factories.user(db)
+        sub = await factories.subscription(db, owner, spaces=spaces_allowed)
+        spaces = await factories.spaces(db, free_spaces)
+        await db.commit()
+    return sub.id, [space.id for space in spaces]
+
+
+async def links(sessions, subscription_id):
+    async with sessions() as db:
+        result = await db.execute(
+            select(SubscriptionParkingSpace.parking_space_id, SubscriptionParkingSpace.order)
+            .where(SubscriptionParkingSpace.subscription_id == subscription_id)
+            .order_by(SubscriptionParkingSpace.order)
+        )
+        return result.all()
+
+
+def test_limit_counts_spaces_already_allocated(sessions):
+    async def scenario():
+        sub_id, space_ids = await setup(sessions, spaces_allowed=2, free_spaces=4)
+        async with sessions() as db:
+            await allocate_parking_spaces(sub_id, ParkingSpaceAllocation(parking_space_ids=[space_ids[0]]), db)
+        async with sessions() as db:
+            with pytest.raises(HTTPException) as exc:
+                await auto_allocate_parking_spaces(sub_id, ParkingSpaceAutoAllocation(count=2), db)
+            assert exc.value.status_code == 400
+        async with sessions() as db:
+            await auto_allocate_parking_spaces(sub_id, ParkingSpaceAutoAllocation(count=1), db)
+        async with sessions() as db:
+            with pytest.raises(HTTPException) as exc:
+                await allocate_parking_spaces(sub_id, ParkingSpaceAllocation(parking_space_ids=[space_ids[3]]), db)
+            assert exc.value.status_code == 400
+        return await links(sessions, sub_id)
+
+    linked = asyncio.run(scenario())
+    assert [order for _, order in linked] == [0, 1]
+
+
+def test_concurrent_allocations_respect_the_limit(sessions):
+    async def allocate(sub_id):
+        async with sessions() as db:
+            try:
+                await auto_allocate_parking_spaces(sub_id, ParkingSpaceAutoAllocation(count=1), db)
+                return "allocated"
+            except HTTPException as exc:
+                return exc.status_code
+
+    async def scenario():
+        sub_id, _ = await setup(sessions, spaces_allowed=1, free_spaces=4)
+        outcomes = await asyncio.gather(*(allocate(sub_id) for _ in range(4)))
+        return outcomes, await links(sessions, sub_id)
+
+    outcomes, linked = asyncio.run(scenario())
+    assert sorted(outcomes, key=str) == [400, 400, 400, "allocated"]
+    assert len(linked) == 1
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.subscription import Subscription
+from app.services.subscription_expiry import RETRY_DELAY, ExpiryScheduler
+from tests import factories
+
+
+def scheduler_with(session_factory, *subscription_ids, now):
+    scheduler = ExpiryScheduler(session_factory)
+    scheduler.horizon_end = now + scheduler.horizon
+    for subscription_id in subscription_ids:
+        scheduler.schedule(subscription_id, now - timedelta(seconds=1))
+    return scheduler
+
+
+class FailingSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        raise ConnectionError("database unavailable")
+
+
+def test_failed_pass_retries_the_due_subscriptions():
+    now = datetime(2026, 1, 1, 8, 0, 0)
+    scheduler = scheduler_with(FailingSession, 1, 2, now=now)
+    asyncio.run(scheduler.fire_due(now))
+    assert scheduler._due == {1: now + RETRY_DELAY, 2: now + RETRY_DELAY}
+
+
+def test_subscription_locked_by_the_sweep_is_retried(sessions):
+    async def scenario():
+        async with sessions() as db:
+            owner = await factories.user(db)
+            sub = await factories.subscription(db, owner, ends_in=timedelta(seconds=-5))
+            await db.commit()
+        now = datetime.utcnow()
+        scheduler = scheduler_with(sessions, sub.id, now=now)
+        async with sessions() as sweep:
+            # The hourly sweep holds the row
+            await sweep.execute(select(Subscription).where(Subscription.id == sub.id).with_for_update())
+            await scheduler.fire_due(now)
+        assert scheduler._due == {sub.id: now + RETRY_DELAY}
+        await scheduler.fire_due(now + RETRY_DELAY)
+        async with sessions() as db:
+            return scheduler._due, (await db.get(Subscription, sub.id)).status
+
+    due, status = asyncio.run(scenario())
+    assert due == {}
+    assert status == "inactive"